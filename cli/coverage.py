@@ -1,13 +1,18 @@
 import click
 from os import getcwd
 
+from plum.cli._scheduler import ResourceScheduler
 from plum.cli.plum_coverage import PlumCoverage
 
 @click.command()
 @click.option('--lang', type=click.Choice(['cpp', 'csharp', 'java', 'javascript', 'python', 'typescript'], case_sensitive=False), required=True, help='Programming language.')
 @click.option('--multiprocessing/--no-multiprocessing', default=True, help='Enable or disable multiprocessing.')
+@click.option('--container-pool', default=0, type=click.IntRange(min=0), help='Containers kept running per Docker image and shared by the repositories. 0 starts new containers for every command.')
+@click.option('--max-jobs', default=None, type=click.IntRange(min=1), help='Maximum number of repositories processed at once. Defaults to one per process.')
+@click.option('--cpus-per-job', default=None, type=click.FloatRange(min=0, min_open=True), help='CPUs the containers of each repository may use, ex) 2. Defaults to no limit.')
+@click.option('--memory-per-job', default=None, type=str, help='Memory the containers of each repository may use, ex) 4g. Defaults to no limit.')
 @click.argument('dir', required=False, type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True)) # help="Specify only when building a single directory."
-def coverage(lang, multiprocessing, dir):
+def coverage(lang, multiprocessing, container_pool, max_jobs, cpus_per_job, memory_per_job, dir):
     """Coverage operations."""
     if dir:
         # Build for the specified directory
@@ -23,5 +28,13 @@ def coverage(lang, multiprocessing, dir):
             f"{'Not using' if not multiprocessing else 'Using'} multiprocessing."
         )
 
-    plum = PlumCoverage(lang, multiprocessing, working_directory=getcwd(), specific_subdir=dir)
+    # Admit repositories only while the host has CPU, memory and disk headroom for them.
+    scheduler = ResourceScheduler(
+        language_limits={lang: max_jobs} if max_jobs else None,
+        cpus_per_job=cpus_per_job,
+        memory_per_job=memory_per_job,
+        disk_path=getcwd(),
+    )
+
+    plum = PlumCoverage(lang, multiprocessing, working_directory=getcwd(), specific_subdir=dir, container_pool_size=container_pool, scheduler=scheduler)
     plum.run()
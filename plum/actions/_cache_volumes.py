@@ -0,0 +1,154 @@
+"""
+Named Docker volumes caching downloaded packages across containers, one set per package ecosystem.
+
+Containers are removed after each command, so without these every `dotnet restore`, `mvn` or `npm install`
+downloads its packages again. The package managers write to their caches with atomic renames or their own
+locks, which makes the volumes safe to share between concurrent containers:
+- NuGet locks through files in its scratch directory, so that directory is shared too.
+- Maven (3.9+) locks artifacts with MAVEN_LOCK_OPTIONS.
+- npm (cacache) and pip write atomically.
+"""
+import logging
+import re
+import subprocess
+from typing import Dict, Iterable, Optional
+
+
+CACHE_VOLUMES: Dict[str, Dict[str, str]] = {
+    "maven": {
+        "plum-cache-maven": "/root/.m2/repository",
+    },
+    "nuget": {
+        "plum-nuget-packages": "/root/.nuget/packages",
+        "plum-cache-nuget-http": "/root/.local/share/NuGet/http-cache",
+        "plum-cache-nuget-scratch": "/tmp/NuGetScratch",
+    },
+    "npm": {
+        "plum-cache-npm": "/root/.npm",
+    },
+    "pip": {
+        "plum-cache-pip": "/root/.cache/pip",
+    },
+}
+"""Ecosystem to its named volumes, mapped to where the package manager caches inside the container."""
+
+_IMAGE_ECOSYSTEMS = [
+    (re.compile(r"(^|/)dotnet/sdk$"), "nuget"),
+    (re.compile(r"(^|/)maven$"), "maven"),
+    (re.compile(r"(^|/)node$"), "npm"),
+    (re.compile(r"(^|/)python$"), "pip"),
+]
+"""Regexes recognizing the ecosystem of an image by its name, without the registry host or tag."""
+
+MAVEN_LOCK_OPTIONS = "-Daether.syncContext.named.factory=file-lock -Daether.syncContext.named.nameMapper=file-gav"
+"""Maven resolver options locking artifacts with files in the shared repository, so concurrent builds can share it."""
+
+GC_IMAGE = "busybox:stable"
+"""Image the garbage collector runs in."""
+
+CACHE_MAX_BYTES = 20 * 1024 ** 3
+"""Default size cap of each cache volume, shrunk to it at the end of the CLI runs."""
+
+
+def get_ecosystem(image: str) -> Optional[str]:
+    """Package ecosystem of a Docker image, ex) nuget for mcr.microsoft.com/dotnet/sdk. None if unknown."""
+    for regex, ecosystem in _IMAGE_ECOSYSTEMS:
+        if regex.search(image):
+            return ecosystem
+    return None
+
+
+def get_cache_volumes(image: str) -> Dict[str, str]:
+    """Cache volumes to mount in a container of the image, mapped to their paths inside the container."""
+    return dict(CACHE_VOLUMES.get(get_ecosystem(image), {}))
+
+
+def get_volume_size(volume: str, timeout=600) -> Optional[int]:
+    """Size in bytes of a named volume, None if it could not be measured."""
+    try:
+        output = subprocess.run(
+            ["docker", "run", "--rm", "-v", f"{volume}:/cache", GC_IMAGE, "du", "-sk", "/cache"],
+            capture_output=True, timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if output.returncode != 0:
+        return None
+    return int(output.stdout.decode("utf-8").split()[0]) * 1024
+
+
+def is_volume_in_use(volume: str) -> bool:
+    """Whether a container, running or not, uses the volume."""
+    try:
+        output = subprocess.run(["docker", "ps", "-a", "-q", "--filter", f"volume={volume}"], capture_output=True)
+    except OSError:
+        # Without an answer from Docker, the volume may be in use.
+        return True
+    return output.returncode != 0 or bool(output.stdout.strip())
+
+
+def collect_garbage(volume: str, max_bytes: int, timeout=3600) -> dict:
+    """
+    Shrink a cache volume under a size cap by deleting its least recently accessed files.
+    Skipped while a container uses the volume, so no build sees its packages disappear.
+
+    Args:
+        volume: Named volume to shrink.
+        max_bytes: Size cap in bytes.
+        timeout: Time in seconds the collection is allowed to take.
+
+    Returns:
+        Dictionary with the keys volume, collected (whether files were deleted) and size (in bytes, after collection).
+    """
+    result = {"volume": volume, "collected": False, "size": None}
+    if is_volume_in_use(volume):
+        logging.info(f"Cache volume {volume} is in use, skipping garbage collection.")
+        return result
+
+    max_kb = max_bytes // 1024
+    script = (
+        "cd /cache && total=$(du -sk . | cut -f1) && "
+        f"if [ \"$total\" -gt {max_kb} ]; then "
+        # Oldest access first: delete until the excess is freed.
+        "find . -type f -exec stat -c '%X %s %n' {} + | sort -n | "
+        f"awk -v excess=$(( (total - {max_kb}) * 1024 )) "
+        "'freed >= excess { exit } { freed += $2; sub(/^[^ ]+ [^ ]+ /, \"\"); print }' | "
+        "while IFS= read -r f; do rm -f \"$f\"; done; "
+        "find . -mindepth 1 -type d -empty -delete; echo collected; "
+        "fi; du -sk . | cut -f1"
+    )
+    try:
+        output = subprocess.run(
+            ["docker", "run", "--rm", "-v", f"{volume}:/cache", GC_IMAGE, "sh", "-c", script],
+            capture_output=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        logging.error(f"Timeout collecting garbage in cache volume {volume}")
+        return result
+    except OSError as e:
+        logging.error(f"Failed to collect garbage in cache volume {volume}: {e}")
+        return result
+
+    lines = output.stdout.decode("utf-8").split()
+    if output.returncode != 0 or not lines:
+        logging.error(f"Failed to collect garbage in cache volume {volume}: {output.stderr.decode('utf-8')}")
+        return result
+    result["collected"] = "collected" in lines
+    result["size"] = int(lines[-1]) * 1024
+    return result
+
+
+def collect_all_garbage(max_bytes: int, ecosystems: Optional[Iterable[str]] = None) -> list:
+    """
+    Shrink every cache volume under a size cap, see `collect_garbage`.
+
+    Args:
+        max_bytes: Size cap in bytes, per volume.
+        ecosystems: Ecosystems whose volumes to shrink. Defaults to all of them.
+    """
+    ecosystems = list(ecosystems) if ecosystems is not None else list(CACHE_VOLUMES)
+    return [
+        collect_garbage(volume, max_bytes)
+        for ecosystem in ecosystems
+        for volume in CACHE_VOLUMES[ecosystem]
+    ]
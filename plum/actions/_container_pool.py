@@ -0,0 +1,293 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
+
+
+class PooledContainer(DockerSession):
+    """
+    Container checked out of a `ContainerPool` for one repo, usable wherever a `DockerRunner` is expected.
+
+    The container mounts the whole project, `mount_dir` is the repo inside it. Changing the image or tag,
+    ex) when the `BuildManager` recovers with another SDK image, swaps in a container of the new image:tag.
+    The volumes are those of the pool, shared by all its containers: changing them is an error, use a runner of
+    its own instead.
+    """
+    def __init__(self, pool: "ContainerPool", image: str, tag: str, repo_path: Union[Path, str], work_dir: str):
+        super().__init__(image, tag, pool.get_repo_mount_dir(repo_path), pool.volumes)
+        self.pool = pool
+        """Pool the container is checked out of."""
+        self.work_dir = work_dir
+        """Working directory of the repo's environment configuration, reported by get_config."""
+        self.repo_path = DockerRunner.sterilize_path(repo_path)
+        self._checked_out: Optional[Tuple[str, str]] = None
+
+    def _ensure_started(self, repo_path: Union[Path, str]):
+        with self._start_lock:
+            if DockerRunner.sterilize_path(repo_path) != self.repo_path:
+                raise ValueError(f"Container checked out for {self.repo_path}, not {repo_path}")
+            if self.volumes != self.pool.volumes:
+                raise ValueError(f"Pooled containers mount the volumes of the pool, {self.pool.volumes}, not {self.volumes}")
+            if self.container_id is not None and self._checked_out != (self.image, self.tag):
+                self.release()
+            if self.container_id is None:
+                self.container_id = self.pool.checkout(self.image, self.tag)
+                self._checked_out = (self.image, self.tag)
+
+    def release(self):
+        """Reset the container and return it to the pool."""
+        if self.container_id is None:
+            return
+        container_id, (image, tag) = self.container_id, self._checked_out
+        self.container_id = None
+        self.pool.checkin(image, tag, container_id)
+
+    def close(self):
+        """Return the container to the pool rather than removing it."""
+        self.release()
+
+    def get_config(self) -> dict:
+        """Get the Docker configuration, as if the repo ran in its own container."""
+        return {
+            "type": "docker",
+            "image": self.image,
+            "tag": self.tag,
+            "work_dir": self.work_dir,
+        }
+
+
+class ContainerPool:
+    """
+    Bounded number of running containers per image:tag, shared by the repos of a Plum project.
+
+    Each container mounts the whole project, so any repo can run in any container of its image:tag and
+    container startup is paid once per container rather than once per repo. A container serves one repo at
+    a time and is reset, every leftover process killed, before the next repo gets it. Only processes are reset:
+    files written outside the project, ex) in /tmp, the installed dotnet tools or the global git config, carry
+    over to the next repos of the container. Commands that depend on a pristine container filesystem should run
+    in containers of their own, see `DockerRunner`.
+
+    With `shared=True` the bookkeeping lives in a `multiprocessing.Manager`, so the pool can be handed to the
+    worker processes of `PlumAction._run_all`.
+    """
+    MOUNT_DIR = "/plum"
+    """Directory inside the containers where the project is mounted."""
+
+    def __init__(
+            self,
+            project_root: Union[Path, str],
+            size: int,
+            volumes: Optional[Dict[str, str]] = None,
+            shared: bool = False,
+        ):
+        """
+        Args:
+            project_root: Root of the Plum project, containing all the repos.
+            size: Maximum number of containers per image:tag.
+            volumes: Additional volumes to mount in every container.
+            shared: Whether the pool is used from several processes.
+        """
+        self.project_root = Path(project_root).resolve()
+        """Root of the Plum project, mounted in every container."""
+        self.size = max(1, size)
+        """Maximum number of containers per image:tag."""
+        self.volumes = dict(volumes) if volumes else {}
+        """Additional volumes to mount in every container."""
+
+        self._manager = multiprocessing.Manager() if shared else None
+        self._idle = self._manager.dict() if shared else {}
+        """image:tag to the ids of its idle containers."""
+        self._all = self._manager.dict() if shared else {}
+        """image:tag to the ids of all its containers."""
+        self._condition = self._manager.Condition() if shared else threading.Condition()
+
+    def get_repo_mount_dir(self, repo_path: Union[Path, str]) -> str:
+        """Directory inside the containers where the given repo of the project is."""
+        relative_path = Path(repo_path).resolve().relative_to(self.project_root)
+        return str(PurePosixPath(ContainerPool.MOUNT_DIR, *relative_path.parts))
+
+    @contextmanager
+    def acquire(self, image: str, tag: str, repo_path: Union[Path, str], work_dir: str = "/app") -> Iterator[PooledContainer]:
+        """
+        Check out a container for a repo of the project, returned to the pool on exit.
+
+        Args:
+            image: Docker image of the repo.
+            tag: Docker tag of the repo.
+            repo_path: Full path to the repo, inside the project.
+            work_dir: Working directory of the repo's environment configuration.
+        """
+        container = PooledContainer(self, image, tag, repo_path, work_dir)
+        try:
+            yield container
+        finally:
+            container.release()
+
+    def warm(self, image_tags: Iterable[Tuple[str, str]], count: Optional[int] = None):
+        """
+        Start containers ahead of time, so the first repos do not wait for them.
+
+        Args:
+            image_tags: (image, tag) pairs to start containers for.
+            count: Number of containers to start per image:tag, up to the pool size. Defaults to the pool size.
+        """
+        count = min(count or self.size, self.size)
+        to_start = []
+        for image, tag in set(image_tags):
+            key = ContainerPool._key(image, tag)
+            with self._condition:
+                missing = count - len(self._all.get(key, []))
+                self._all[key] = self._all.get(key, []) + [None] * max(0, missing)
+            to_start += [(image, tag)] * max(0, missing)
+
+        def start(image_tag):
+            image, tag = image_tag
+            key = ContainerPool._key(image, tag)
+            try:
+                container_id = self._start_container(image, tag)
+            except RuntimeError as e:
+                logging.error(f"Failed to start a {key} container: {e}")
+                container_id = None
+            with self._condition:
+                all_ids = self._all[key]
+                all_ids.remove(None)
+                if container_id is not None:
+                    self._all[key] = all_ids + [container_id]
+                    self._idle[key] = self._idle.get(key, []) + [container_id]
+                else:
+                    self._all[key] = all_ids
+                self._condition.notify_all()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(to_start), os.cpu_count() or 1))) as executor:
+            list(executor.map(start, to_start))
+
+    def checkout(self, image: str, tag: str) -> str:
+        """Take an idle container of the image:tag, starting one if the pool is not full, waiting otherwise."""
+        key = ContainerPool._key(image, tag)
+        with self._condition:
+            while True:
+                idle = self._idle.get(key, [])
+                if idle:
+                    self._idle[key] = idle[1:]
+                    return idle[0]
+                all_ids = self._all.get(key, [])
+                if len(all_ids) < self.size:
+                    # Reserve the slot while the container starts outside of the lock.
+                    self._all[key] = all_ids + [None]
+                    break
+                self._condition.wait(timeout=5)
+
+        try:
+            container_id = self._start_container(image, tag)
+        except RuntimeError:
+            with self._condition:
+                all_ids = self._all[key]
+                all_ids.remove(None)
+                self._all[key] = all_ids
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            all_ids = self._all[key]
+            all_ids.remove(None)
+            self._all[key] = all_ids + [container_id]
+        return container_id
+
+    def checkin(self, image: str, tag: str, container_id: str):
+        """Reset the processes of a checked out container and make it available again. Its files are kept."""
+        session = DockerSession(image, tag, ContainerPool.MOUNT_DIR)
+        session.container_id = container_id
+        session.reset()
+        if session.container_id is None:
+            self.discard(image, tag, container_id)
+            return
+
+        key = ContainerPool._key(image, tag)
+        with self._condition:
+            self._idle[key] = self._idle.get(key, []) + [container_id]
+            self._condition.notify_all()
+
+    def discard(self, image: str, tag: str, container_id: Optional[str] = None):
+        """Forget a container that was removed, freeing its slot."""
+        key = ContainerPool._key(image, tag)
+        with self._condition:
+            self._all[key] = [c for c in self._all.get(key, []) if c != container_id]
+            self._idle[key] = [c for c in self._idle.get(key, []) if c != container_id]
+            self._condition.notify_all()
+
+    def container_ids(self) -> List[str]:
+        """Ids of all the running containers of the pool."""
+        with self._condition:
+            return [c for ids in self._all.values() for c in ids if c is not None]
+
+    def close(self):
+        """Remove every container of the pool."""
+        for container_id in self.container_ids():
+            session = DockerSession("", "")
+            session.container_id = container_id
+            session.close()
+        with self._condition:
+            self._all.clear()
+            self._idle.clear()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _start_container(self, image: str, tag: str) -> str:
+        session = DockerSession(image, tag, ContainerPool.MOUNT_DIR, self.volumes)
+        return session.start(self.project_root)
+
+    @staticmethod
+    def _key(image: str, tag: str) -> str:
+        return f"{image}:{tag}"
+
+    def __getstate__(self):
+        # The manager stays in the process that created the pool, workers only use its proxies.
+        state = self.__dict__.copy()
+        state["_manager"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_active_pool: Optional[ContainerPool] = None
+
+
+def set_active_pool(pool: Optional[ContainerPool]):
+    """Set the container pool of the current process, ex) as the initializer of the worker processes."""
+    global _active_pool
+    _active_pool = pool
+
+
+def get_active_pool() -> Optional[ContainerPool]:
+    """Container pool of the current process, None when repos run in their own containers."""
+    return _active_pool
+
+
+@contextmanager
+def docker_for_repo(env_config, repo_path: Union[Path, str]) -> Iterator[Union[DockerRunner, PooledContainer]]:
+    """
+    Docker runner for a repo of the project: a container of the active pool if there is one,
+    otherwise a runner starting a container per command.
+
+    Args:
+        env_config: EnvironmentConfig of the repo.
+        repo_path: Full path to the repo.
+    """
+    pool = get_active_pool()
+    if pool is None:
+        yield DockerRunner(image=env_config.image, tag=env_config.tag, mount_dir=env_config.work_dir)
+        return
+    with pool.acquire(env_config.image, env_config.tag, repo_path, env_config.work_dir) as container:
+        yield container
@@ -0,0 +1,236 @@
+"""
+Naming and tracking of the containers Plum starts, so none outlives its command.
+
+Killing `docker run` on timeout only kills the docker client, the container keeps running with the repo mounted.
+Every container gets a unique name and labels identifying the process that started it: on timeout the command's
+container is removed by name, the containers still tracked when the process exits are removed, and a reaper removes
+the orphans of processes that died without cleaning up, ex) crashed workers or previous runs.
+"""
+import atexit
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from typing import Iterable, List, Optional, Set
+
+from plum.actions._output_capture import LineParser, run_captured
+
+
+MANAGED_LABEL = "plum.managed"
+"""Label set on every container started by Plum."""
+
+OWNER_LABEL = "plum.owner"
+"""Label identifying the process that started the container, as host:pid."""
+
+STARTED_LABEL = "plum.started"
+"""Label with the time the container was started, in seconds since the epoch."""
+
+_tracked: Set[str] = set()
+_tracked_lock = threading.Lock()
+
+
+def get_owner() -> str:
+    """Owner label value of the containers started by the current process."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def new_container_name() -> str:
+    """Unique name for a new container."""
+    return f"plum-{os.getpid()}-{uuid.uuid4().hex[:12]}"
+
+
+def get_container_options(name: str) -> List[str]:
+    """`docker run` options naming and labelling a container."""
+    return [
+        "--name", name,
+        "--label", f"{MANAGED_LABEL}=true",
+        "--label", f"{OWNER_LABEL}={get_owner()}",
+        "--label", f"{STARTED_LABEL}={int(time.time())}",
+    ]
+
+
+def name_docker_command(command: List[str], name: str) -> List[str]:
+    """Add the name and labels of the container to a `docker run` command. Other commands are returned unchanged."""
+    if command[:2] != ["docker", "run"]:
+        return list(command)
+    return command[:2] + get_container_options(name) + command[2:]
+
+
+def track_container(container: str):
+    """Remove the container, by name or ID, if it is still running when the current process exits."""
+    with _tracked_lock:
+        _tracked.add(container)
+
+
+def untrack_container(container: str):
+    """Stop tracking a container, ex) once it is removed."""
+    with _tracked_lock:
+        _tracked.discard(container)
+
+
+def kill_container(container: str, timeout=60) -> bool:
+    """
+    Kill and remove a container, by name or ID.
+
+    Returns:
+        Whether the container was removed, False if it did not exist (anymore) or Docker did not answer.
+    """
+    untrack_container(container)
+    try:
+        output = subprocess.run(["docker", "rm", "-f", container], capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        logging.warning(f"Could not remove container {container}")
+        return False
+    return output.returncode == 0
+
+
+@atexit.register
+def kill_tracked_containers():
+    """Kill the containers started by the current process that are still running."""
+    with _tracked_lock:
+        containers = list(_tracked)
+    for container in containers:
+        kill_container(container)
+
+
+def run_container(
+        command: List[str],
+        timeout: Optional[float] = None,
+        parsers: Iterable[LineParser] = (),
+        **kwargs,
+    ) -> subprocess.CompletedProcess:
+    """
+    Run a `docker run --rm` command like `_output_capture.run_captured`, removing its container if the command
+    does not finish, ex) on timeout.
+    """
+    name = new_container_name()
+    track_container(name)
+    try:
+        return run_captured(name_docker_command(command, name), timeout=timeout, parsers=parsers, **kwargs)
+    except BaseException:
+        kill_container(name)
+        raise
+    finally:
+        untrack_container(name)
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_orphan(owner: str, started: Optional[int], max_age: Optional[float] = None, now: Optional[float] = None) -> bool:
+    """
+    Whether a container is left over.
+
+    Args:
+        owner: Owner label of the container.
+        started: Started label of the container, None if missing.
+        max_age: Seconds after which any container is left over, ex) the longest timeout of the run.
+            None to only remove the containers of dead processes.
+        now: Current time, defaults to time.time().
+    """
+    if max_age is not None and started is not None and (now or time.time()) - started > max_age:
+        return True
+    host, _, pid = owner.rpartition(":")
+    # Processes of other hosts sharing the Docker daemon cannot be checked.
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    return not _is_process_alive(int(pid))
+
+
+def list_managed_containers(timeout=60) -> List[dict]:
+    """Containers started by Plum on this Docker daemon, with their name, owner and start time."""
+    label_format = f'{{{{.Names}}}}\t{{{{.Label "{OWNER_LABEL}"}}}}\t{{{{.Label "{STARTED_LABEL}"}}}}'
+    command = ["docker", "ps", "-a", "--filter", f"label={MANAGED_LABEL}=true", "--format", label_format]
+    try:
+        output = subprocess.run(command, capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    if output.returncode != 0:
+        return []
+
+    containers = []
+    for line in output.stdout.decode("utf-8").splitlines():
+        name, owner, started = (line.split("\t") + ["", ""])[:3]
+        containers.append({
+            "name": name,
+            "owner": owner,
+            "started": int(started) if started.isdigit() else None,
+        })
+    return containers
+
+
+def reap_orphans(max_age: Optional[float] = None) -> List[str]:
+    """
+    Remove the containers left over by Plum processes, see `is_orphan`.
+
+    Returns:
+        Names of the removed containers.
+    """
+    now = time.time()
+    reaped = []
+    for container in list_managed_containers():
+        if is_orphan(container["owner"], container["started"], max_age, now) and kill_container(container["name"]):
+            reaped.append(container["name"])
+    if reaped:
+        logging.info(f"Removed {len(reaped)} orphaned containers: {', '.join(reaped)}")
+    return reaped
+
+
+class ContainerReaper:
+    """Removes orphaned containers periodically in a background thread, see `reap_orphans`."""
+    def __init__(self, interval: float = 300, max_age: Optional[float] = None):
+        """
+        Args:
+            interval: Seconds between two reaps.
+            max_age: Seconds after which any container is removed, ex) the longest timeout of the run.
+                None to only remove the containers of dead processes.
+        """
+        self.interval = interval
+        """Seconds between two reaps."""
+        self.max_age = max_age
+        """Seconds after which any container is removed."""
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Reap once now, then every interval until stopped."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop reaping."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                reap_orphans(self.max_age)
+            except Exception as e:
+                logging.warning(f"Could not reap orphaned containers: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
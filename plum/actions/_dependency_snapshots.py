@@ -0,0 +1,110 @@
+"""
+Per-repo snapshots of the resolved dependencies, as named Docker volumes.
+
+The shared cache volumes (see `_cache_volumes`) save downloads, but every run still resolves the dependency graph,
+checking remote repositories for updates. A snapshot volume holds every dependency of one repo, resolved once by
+`mvn dependency:go-offline` or `dotnet restore`. It is keyed by a hash of the files declaring the dependencies, so
+editing a pom.xml or .csproj starts a new snapshot, and it is only used once marked complete, so a failed or
+interrupted resolution is never mistaken for a warm one. Maven then runs offline (`-o`) from it. go-offline misses
+some artifacts resolved only while the goals run, ex) Surefire providers: a Maven command failing on them offline is
+rerun online once, which resolves them into the snapshot for the following runs.
+"""
+import hashlib
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from plum.actions._cache_volumes import GC_IMAGE
+
+
+DEPENDENCY_FILES: Dict[str, Iterable[str]] = {
+    "maven": ("pom.xml", "extensions.xml", "maven.config"),
+    "nuget": (
+        ".csproj", ".fsproj", ".vbproj", ".props", ".targets",
+        "packages.config", "packages.lock.json", "nuget.config", "global.json",
+    ),
+}
+"""Ecosystem to the names, or extensions (starting with a dot), of the files declaring the dependencies of a repo."""
+
+_SKIPPED_DIRS = {".git", "target", "bin", "obj", "node_modules"}
+"""Directories holding build outputs or other repos' files, not declarations."""
+
+SNAPSHOT_MARKER = ".plum-snapshot-complete"
+"""File written at the root of a snapshot volume once the dependencies are all resolved."""
+
+
+def get_dependency_hash(repo_path: Union[Path, str], ecosystem: str) -> Optional[str]:
+    """Hash of the paths and contents of the files declaring the dependencies of a repo. None if there are none."""
+    patterns = [pattern.lower() for pattern in DEPENDENCY_FILES[ecosystem]]
+    repo_path = Path(repo_path)
+    digest = hashlib.sha256()
+    found = False
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIPPED_DIRS)
+        for file in sorted(files):
+            if not _is_dependency_file(file, patterns):
+                continue
+            path = Path(root) / file
+            digest.update(path.relative_to(repo_path).as_posix().encode("utf-8") + b"\0")
+            digest.update(path.read_bytes() + b"\0")
+            found = True
+    return digest.hexdigest() if found else None
+
+
+def _is_dependency_file(file: str, patterns: Iterable[str]) -> bool:
+    file = file.lower()
+    return any(file == pattern or (pattern.startswith(".") and file.endswith(pattern)) for pattern in patterns)
+
+
+def get_snapshot_volume(repo_path: Union[Path, str], ecosystem: str) -> Optional[str]:
+    """Name of the snapshot volume of the current dependencies of a repo. None if the repo declares none."""
+    dependency_hash = get_dependency_hash(repo_path, ecosystem)
+    if dependency_hash is None:
+        return None
+    return f"plum-snapshot-{ecosystem}-{dependency_hash[:16]}"
+
+
+def _run_in_volume(volume: str, command: str, timeout) -> bool:
+    try:
+        output = subprocess.run(
+            ["docker", "run", "--rm", "-v", f"{volume}:/snapshot", GC_IMAGE, "sh", "-c", command],
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return output.returncode == 0
+
+
+def volume_exists(volume: str, timeout=60) -> bool:
+    """Whether a Docker volume exists, without creating it."""
+    try:
+        output = subprocess.run(["docker", "volume", "inspect", volume], capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return output.returncode == 0
+
+
+def is_snapshot_complete(volume: str, timeout=60) -> bool:
+    """Whether the dependencies were all resolved into the snapshot volume."""
+    # Mounting a missing volume with `docker run -v` would create it empty.
+    return volume_exists(volume, timeout) and _run_in_volume(volume, f"test -f /snapshot/{SNAPSHOT_MARKER}", timeout)
+
+
+def mark_snapshot_complete(volume: str, timeout=60) -> bool:
+    """Mark the snapshot volume as holding all the dependencies, once they are resolved into it."""
+    if not _run_in_volume(volume, f"touch /snapshot/{SNAPSHOT_MARKER}", timeout):
+        logging.warning(f"Could not mark snapshot volume {volume} as complete")
+        return False
+    return True
+
+
+def remove_snapshot(volume: str, timeout=60) -> bool:
+    """Remove a snapshot volume, ex) once its repo changed dependencies. Fails while containers use it."""
+    try:
+        output = subprocess.run(["docker", "volume", "rm", volume], capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return output.returncode == 0
@@ -0,0 +1,105 @@
+import logging
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from filelock import FileLock, Timeout
+
+
+DEFAULT_LOCK_DIR = Path(tempfile.gettempdir()) / "plum-docker-images"
+"""Directory of the per image lock files, shared by every Plum process of the host."""
+
+
+def is_image_local(image_ref: str) -> bool:
+    """Whether the image, as `image:tag`, is already in the local Docker image store."""
+    try:
+        output = subprocess.run(["docker", "image", "inspect", image_ref], capture_output=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return output.returncode == 0
+
+
+def ensure_image(
+        image_ref: str,
+        archive_dir: Optional[Union[str, Path]] = None,
+        lock_dir: Optional[Union[str, Path]] = None,
+        timeout=1800,
+    ) -> bool:
+    """
+    Make an image local, loading it from an archive or pulling it, unless it already is.
+    A file lock per image makes concurrent callers, across processes, wait for a single pull.
+
+    Args:
+        image_ref: Image as `image:tag`.
+        archive_dir: Directory of `docker save` archives, loaded instead of pulling when one exists for the image.
+        lock_dir: Directory of the lock files. Defaults to DEFAULT_LOCK_DIR.
+        timeout: Time in seconds to wait for the lock and for the pull.
+
+    Returns:
+        Whether the image is local.
+    """
+    if is_image_local(image_ref):
+        return True
+
+    lock_dir = Path(lock_dir) if lock_dir is not None else DEFAULT_LOCK_DIR
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        with FileLock(lock_dir / f"{_file_name(image_ref)}.lock", timeout=timeout):
+            # Another process may have pulled the image while this one waited.
+            if is_image_local(image_ref):
+                return True
+
+            archive = Path(archive_dir) / f"{_file_name(image_ref)}.tar" if archive_dir is not None else None
+            if archive is not None and archive.is_file():
+                command = ["docker", "load", "-i", str(archive)]
+            else:
+                command = ["docker", "pull", image_ref]
+
+            logging.info(f"Fetching Docker image {image_ref}: {' '.join(command)}")
+            try:
+                output = subprocess.run(command, capture_output=True, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                logging.error(f"Timeout fetching Docker image {image_ref}")
+                return False
+            except OSError as e:
+                logging.error(f"Failed to fetch Docker image {image_ref}: {e}")
+                return False
+
+            if output.returncode != 0:
+                logging.error(f"Failed to fetch Docker image {image_ref}: {output.stderr.decode('utf-8')}")
+                return False
+            return True
+    except Timeout:
+        logging.error(f"Timeout waiting for another process to fetch Docker image {image_ref}")
+        return False
+
+
+def ensure_images(
+        image_refs: Iterable[str],
+        max_workers: int = 4,
+        archive_dir: Optional[Union[str, Path]] = None,
+        lock_dir: Optional[Union[str, Path]] = None,
+        timeout=1800,
+    ) -> Dict[str, bool]:
+    """
+    Make a set of images local with bounded concurrency, see `ensure_image`.
+
+    Returns:
+        Dictionary of image to whether it is local.
+    """
+    image_refs = sorted(set(image_refs))
+    if not image_refs:
+        return {}
+
+    def fetch(image_ref):
+        return ensure_image(image_ref, archive_dir, lock_dir, timeout)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(image_refs)))) as executor:
+        return dict(zip(image_refs, executor.map(fetch, image_refs)))
+
+
+def _file_name(image_ref: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", image_ref)
@@ -2,27 +2,82 @@ import logging
 import os
 import shlex
 import subprocess
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Union
 
+from plum.actions._cache_volumes import get_cache_volumes
+from plum.actions._containers import get_container_options, kill_container, new_container_name, track_container, untrack_container
+from plum.actions._execution_backend import CommandResult, ExecutionBackend
+from plum.actions._output_capture import LineParser
 from plum.configuration.detailed_configuration_model import EnvironmentConfig
 
-class DockerRunner:
-    def __init__(self, image: str, tag: str, mount_dir: str="/app"):
+
+@dataclass(frozen=True)
+class ContainerLimits:
+    """CPU and memory limits of a container, as given to `docker run`."""
+    cpus: Optional[float] = None
+    """Number of CPUs the container may use, ex) 2.5. None for no limit."""
+    memory: Optional[str] = None
+    """Memory the container may use, ex) 4g. None for no limit."""
+
+    def get_options(self) -> List[str]:
+        """`docker run` options applying the limits."""
+        options = []
+        if self.cpus:
+            options += ["--cpus", f"{self.cpus:g}"]
+        if self.memory:
+            # Same swap limit as memory, so a container over its limit is killed rather than swapping the host.
+            options += ["--memory", self.memory, "--memory-swap", self.memory]
+        return options
+
+
+_container_limits = ContainerLimits()
+
+
+def set_container_limits(limits: Optional[ContainerLimits]):
+    """Set the limits of the containers started by the current process, ex) as the initializer of the worker processes."""
+    global _container_limits
+    _container_limits = limits or ContainerLimits()
+
+
+def get_container_limits() -> ContainerLimits:
+    """Limits of the containers started by the current process."""
+    return _container_limits
+
+
+class DockerRunner(ExecutionBackend):
+    def __init__(
+            self,
+            image: str,
+            tag: str,
+            mount_dir: str="/app",
+            volumes: Optional[Dict[str, str]] = None,
+            cache_volumes: bool = True,
+            limits: Optional[ContainerLimits] = None,
+        ):
         self.image = image
         """Docker image to use."""
         self.tag = tag
         """Docker tag to use."""
         self.mount_dir = DockerRunner.sterilize_path(mount_dir)
         """Directory inside the Docker container where the repo will be mounted."""
+        self.volumes = dict(volumes) if volumes else {}
+        """Additional volumes to mount, mapping a host path or named volume to a path inside the container."""
+        self.cache_volumes = cache_volumes
+        """Whether to mount the shared package cache volumes of the image's ecosystem, see `_cache_volumes`."""
+        self.limits = limits
+        """CPU and memory limits of the containers. Defaults to those of the process, see `set_container_limits`."""
 
     def run(
             self,
             command: str,
             repo_path: str,
             relative_work_dir: Optional[str] = None,
-            timeout=60
-        ) -> Tuple[int, str, str]:
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
         """
         Run a command inside a Docker container.
 
@@ -31,21 +86,26 @@ class DockerRunner:
             repo_path: Full path to the repo.
             relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
             timeout: Time in seconds before the command times out.
+            parsers: Parsers fed the stdout lines while the command runs, see `_output_capture`.
+            env: Environment variables set inside the container.
 
         Returns:
-            Tuple of (return code, stdout, stderr)
+            Tuple of (return code, stdout, stderr), only the head and tail of long outputs.
         """
-        docker_portion = self._get_docker_command(repo_path, relative_work_dir)
+        name = new_container_name()
+        docker_portion = self._get_docker_command(repo_path, relative_work_dir, env, name)
         full_command = docker_portion + " " + command
-        return self._run_command(full_command, timeout)
+        return self._run_command(full_command, timeout, parsers, name)
 
     def run_multi_command(
             self,
             commands: list[str],
             repo_path: str,
             relative_work_dir: Optional[str] = None,
-            timeout=60
-        ) -> Tuple[int, str, str]:
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
         """
         Run multiple commands inside a Docker container.
 
@@ -54,15 +114,18 @@ class DockerRunner:
             repo_path: Full path to the repo.
             relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
             timeout: Time in seconds before the command times out.
+            parsers: Parsers fed the stdout lines while the commands run, see `_output_capture`.
+            env: Environment variables set inside the container.
 
         Returns:
-            Tuple of (return code, stdout, stderr)
+            Tuple of (return code, stdout, stderr), only the head and tail of long outputs.
         """
-        docker_portion = self._get_docker_command(repo_path, relative_work_dir)
+        name = new_container_name()
+        docker_portion = self._get_docker_command(repo_path, relative_work_dir, env, name)
         shell_commands = f'sh -c "{" && ".join(commands)}"'
         full_command = docker_portion + " " + shell_commands
 
-        return self._run_command(full_command, timeout)
+        return self._run_command(full_command, timeout, parsers, name)
 
     def get_config(self) -> dict:
         """Get the Docker configuration."""
@@ -83,7 +146,9 @@ class DockerRunner:
     def _get_docker_command(
             self,
             repo_path: Union[Path, str],
-            relative_work_dir: Optional[str] = None
+            relative_work_dir: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None,
+            name: Optional[str] = None,
         ) -> str:
         """
         Create the docker portion of the command.
@@ -91,34 +156,71 @@ class DockerRunner:
         Args:
             repo_path: Full path to the repo.
             relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
-            mount_dir: Directory inside the Docker container where the repo will be mounted.
+            env: Environment variables set inside the container.
+            name: Name of the container, labelled as started by Plum, see `_containers`. None for an anonymous container.
         """
-        # Ready the repo path for the command
-        sterilized_repo_path = DockerRunner.sterilize_path(repo_path)
-
-        # Default to the root of the repo if no work dir is specified
+        return shlex.join([
+            "docker", "run",
+            "--rm", # Remove the container after execution.
+            *self._get_run_options(repo_path, relative_work_dir, env, name),
+            f"{self.image}:{self.tag}", # Image and tag to use.
+        ])
+
+    def _get_run_options(
+            self,
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None,
+            name: Optional[str] = None,
+        ) -> List[str]:
+        """`docker run` options naming, limiting and mounting a container, and setting its environment and working directory."""
+        # Name the container, to kill it on timeout.
+        options = get_container_options(name) if name else []
+        options += self._get_limits().get_options()
+        # Mount the repo folder, then any additional volumes (e.g. tool and package caches) next to it.
+        options += ["-v", f"{DockerRunner.sterilize_path(repo_path)}:{self.mount_dir}"]
+        for source, target in self._get_volumes().items():
+            options += ["-v", f"{DockerRunner.sterilize_path(source)}:{target}"]
+        for key, value in (env or {}).items():
+            options += ["-e", f"{key}={value}"]
+        return options + ["-w", self._get_work_dir(relative_work_dir)]
+
+    def _get_work_dir(self, relative_work_dir: Optional[str] = None) -> str:
+        """Directory inside the container to run in. Defaults to the root of the repo if no work dir is specified."""
         if relative_work_dir:
-            relative_work_dir = DockerRunner.sterilize_path(relative_work_dir)
-            absolute_work_dir = os.path.join(self.mount_dir, relative_work_dir)
-        else:
-            absolute_work_dir = self.mount_dir
-
-        docker_portion = (
-            "docker run "
-            "--rm " # Remove the container after execution.
-            f"-v {sterilized_repo_path}:{self.mount_dir} " # Mount repo folder into container.
-            f"-w {absolute_work_dir} " # Set working directory inside container.
-            f"{self.image}:{self.tag}" # Image and tag to use.
-        )
-        return docker_portion
-
-    def _run_command(self, command: str, timeout: int) -> Tuple[int, str, str]:
+            return os.path.join(self.mount_dir, DockerRunner.sterilize_path(relative_work_dir))
+        return self.mount_dir
+
+    def _get_limits(self) -> ContainerLimits:
+        return self.limits if self.limits is not None else get_container_limits()
+
+    def _get_volumes(self) -> Dict[str, str]:
+        # Resolved per command, the image may change, ex) when the BuildManager recovers with another SDK.
+        volumes = get_cache_volumes(self.image) if self.cache_volumes else {}
+        # Volumes given explicitly replace the cache volumes mounted at the same path, ex) a dependency snapshot.
+        volumes = {source: target for source, target in volumes.items() if target not in self.volumes.values()}
+        volumes.update(self.volumes)
+        return volumes
+
+    def _run_command(
+            self,
+            command: str,
+            timeout: int,
+            parsers: Iterable[LineParser] = (),
+            name: Optional[str] = None,
+        ) -> CommandResult:
+        if name is not None:
+            track_container(name)
         try:
-            output = subprocess.run(shlex.split(command), capture_output=True, timeout=timeout)
+            output = self._execute(shlex.split(command), timeout, parsers)
         except subprocess.TimeoutExpired:
             logging.error(f"Command timeout: {command}")
-            return 1, "", "Timeout"
-
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
-        return output.returncode, stdout, stderr
+            # Killing the docker client leaves the container running.
+            if name is not None:
+                kill_container(name)
+            return CommandResult.timeout()
+        finally:
+            if name is not None:
+                untrack_container(name)
+
+        return CommandResult.of(output)
@@ -0,0 +1,241 @@
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from plum.actions._containers import kill_container, new_container_name, track_container
+from plum.actions._docker_runner import ContainerLimits, DockerRunner
+from plum.actions._execution_backend import CommandResult
+from plum.actions._output_capture import LineParser
+
+
+class DockerSession(DockerRunner):
+    """
+    Long-lived Docker container for running many commands against the same repo.
+
+    `DockerRunner` starts a new container for every command. A session starts one detached container
+    with the repo mounted, then runs each command in it with `docker exec`, so build tool caches, daemons
+    and compiled outputs kept inside the container survive from one command to the next.
+
+    `run` and `run_multi_command` take the same arguments as those of `DockerRunner`, and the containers are
+    started with the same options, so a session can be passed wherever a runner is expected. The container is started on first use, and started again when the
+    repo, image, tag or volumes changed since, ex) when the `BuildManager` recovers with another SDK image.
+    """
+    IDLE_COMMAND = "trap 'exit 0' TERM; while :; do sleep 3600 & wait; done"
+    """Keeps the container idle until stopped, surviving `kill -9 -1` from a reset."""
+
+    def __init__(
+            self,
+            image: str,
+            tag: str,
+            mount_dir: str = "/app",
+            volumes: Optional[Dict[str, str]] = None,
+            cache_volumes: bool = True,
+            limits: Optional[ContainerLimits] = None,
+        ):
+        super().__init__(image, tag, mount_dir, volumes, cache_volumes, limits)
+
+        self.container_id: Optional[str] = None
+        """ID of the running container, None when the session is not started."""
+        self.repo_path: Optional[str] = None
+        """Full path to the repo mounted in the running container."""
+
+        self._started_config: Optional[tuple] = None
+        self._start_lock = threading.Lock()
+
+    def start(self, repo_path: Union[Path, str], timeout=120) -> str:
+        """
+        Start the session container with the repo mounted. Does nothing if it is already running.
+
+        Args:
+            repo_path: Full path to the repo.
+            timeout: Time in seconds to wait for the container to start.
+
+        Returns:
+            ID of the container.
+        """
+        if self.is_alive():
+            return self.container_id
+
+        command = self._get_start_command(repo_path)
+        try:
+            output = subprocess.run(command, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Timeout starting Docker session for {repo_path}")
+        if output.returncode != 0:
+            raise RuntimeError(f"Failed to start Docker session for {repo_path}: {output.stderr.decode('utf-8')}")
+
+        self.container_id = output.stdout.decode("utf-8").strip()
+        track_container(self.container_id)
+        self.repo_path = DockerRunner.sterilize_path(repo_path)
+        self._started_config = self._get_container_config(repo_path)
+        return self.container_id
+
+    def is_alive(self) -> bool:
+        """Whether the session container is running."""
+        if self.container_id is None:
+            return False
+        output = subprocess.run(
+            ["docker", "inspect", "-f", "{{.State.Running}}", self.container_id],
+            capture_output=True,
+        )
+        return output.returncode == 0 and output.stdout.decode("utf-8").strip() == "true"
+
+    def exec(
+            self,
+            command: str,
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """
+        Run a shell command inside the session container.
+
+        Args:
+            command: Command to run, interpreted by `sh -c`.
+            relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
+            timeout: Time in seconds before the command times out. The command keeps running inside the container
+                when the docker client is killed, so the container is reset on timeout.
+            parsers: Parsers fed the stdout lines while the command runs, see `_output_capture`.
+            env: Environment variables set for the command.
+
+        Returns:
+            Tuple of (return code, stdout, stderr), only the head and tail of long outputs.
+        """
+        if self.container_id is None:
+            raise RuntimeError("Docker session is not started")
+
+        try:
+            output = self._execute(self._get_exec_command(command, relative_work_dir, env), timeout, parsers)
+        except subprocess.TimeoutExpired:
+            logging.error(f"Command timeout in Docker session {self.container_id}: {command}")
+            self.reset()
+            return CommandResult.timeout()
+
+        return CommandResult.of(output)
+
+    def run(
+            self,
+            command: str,
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """
+        Run a command in the session container of the repo, like `DockerRunner.run`.
+
+        Args:
+            command: Command to run inside the Docker container.
+            repo_path: Full path to the repo.
+            relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
+            timeout: Time in seconds before the command times out.
+            parsers: Parsers fed the stdout lines while the command runs, see `_output_capture`.
+            env: Environment variables set for the command.
+
+        Returns:
+            Tuple of (return code, stdout, stderr)
+        """
+        self._ensure_started(repo_path)
+        return self.exec(command, relative_work_dir, timeout, parsers, env)
+
+    def run_multi_command(
+            self,
+            commands: List[str],
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """
+        Run multiple commands in the session container of the repo, like `DockerRunner.run_multi_command`.
+
+        Args:
+            commands: List of commands to run inside the Docker container, stopping at the first failure.
+            repo_path: Full path to the repo.
+            relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
+            timeout: Time in seconds before the commands time out.
+            parsers: Parsers fed the stdout lines while the commands run, see `_output_capture`.
+            env: Environment variables set for the commands.
+
+        Returns:
+            Tuple of (return code, stdout, stderr)
+        """
+        return self.run(" && ".join(commands), repo_path, relative_work_dir, timeout, parsers, env)
+
+    def reset(self):
+        """Kill every process running in the container besides its idle loop, ex) commands left over by a timeout."""
+        if self.container_id is None:
+            return
+        try:
+            output = subprocess.run(
+                ["docker", "exec", self.container_id, "sh", "-c", "kill -9 -1"], capture_output=True, timeout=60
+            )
+        except subprocess.TimeoutExpired:
+            output = None
+        if output is None or output.returncode not in (0, 1):
+            # The container is unresponsive, start over with a new one.
+            self.close()
+
+    def close(self):
+        """Stop and remove the session container."""
+        if self.container_id is None:
+            return
+        kill_container(self.container_id)
+        self.container_id = None
+
+    def get_config(self) -> dict:
+        """Get the Docker configuration."""
+        return {
+            "type": "docker_session",
+            "image": self.image,
+            "tag": self.tag,
+            "work_dir": self.mount_dir,
+        }
+
+    def _ensure_started(self, repo_path: Union[Path, str]):
+        """Start the container, or restart it if it was started for another repo or configuration."""
+        with self._start_lock:
+            if self.container_id is not None and self._started_config != self._get_container_config(repo_path):
+                self.close()
+            self.start(repo_path)
+
+    def _get_container_config(self, repo_path: Union[Path, str]) -> tuple:
+        return (
+            DockerRunner.sterilize_path(repo_path),
+            self.image,
+            self.tag,
+            self.mount_dir,
+            tuple(sorted(self._get_volumes().items())),
+        )
+
+    def _get_start_command(self, repo_path: Union[Path, str]) -> List[str]:
+        return [
+            "docker", "run",
+            "-d", # Detached, the container outlives this command.
+            "--rm", # Remove the container once stopped.
+            *self._get_run_options(repo_path, name=new_container_name()),
+            "--entrypoint", "sh", # Images may define an entrypoint that exits immediately.
+            f"{self.image}:{self.tag}",
+            "-c", DockerSession.IDLE_COMMAND,
+        ]
+
+    def _get_exec_command(
+            self,
+            command: str,
+            relative_work_dir: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None,
+        ) -> List[str]:
+        env_options = [option for name, value in (env or {}).items() for option in ("-e", f"{name}={value}")]
+        work_dir = self._get_work_dir(relative_work_dir)
+        return ["docker", "exec", *env_options, "-w", work_dir, self.container_id, "sh", "-c", command]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,133 @@
+import logging
+import shlex
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from plum.actions._output_capture import LineParser, run_captured
+
+
+@dataclass
+class ExecutionMetrics:
+    """Timing of a command, reported the same way by every execution backend."""
+    backend: str
+    """Type of the backend the command ran in, as in its get_config."""
+    command: str
+    """Command as run by the backend, ex) with its docker or sandbox prefix."""
+    duration: float
+    """Seconds from starting the command to its end, including any container startup."""
+    returncode: Optional[int]
+    """Return code of the command, None if it timed out or could not start."""
+    timed_out: bool
+    """Whether the command was killed on timeout."""
+
+
+class CommandResult(tuple):
+    """
+    (return code, stdout, stderr) of a command, returned by every execution backend, with whether it timed out.
+    Unpacks and compares like the plain tuple, a timeout is (1, "", "Timeout").
+    """
+    timed_out: bool
+    """Whether the command was killed on timeout. A command printing "Timeout" itself is not."""
+
+    def __new__(cls, returncode: int, stdout: str, stderr: str, timed_out: bool = False):
+        result = super().__new__(cls, (returncode, stdout, stderr))
+        result.timed_out = timed_out
+        return result
+
+    @staticmethod
+    def timeout() -> "CommandResult":
+        """Result of a command killed on timeout."""
+        return CommandResult(1, "", "Timeout", timed_out=True)
+
+    @staticmethod
+    def of(output: subprocess.CompletedProcess) -> "CommandResult":
+        """Result of a command that finished."""
+        return CommandResult(output.returncode, output.stdout, output.stderr)
+
+
+class ExecutionBackend(ABC):
+    """
+    Where the commands running repo code execute: a new Docker container per command (`DockerRunner`),
+    a long-lived container (`DockerSession`) or a local, optionally sandboxed, process (`LocalProcessBackend`).
+
+    Every backend takes the same arguments and returns a `CommandResult` (return code, stdout, stderr), with
+    `timed_out` set on timeout, so actions and managers can run on any of them. The timing of the last command is in last_metrics.
+    """
+    last_metrics: Optional[ExecutionMetrics] = None
+    """Timing of the last command run."""
+
+    @abstractmethod
+    def run(
+            self,
+            command: str,
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """
+        Run a command against the repo.
+
+        Args:
+            command: Command to run.
+            repo_path: Full path to the repo.
+            relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
+            timeout: Time in seconds before the command times out.
+            parsers: Parsers fed the stdout lines while the command runs, see `_output_capture`.
+            env: Environment variables set for the command, on top of those of the backend.
+
+        Returns:
+            Tuple of (return code, stdout, stderr), only the head and tail of long outputs, see `CommandResult`.
+        """
+
+    @abstractmethod
+    def run_multi_command(
+            self,
+            commands: List[str],
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """Run multiple commands against the repo, stopping at the first failure. Same arguments as `run`."""
+
+    @abstractmethod
+    def get_config(self) -> dict:
+        """Get the configuration of the backend, its type first."""
+
+    def close(self):
+        """Release what the backend holds, ex) its container."""
+
+    def _execute(
+            self,
+            command: List[str],
+            timeout,
+            parsers: Iterable[LineParser] = (),
+            cwd: Optional[Union[Path, str]] = None,
+            env: Optional[Dict[str, str]] = None,
+        ) -> subprocess.CompletedProcess:
+        """Run the final command, keeping only the head and tail of its output, and record its metrics."""
+        start = time.monotonic()
+        returncode, timed_out = None, False
+        try:
+            output = run_captured(command, timeout=timeout, parsers=parsers, cwd=cwd, env=env)
+            returncode = output.returncode
+            return output
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            raise
+        finally:
+            self.last_metrics = ExecutionMetrics(
+                backend=self.get_config()["type"],
+                command=shlex.join(command),
+                duration=time.monotonic() - start,
+                returncode=returncode,
+                timed_out=timed_out,
+            )
+            logging.debug(f"Execution metrics: {self.last_metrics}")
@@ -0,0 +1,142 @@
+import functools
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from plum.actions._execution_backend import CommandResult, ExecutionBackend
+from plum.actions._output_capture import LineParser
+
+
+_UNSHARE_OPTIONS = ["--user", "--map-root-user", "--pid", "--fork", "--kill-child", "--mount-proc"]
+"""New user, PID and mount namespaces: the command sees only its own processes, all killed with it."""
+
+
+@functools.lru_cache(maxsize=None)
+def is_unshare_available(isolate_network: bool = False) -> bool:
+    """Whether unprivileged namespaces can be created with `unshare`, ex) not on Windows, macOS or locked down kernels."""
+    if shutil.which("unshare") is None:
+        return False
+    command = ["unshare", *_UNSHARE_OPTIONS, *(["--net"] if isolate_network else []), "true"]
+    try:
+        return subprocess.run(command, capture_output=True, timeout=10).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+class LocalProcessBackend(ExecutionBackend):
+    """
+    Runs commands as local processes, without the overhead of starting a container, ex) for Python and
+    JavaScript repos whose tools are installed on the host.
+
+    With `sandbox=True`, commands run in their own Linux namespaces through `unshare`: they cannot see or signal
+    other processes, and every process they start is killed with them on timeout. Resource limits are applied
+    with `prlimit`. Where those tools are missing, commands run as plain processes.
+    """
+    def __init__(
+            self,
+            sandbox: bool = True,
+            isolate_network: bool = False,
+            memory_bytes: Optional[int] = None,
+            cpu_seconds: Optional[int] = None,
+            max_open_files: Optional[int] = None,
+            env: Optional[Dict[str, str]] = None,
+        ):
+        """
+        Args:
+            sandbox: Whether to run the commands in their own namespaces, where available.
+            isolate_network: Whether the sandboxed commands lose network access, ex) to run tests offline.
+            memory_bytes: Address space limit of each process of the commands.
+            cpu_seconds: CPU time limit of each process of the commands.
+            max_open_files: Limit on the number of files each process of the commands opens.
+            env: Environment variables set for every command, on top of those of the current process.
+        """
+        self.sandbox = sandbox
+        """Whether to run the commands in their own namespaces, where available."""
+        self.isolate_network = isolate_network
+        """Whether the sandboxed commands lose network access."""
+        self.memory_bytes = memory_bytes
+        """Address space limit of each process of the commands."""
+        self.cpu_seconds = cpu_seconds
+        """CPU time limit of each process of the commands."""
+        self.max_open_files = max_open_files
+        """Limit on the number of files each process of the commands opens."""
+        self.env = dict(env) if env else {}
+        """Environment variables set for every command."""
+
+    def run(
+            self,
+            command: str,
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """
+        Run a command in the repo, like `DockerRunner.run`.
+
+        Args:
+            command: Command to run, split like a shell would but not interpreted by one.
+            repo_path: Full path to the repo.
+            relative_work_dir: Specific directory inside the repo to run the command in. Defaults to the root of the repo.
+            timeout: Time in seconds before the command times out.
+            parsers: Parsers fed the stdout lines while the command runs, see `_output_capture`.
+            env: Environment variables set for the command.
+
+        Returns:
+            Tuple of (return code, stdout, stderr), only the head and tail of long outputs.
+        """
+        return self._run(shlex.split(command), repo_path, relative_work_dir, timeout, parsers, env)
+
+    def run_multi_command(
+            self,
+            commands: List[str],
+            repo_path: Union[Path, str],
+            relative_work_dir: Optional[str] = None,
+            timeout=60,
+            parsers: Iterable[LineParser] = (),
+            env: Optional[Dict[str, str]] = None,
+        ) -> CommandResult:
+        """Run multiple commands in the repo, stopping at the first failure, like `DockerRunner.run_multi_command`."""
+        return self._run(["sh", "-c", " && ".join(commands)], repo_path, relative_work_dir, timeout, parsers, env)
+
+    def get_config(self) -> dict:
+        """Get the local process configuration."""
+        return {
+            "type": "local",
+            "sandbox": self.sandbox,
+        }
+
+    def _run(self, command: List[str], repo_path, relative_work_dir, timeout, parsers, env) -> CommandResult:
+        work_dir = Path(repo_path) / relative_work_dir if relative_work_dir else Path(repo_path)
+        full_env = {**os.environ, **self.env, **(env or {})} if self.env or env else None
+        try:
+            output = self._execute(self._wrap(command), timeout, parsers, cwd=work_dir, env=full_env)
+        except subprocess.TimeoutExpired:
+            logging.error(f"Command timeout: {shlex.join(command)}")
+            return CommandResult.timeout()
+        return CommandResult.of(output)
+
+    def _wrap(self, command: List[str]) -> List[str]:
+        """Prefix the command with the sandbox and resource limits available on this host."""
+        prefix = []
+        if self.sandbox and is_unshare_available(self.isolate_network):
+            prefix += ["unshare", *_UNSHARE_OPTIONS, *(["--net"] if self.isolate_network else [])]
+
+        limits = []
+        if self.memory_bytes:
+            limits.append(f"--as={self.memory_bytes}")
+        if self.cpu_seconds:
+            limits.append(f"--cpu={self.cpu_seconds}")
+        if self.max_open_files:
+            limits.append(f"--nofile={self.max_open_files}")
+        if limits:
+            if shutil.which("prlimit") is not None:
+                prefix += ["prlimit", *limits, "--"]
+            else:
+                logging.warning("prlimit is not available, running without resource limits.")
+        return prefix + command
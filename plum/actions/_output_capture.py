@@ -0,0 +1,206 @@
+"""
+Bounded capture of the output of long running commands, ex) Maven and MSBuild logs of hundreds of MB.
+
+The output is read line by line as the command runs: every line goes to the line parsers and, when a log
+directory is set, to a gzip compressed log, while only the head and the tail are kept in memory.
+"""
+import gzip
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Union
+
+HEAD_BYTES = 256 * 1024
+"""Bytes of output kept from the start of a stream."""
+
+TAIL_BYTES = 1024 * 1024
+"""Bytes of output kept from the end of a stream. Build tools report their errors and results last."""
+
+_MAX_LINE_BYTES = 64 * 1024
+"""Longest line read at once, longer lines (ex) progress bars without newlines) are read in pieces."""
+
+_log_dir: Optional[Path] = None
+_log_counter = itertools.count()
+
+
+def set_log_dir(log_dir: Optional[Union[str, Path]]):
+    """Set the directory the full output of the commands of the current process is logged to. None to not log it."""
+    global _log_dir
+    _log_dir = Path(log_dir) if log_dir is not None else None
+
+
+def get_log_dir() -> Optional[Path]:
+    """Directory the full output of the commands of the current process is logged to, if any."""
+    return _log_dir
+
+
+class LineParser:
+    """Parser of a command output, fed line by line while the command runs."""
+    def feed(self, line: str):
+        """Parse the next line, with its line ending."""
+        raise NotImplementedError
+
+    def result(self):
+        """Result of the lines fed so far."""
+        raise NotImplementedError
+
+    def parse(self, text: str):
+        """Parse a whole output at once."""
+        for line in text.splitlines(keepends=True):
+            self.feed(line)
+        return self.result()
+
+
+class OutputCapture:
+    """Head and tail of a stream in memory, every line passed on to the log file and the parsers."""
+    def __init__(
+            self,
+            parsers: Iterable[LineParser] = (),
+            log_file: Optional[IO[bytes]] = None,
+            log_lock: Optional[threading.Lock] = None,
+            head_bytes: int = HEAD_BYTES,
+            tail_bytes: int = TAIL_BYTES,
+        ):
+        self.parsers = list(parsers)
+        """Parsers fed every line."""
+        self.log_file = log_file
+        """Compressed log every line is written to, shared with the other stream of the command."""
+        self.log_lock = log_lock or threading.Lock()
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+
+        self.head: List[bytes] = []
+        self.head_size = 0
+        self.tail: deque = deque()
+        self.tail_size = 0
+        self.omitted_bytes = 0
+        """Bytes of output in neither the head nor the tail."""
+
+    def write(self, line: bytes):
+        """Take the next line of the stream."""
+        if self.log_file is not None:
+            with self.log_lock:
+                # Closed when the command timed out while its children kept writing.
+                if not self.log_file.closed:
+                    self.log_file.write(line)
+
+        if self.parsers:
+            text = line.decode("utf-8", errors="replace")
+            for parser in self.parsers:
+                parser.feed(text)
+
+        if self.head_size < self.head_bytes:
+            self.head.append(line)
+            self.head_size += len(line)
+            return
+        self.tail.append(line)
+        self.tail_size += len(line)
+        while self.tail_size > self.tail_bytes:
+            dropped = self.tail.popleft()
+            self.tail_size -= len(dropped)
+            self.omitted_bytes += len(dropped)
+
+    def consume(self, stream: IO[bytes]):
+        """Take every line of the stream until it is closed."""
+        for line in iter(lambda: stream.readline(_MAX_LINE_BYTES), b""):
+            self.write(line)
+
+    def getvalue(self, log_path: Optional[Path] = None) -> str:
+        """Output kept in memory, with a marker where output was omitted."""
+        text = b"".join(self.head).decode("utf-8", errors="replace")
+        if self.omitted_bytes:
+            full_log = f", full output in {log_path}" if log_path is not None else ""
+            text += f"\n... [{self.omitted_bytes} bytes omitted{full_log}] ...\n"
+        return text + b"".join(self.tail).decode("utf-8", errors="replace")
+
+
+def run_captured(
+        command: List[str],
+        timeout: Optional[float] = None,
+        parsers: Iterable[LineParser] = (),
+        stderr_parsers: Iterable[LineParser] = (),
+        log_path: Optional[Union[str, Path]] = None,
+        cwd: Optional[Union[str, Path]] = None,
+        env: Optional[dict] = None,
+        head_bytes: int = HEAD_BYTES,
+        tail_bytes: int = TAIL_BYTES,
+    ) -> subprocess.CompletedProcess:
+    """
+    Run a command like `subprocess.run(command, capture_output=True, timeout=timeout)`, keeping only the head
+    and tail of its output in memory.
+
+    Args:
+        command: Command to run.
+        timeout: Time in seconds before the command is killed and subprocess.TimeoutExpired raised.
+        parsers: Parsers fed the stdout lines as they come.
+        stderr_parsers: Parsers fed the stderr lines as they come.
+        log_path: Gzip file the full output is written to. Defaults to a new file in the log directory of the
+            process, see `set_log_dir`, or no log.
+        cwd: Working directory of the command.
+        env: Environment of the command.
+        head_bytes: Bytes kept from the start of each stream.
+        tail_bytes: Bytes kept from the end of each stream.
+
+    Returns:
+        CompletedProcess with stdout and stderr decoded as str.
+    """
+    if log_path is None and _log_dir is not None:
+        log_path = _log_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_log_counter)}.log.gz"
+    log_file = None
+    if log_path is not None:
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_file = gzip.open(log_path, "wb")
+
+    log_lock = threading.Lock()
+    stdout = OutputCapture(parsers, log_file, log_lock, head_bytes, tail_bytes)
+    stderr = OutputCapture(stderr_parsers, log_file, log_lock, head_bytes, tail_bytes)
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        # In its own process group, so the children it leaves running in the background can be killed with it.
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, env=env, start_new_session=True)
+        readers = [
+            threading.Thread(target=capture.consume, args=(stream,), daemon=True)
+            for capture, stream in ((stdout, process.stdout), (stderr, process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+
+        try:
+            process.wait(timeout=timeout)
+            # Children of the command may still hold the pipes open after it exited, ex) `sleep 60 &`.
+            for reader in readers:
+                reader.join(timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+            if any(reader.is_alive() for reader in readers):
+                raise subprocess.TimeoutExpired(command, timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            # Children that left the process group may still hold the pipes open, do not wait for them for long.
+            for reader in readers:
+                reader.join(timeout=5)
+            raise subprocess.TimeoutExpired(command, timeout, stdout.getvalue(log_path), stderr.getvalue(log_path))
+        except BaseException:
+            _kill_process_group(process)
+            raise
+    finally:
+        if log_file is not None:
+            with log_lock:
+                log_file.close()
+
+    return subprocess.CompletedProcess(command, process.returncode, stdout.getvalue(log_path), stderr.getvalue(log_path))
+
+
+def _kill_process_group(process: subprocess.Popen):
+    """Kill a process started in a new session along with the children it left in its process group."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+    process.wait()
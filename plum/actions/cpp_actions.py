@@ -16,6 +16,7 @@ from plum.harnesslib.languages import Language
 import plum.harnesslib.tasks as tasks
 
 from plum.environments.repository import Repository
+from plum.actions._containers import run_container
 from plum.actions.actions import Actions
 from plum.utils.logger import Logger
 
@@ -80,16 +81,14 @@ class CppActions(Actions):
     def create_executable_script(self, script_content, script_name):
         try:
             command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} /bin/bash -c 'echo {script_content} > {script_name} && chmod +x {script_name}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
+            output = run_container(shlex.split(command), timeout=TIMEOUT)
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        stdout = output.stdout
+        stderr = output.stderr
         result = {
             "stdout": stdout,
             "stderr": stderr,
@@ -109,16 +108,14 @@ class CppActions(Actions):
         try:
             script_path = os.path.join(os.path.join("/scripts", self.repo_name),"build.sh")
             command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} /bin/bash -c {script_path}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
+            output = run_container(shlex.split(command), timeout=TIMEOUT)
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        stdout = output.stdout
+        stderr = output.stderr
         status_result = self.parse_build(stdout, stderr)
         result = {
             "status_result": status_result,
@@ -140,17 +137,15 @@ class CppActions(Actions):
         try:
             script_path = os.path.join(os.path.join("/scripts", self.repo_name),"test.sh")
             command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} /bin/bash -c {script_path}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=timeout
-            )
+            output = run_container(shlex.split(command), timeout=timeout)
 
         except subprocess.TimeoutExpired:
             Logger().get_logger().error(f"TimeoutExpired: Your timeout is currently {timeout}s. Increase timeout if needed")
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        stdout = output.stdout
+        stderr = output.stderr
         test_results = self.parse_test(stdout)
         result = {
             "status_result": test_results,
@@ -175,16 +170,14 @@ class CppActions(Actions):
         """
         try:
             command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} sh -c 'rm -rf {build_folder}'"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
+            output = run_container(shlex.split(command), timeout=TIMEOUT)
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        stdout = output.stdout
+        stderr = output.stderr
         result = {
             "stdout": stdout,
             "stderr": stderr,
@@ -203,14 +196,14 @@ class CppActions(Actions):
         """
         try:
             command = f'docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} {command}'
-            output = subprocess.run(shlex.split(command), capture_output=True, timeout=TIMEOUT)
+            output = run_container(shlex.split(command), timeout=TIMEOUT)
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        stdout = output.stdout
+        stderr = output.stderr
         result = {"stdout": stdout, "stderr": stderr}
         return result
 
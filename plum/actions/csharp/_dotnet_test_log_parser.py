@@ -0,0 +1,31 @@
+import re
+from typing import Optional
+
+from plum.actions._output_capture import LineParser
+
+
+class DotnetTestParser(LineParser):
+    """Incremental parser of the first `dotnet test` summary line, fed the output line by line while the tests run."""
+    _summary_regex = re.compile(
+        r'(Failed|Passed)!\s+-\s+Failed:\s+(\d+),\s+Passed:\s+(\d+),\s+Skipped:\s+(\d+),\s+Total:\s+(\d+)'
+    )
+
+    def __init__(self):
+        self.summary: Optional[dict] = None
+
+    def feed(self, line: str):
+        if self.summary is not None:
+            return
+        match = DotnetTestParser._summary_regex.search(line)
+        if match:
+            self.summary = {
+                'status': match.group(1),
+                'failed': int(match.group(2)),
+                'passed': int(match.group(3)),
+                'skipped': int(match.group(4)),
+                'total': int(match.group(5))
+            }
+
+    def result(self) -> Optional[dict]:
+        """Numbers of failed, passed, skipped and total tests with the status of the first summary, None if there is none."""
+        return self.summary
@@ -2,6 +2,7 @@ from typing import List
 import re
 
 
+from plum.actions._output_capture import LineParser
 from plum.actions.csharp._log_types import (
     ErrorType,
     MSBuildError,
@@ -26,26 +27,42 @@ class BuildLog:
 
     @staticmethod
     def parse(log_text: str):
-        version = BuildLog._extract_version(log_text)
-        errors = BuildLog._extract_errors(log_text)
-        return BuildLog(version, errors)
+        return BuildLogParser().parse(log_text)
 
-    @staticmethod
-    def _extract_version(log_text: str):
-        match = re.search(r'MSBuild version (\d+\.\d+\.\d+\+\d+)', log_text)
-        return match.group(1) if match else None
+    def __str__(self):
+        output = [f"MSBuild Version: {self.version}"]
+        for error in self.errors:
+            output.append(f"Project File: {error.project_file}" if error.project_file else "")
+            output.append(f"Solution File: {error.solution_file}" if error.solution_file else "")
+            output.append(f"Error Code: {error.code}")
+            output.append(f"Error Message: {error.message}")
+            output.append(f"More Info: {error.url}")
+        return "\n".join(output)
 
-    @staticmethod
-    def _extract_errors(log_text: str) -> List[ErrorType]:
-        errors = []
+
+class BuildLogParser(LineParser):
+    """Incremental `BuildLog.parse`, fed the MSBuild output line by line while the build runs."""
+    _version_regex = re.compile(r'MSBuild version (\d+\.\d+\.\d+\+\d+)')
+
+    def __init__(self):
+        self.version = None
+        self.msbuild_errors: List[MSBuildError] = []
+        self.nuget_errors: List[NuGetError] = []
+        self.netsdk_errors: List[NETSDKError] = []
+
+    def feed(self, line: str):
+        if self.version is None:
+            match = BuildLogParser._version_regex.search(line)
+            if match:
+                self.version = match.group(1)
 
         # The log may or may not have "Build FAILED." in the middle; but if it does, we use the part after it.
-        failed_section = log_text.split("Build FAILED.\n")[-1]
+        if line.endswith("Build FAILED.\n"):
+            self.msbuild_errors, self.nuget_errors, self.netsdk_errors = [], [], []
+            return
 
-        # Match MSBuild errors
-        msbuild_errors = BuildLog._msbuild_regex.findall(failed_section)
-        for error in msbuild_errors:
-            errors.append(
+        for error in BuildLog._msbuild_regex.findall(line):
+            self.msbuild_errors.append(
                 MSBuildError(
                     code=error[0],
                     message=error[1],
@@ -53,10 +70,8 @@ class BuildLog:
                 )
             )
 
-        # Match NuGet errors
-        nuget_errors = BuildLog._nuget_regex.findall(failed_section)
-        for error in nuget_errors:
-            errors.append(
+        for error in BuildLog._nuget_regex.findall(line):
+            self.nuget_errors.append(
                 NuGetError(
                     code=error[1],
                     message=error[2],
@@ -66,11 +81,9 @@ class BuildLog:
                 )
             )
 
-        # Match NETSDK errors
-        netsdk_issues = BuildLog._netsdk_regex.findall(failed_section)
-        for issue in netsdk_issues:
+        for issue in BuildLog._netsdk_regex.findall(line):
             file_path, line_number, char_number, _, code, message, project_file = issue
-            errors.append(
+            self.netsdk_errors.append(
                 NETSDKError(
                     code=code,
                     message=message,
@@ -81,14 +94,6 @@ class BuildLog:
                     project_file=project_file
                 )
             )
-        return errors
 
-    def __str__(self):
-        output = [f"MSBuild Version: {self.version}"]
-        for error in self.errors:
-            output.append(f"Project File: {error.project_file}" if error.project_file else "")
-            output.append(f"Solution File: {error.solution_file}" if error.solution_file else "")
-            output.append(f"Error Code: {error.code}")
-            output.append(f"Error Message: {error.message}")
-            output.append(f"More Info: {error.url}")
-        return "\n".join(output)
+    def result(self) -> BuildLog:
+        return BuildLog(self.version, self.msbuild_errors + self.nuget_errors + self.netsdk_errors)
@@ -4,12 +4,15 @@ import os
 from pathlib import Path
 import re
 import shlex
-from typing import Union
+from typing import List, Optional, Tuple, Union
 
 
+from plum.actions._docker_images import ensure_image
 from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
 from plum.actions.csharp._log_types import ErrorType
-from plum.actions.csharp._ms_build_log_parser import BuildLog
+from plum.actions.csharp._ms_build_log_parser import BuildLogParser
+from plum.actions.csharp._sln_parser import CsProj
 
 
 class BuildManager:
@@ -18,10 +21,25 @@ class BuildManager:
     The `--no-incremental` flag is used to ensure that the build is not cached.
     """
 
+    DOTNET_SDK_IMAGE = "mcr.microsoft.com/dotnet/sdk"
+    """Image the NETSDK1045 recovery switches to, tagged with the targeted .NET version."""
+
+    DOTNET_FRAMEWORK_IMAGE = ("mcr.microsoft.com/dotnet/framework/sdk", "4.8.1")
+    """Image and tag the MSB3644 recovery switches to for .NET Framework projects."""
+
+    _TARGET_FRAMEWORK_REGEX = re.compile(r'^(?:net|netcoreapp)(\d+)\.(\d+)')
+    """The regex to find the .NET version of a target framework moniker, ex) net8.0 or netcoreapp3.1"""
+
+    _NET_FRAMEWORK_REGEX = re.compile(r'^net[1-4]\d*$')
+    """The regex to find .NET Framework target framework monikers, ex) net48"""
+
+    _SDK_TAG_REGEX = re.compile(r'^(\d+)\.(\d+)')
+    """The regex to find the .NET version of an SDK image tag, ex) 8.0 or 6.0-jammy"""
+
     def __init__(
             self,
             repo_full_path: Union[Path, str],
-            docker_runner: DockerRunner,
+            docker_runner: Union[DockerRunner, DockerSession],
             timeout=60,
             retry_limit=3,
         ):
@@ -50,6 +68,45 @@ class BuildManager:
         self.modified_command = None
         """Modified build command to use. Populated during auto recovery."""
 
+    @staticmethod
+    def predict_images(repo_full_path: Union[Path, str], sdk_tag: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Images the error recovery of a build is expected to switch to, from the target frameworks of the repo's projects.
+        Lets them be pulled before builds start, rather than in the middle of a build.
+
+        Args:
+            repo_full_path: Full path to the repo.
+            sdk_tag: Tag of the .NET SDK image the repo first builds with, ex) 6.0. An SDK builds every older
+                framework, so only newer ones are predicted. Defaults to predicting every framework.
+
+        Returns:
+            List of (image, tag) pairs.
+        """
+        sdk_match = BuildManager._SDK_TAG_REGEX.match(sdk_tag) if sdk_tag else None
+        sdk_version = (int(sdk_match.group(1)), int(sdk_match.group(2))) if sdk_match else None
+        images = set()
+        for csproj_path in Path(repo_full_path).glob("**/*.csproj"):
+            if {"bin", "obj"} & set(csproj_path.parts):
+                continue
+            try:
+                frameworks = CsProj.from_file(str(csproj_path)).target_frameworks
+            except Exception as e:
+                logging.debug(f"Could not read the target frameworks of {csproj_path}: {e}")
+                continue
+
+            for framework in frameworks:
+                framework = framework.strip().lower()
+                version_match = BuildManager._TARGET_FRAMEWORK_REGEX.match(framework)
+                version = (int(version_match.group(1)), int(version_match.group(2))) if version_match else None
+                if version and version >= (2, 0):
+                    # NETSDK1045 recovery, only for frameworks newer than the SDK
+                    if sdk_version is None or version > sdk_version:
+                        images.add((BuildManager.DOTNET_SDK_IMAGE, f"{version[0]}.{version[1]}"))
+                elif BuildManager._NET_FRAMEWORK_REGEX.match(framework):
+                    # MSB3644 recovery
+                    images.add(BuildManager.DOTNET_FRAMEWORK_IMAGE)
+        return sorted(images)
+
     def build(self):
         result = {
             "success": False,
@@ -61,10 +118,12 @@ class BuildManager:
         for i in range(self.retry_limit):
             logging.info(f"Build attempt {i + 1} of {self.retry_limit}: {self.repo_path}")
             command = self._create_shell_command()
+            build_log_parser = BuildLogParser()
             return_code, stdout, stderr = self.docker.run(
                 command=command,
                 repo_path=self.repo_path,
-                timeout=self.timeout
+                timeout=self.timeout,
+                parsers=[build_log_parser],
             )
 
             result["attempt_details"].append({
@@ -92,8 +151,8 @@ class BuildManager:
                 self.timeout = new_timeout
                 continue
 
-            # Parse build output for errors (if your error parsing logic is here)
-            build_log = BuildLog.parse(stdout)
+            # Build output parsed for errors while the build ran, the stdout kept may be truncated.
+            build_log = build_log_parser.result()
 
             # Attempt to recover from known errors (if your error handling logic is here)
             auto_recovery_result = self._handle_known_errors(build_log.errors)
@@ -175,9 +234,8 @@ class BuildManager:
                 """
                 logging.info("Handling error MSB3644: Using .NET Framework Docker image instead of .NET.")
 
-                self.docker.image = 'mcr.microsoft.com/dotnet/framework/sdk'
-                self.docker.tag = '4.8.1'
-                solved.append(True)
+                self.docker.image, self.docker.tag = BuildManager.DOTNET_FRAMEWORK_IMAGE
+                solved.append(ensure_image(f"{self.docker.image}:{self.docker.tag}"))
                 continue
             if error.code == 'NETSDK1045':
                 """
@@ -192,9 +250,9 @@ class BuildManager:
                     f"Using {dotnet_version} Docker image instead of {self.docker.tag}."
                 )
 
-                self.docker.image = 'mcr.microsoft.com/dotnet/sdk'
+                self.docker.image = BuildManager.DOTNET_SDK_IMAGE
                 self.docker.tag = dotnet_version
-                solved.append(True)
+                solved.append(ensure_image(f"{self.docker.image}:{self.docker.tag}"))
                 continue
 
         return zip(errors, solved)
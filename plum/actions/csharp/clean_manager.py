@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import Union
 from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
 
 class CleanManager:
     """Handle C# artifacts cleaning via Docker to avoid ownership issues."""
@@ -10,12 +11,12 @@ class CleanManager:
     def __init__(
             self,
             repo_full_path: Union[Path, str],
-            docker_runner: DockerRunner,
+            docker_runner: Union[DockerRunner, DockerSession],
         ) -> None:
         self.repo_path = Path(repo_full_path)
         """Full path to the repo to clean."""
         self.docker = docker_runner
-        """Docker runner to use for the clean."""
+        """Docker runner, or session, to use for the clean."""
 
     def remove_directory(self) -> tuple[int, str, str]:
         """Remove the entire directory."""
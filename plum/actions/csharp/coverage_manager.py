@@ -1,24 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from glob import glob
 import logging
 import os
 from pathlib import Path
 import re
+import shlex
 from typing import List, Union
 
 
+from plum.actions._cache_volumes import CACHE_VOLUMES
 from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
 from plum.actions.csharp._sln_parser import Solution, CsProj
-from plum.utils.cobertura import parse_xml_as_dict
+from plum.utils.cobertura import adapt_cobertura_report, parse_xml_as_dict
 
 
 class CoverageManager:
-    COVERAGE_INSTALL_COMMAND = "dotnet add package coverlet.collector"
-    """Command to install the coverlet collector package. Do not modify unless the dotnet CLI changes."""
+    # The solution is built once up front, and the restored packages live in the shared NuGet volume,
+    # so the per-project runs can skip the build and restore even across --rm containers.
+    NO_BUILD_COVERAGE_COMMAND = "dotnet test --no-build --no-restore --collect:'XPlat Code Coverage'"
+    """Command to run the coverage command on an already built solution."""
 
-    # NOTE: This command will also build the project.
-    # However due to our --rm design of the DockerRunner, using the --no-build flag will not work.
-    COVERAGE_COMMAND = "dotnet test --collect:'XPlat Code Coverage'"
-    """Command to run the coverage command. Do not modify unless the dotnet CLI changes."""
+    TOOLS_DIR = "/root/.dotnet/tools"
+    """Directory inside the container where global dotnet tools are installed."""
+
+    TOOLS_VOLUME = "plum-dotnet-tools"
+    """Named Docker volume caching the global dotnet tools (dotnet-coverage) between runs."""
+
+    NUGET_PACKAGES_DIR = "/root/.nuget/packages"
+    """Directory inside the container where NuGet restores packages to."""
 
     _ARTIFACT_REGEX = re.compile(r'Attachments:\s+(.*)')
     """The regex to find individual coverage artifacts from the log."""
@@ -29,8 +39,9 @@ class CoverageManager:
     @staticmethod
     def load(
         repo_full_path: Union[Path, str],
-        docker_runner: DockerRunner,
+        docker_runner: Union[DockerRunner, DockerSession],
         timeout=60,
+        max_workers=4,
     ):
         """
         Scan the solution file, find all test projects, check Coverlet status.
@@ -38,6 +49,9 @@ class CoverageManager:
 
         Args:
             repo_full_path: Full path to the repo containing the .sln file.
+            docker_runner: Docker runner to run the coverage commands with.
+            timeout: Timeout in seconds for each coverage command.
+            max_workers: Maximum number of test projects to run concurrently.
 
         Returns:
             Dictionary with 'success', 'error', and 'manager' keys.
@@ -66,6 +80,7 @@ class CoverageManager:
                 test_projects=test_projects,
                 docker_runner=docker_runner,
                 timeout=timeout,
+                max_workers=max_workers,
             )
 
             # Update the result dictionary with success and the manager
@@ -85,21 +100,28 @@ class CoverageManager:
             repo_full_path: Union[Path, str],
             root_solution: Solution,
             test_projects: List[CsProj],
-            docker_runner: DockerRunner,
+            docker_runner: Union[DockerRunner, DockerSession],
             timeout=60,
+            max_workers=4,
         ):
         """
         Args:
             repo_full_path: Full path to the repo to build.
-            docker_work_dir: Working directory inside the Docker container.
-            docker_image: Docker image to use for the build.
-            docker_tag: Docker tag to use for the build.
-            timeout: Timeout in seconds for the build command.
-            retry_limit: Number of times to retry the build command.
+            root_solution: Solution of the repo, built once before the test projects run.
+            test_projects: Test projects of the solution to collect the coverage of.
+            docker_runner: Docker runner whose image, tag, mount directory, volumes and limits the coverage commands use.
+                A `DockerSession`, ex) a pooled container, runs the commands itself.
+            timeout: Timeout in seconds for each coverage command.
+            max_workers: Maximum number of test projects to run concurrently.
         """
         ## Docker Configuration
         self.repo_path = repo_full_path
-        self.docker = docker_runner
+
+        # A session's container, ex) a pooled one, keeps the restored packages and the dotnet-coverage tool
+        # installed by the first coverage run for the following ones.
+        is_session = isinstance(docker_runner, DockerSession)
+        self.docker = docker_runner if is_session else CoverageManager._get_shared_runner(docker_runner)
+        """Runs the coverage commands: the given session, or one container each with the shared volumes mounted."""
 
         self.root_solution = root_solution
         """Solution object for the given solution. TODO: Not sure if this is necessary."""
@@ -109,42 +131,28 @@ class CoverageManager:
         ## Build Parameters
         self.timeout = timeout
         """Timeout in seconds for the build command."""
+        self.max_workers = max(1, max_workers)
+        """Maximum number of test projects to run concurrently."""
 
-    def install_coverlet(self):
+    @staticmethod
+    def _get_shared_runner(docker_runner: DockerRunner) -> DockerRunner:
         """
-        Install the Coverlet collector package.
-
-        Returns:
-            Dictionary with the following keys:
-            - success: Whether the Coverlet installation was successful.
-            - failed_projects: List of projects for which the Coverlet installation failed.
+        Runner of its own, the caller's keeps its volumes, sharing the dotnet tools and the restored packages
+        across all containers of this run, whatever the image. Packages already mounted, ex) a dependency snapshot, are kept.
         """
-        result = {
-            "success": True,
-            "failed_projects": [],
-        }
-
-        for test_project in self.test_projects:
-            relative_work_dir = str(Path(test_project.path).parent)
-
-            return_code, stdout, stderr = self.docker.run(
-                command=CoverageManager.COVERAGE_INSTALL_COMMAND,
-                repo_path=self.repo_path,
-                relative_work_dir=relative_work_dir,
-                timeout=self.timeout,
-            )
-
-            if return_code != 0:
-                logging.error(f"Failed to install Coverlet for project {test_project.name}.")
-                result["failed_projects"].append({
-                    "project": test_project.name,
-                    "error": f"Return code {return_code}",
-                    "stdout": stdout,
-                    "stderr": stderr,
-                })
-                result["success"] = False
-
-        return result
+        volumes = dict(docker_runner.volumes)
+        volumes.setdefault(CoverageManager.TOOLS_VOLUME, CoverageManager.TOOLS_DIR)
+        for volume, path in CACHE_VOLUMES["nuget"].items():
+            if path not in volumes.values():
+                volumes[volume] = path
+        return DockerRunner(
+            docker_runner.image,
+            docker_runner.tag,
+            docker_runner.mount_dir,
+            volumes,
+            cache_volumes=docker_runner.cache_volumes,
+            limits=docker_runner.limits,
+        )
 
     def run_coverage(self):
         """
@@ -164,36 +172,52 @@ class CoverageManager:
         }
 
         try:
-            # Run the coverage command for each test project.
-            failed_projects = []
-            for test_project in self.test_projects:
-                relative_work_dir = str(Path(test_project.path).parent)
-
-                return_code, stdout, stderr = self.docker.run_multi_command(
-                    commands=[
-                        CoverageManager.COVERAGE_INSTALL_COMMAND,
-                        CoverageManager.COVERAGE_COMMAND,
-                    ],
-                    repo_path=self.repo_path,
-                    relative_work_dir=relative_work_dir,
-                    timeout=self.timeout,
-                )
-
-                if return_code != 0:
-                    result["failed_projects"].append({
-                        "project": test_project.name,
-                        "error": f"Return code {return_code}",
-                        "stdout": stdout,
-                        "stderr": stderr,
-                    })
+            # Add Coverlet to every test project and build the solution once, in a single container.
+            return_code, stdout, stderr = self.docker.run_multi_command(
+                commands=self._create_prepare_commands(),
+                repo_path=self.repo_path,
+                timeout=self.timeout,
+            )
+            if return_code != 0:
+                result["error"] = "Failed to build the solution for code coverage."
+                result["failed_projects"].append({
+                    "project": self.root_solution.solution_filename,
+                    "error": f"Return code {return_code}",
+                    "stdout": stdout,
+                    "stderr": stderr,
+                })
+                return result
+
+            # Run the test projects concurrently, collecting their artifacts as each one finishes.
+            artifacts = []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self._run_project_coverage, test_project): test_project
+                    for test_project in self.test_projects
+                }
+                for future in as_completed(futures):
+                    test_project = futures[future]
+                    return_code, stdout, stderr = future.result()
+
+                    if return_code != 0:
+                        result["failed_projects"].append({
+                            "project": test_project.name,
+                            "error": f"Return code {return_code}",
+                            "stdout": stdout,
+                            "stderr": stderr,
+                        })
+
+                    project_artifacts = [
+                        artifact.strip()
+                        for artifact in CoverageManager._ARTIFACT_REGEX.findall(stdout)
+                        if artifact.strip().endswith(".cobertura.xml")
+                    ]
+                    logging.info(f"Coverage finished for {test_project.name}: {len(project_artifacts)} artifact(s).")
+                    artifacts.extend(project_artifacts)
 
             # Merge the coverage reports from all the test projects.
-            merge_commands = [
-                "dotnet tool install --global dotnet-coverage",
-                "/root/.dotnet/tools/dotnet-coverage merge --remove-input-files **/*.cobertura.xml -f cobertura"
-            ]
             return_code, stdout, stderr = self.docker.run_multi_command(
-                commands=merge_commands,
+                commands=self._create_merge_commands(artifacts),
                 repo_path=self.repo_path,
                 timeout=self.timeout,
             )
@@ -220,6 +244,40 @@ class CoverageManager:
 
         return result
 
+    def _run_project_coverage(self, test_project: CsProj):
+        """Run the coverage command for a single test project on the already built solution."""
+        return self.docker.run(
+            command=CoverageManager.NO_BUILD_COVERAGE_COMMAND,
+            repo_path=self.repo_path,
+            relative_work_dir=str(Path(test_project.path).parent),
+            timeout=self.timeout,
+        )
+
+    def _create_prepare_commands(self) -> List[str]:
+        """Commands to add Coverlet to every test project and build the solution once."""
+        commands = [f"git config --global --add safe.directory {self.docker.mount_dir}"]
+        for test_project in self.test_projects:
+            commands.append(f"dotnet add {shlex.quote(test_project.path)} package coverlet.collector")
+        commands.append(f"dotnet build {shlex.quote(self.root_solution.solution_filename)}")
+        return commands
+
+    def _create_merge_commands(self, artifacts: List[str]) -> List[str]:
+        """
+        Commands to merge the given coverage artifacts.
+        The dotnet-coverage tool is only installed when it is missing from the cached tools volume or the session's container.
+        """
+        tool = f"{CoverageManager.TOOLS_DIR}/dotnet-coverage"
+        install_if_missing = (
+            f"mkdir -p {CoverageManager.TOOLS_DIR} && flock {CoverageManager.TOOLS_DIR}/.install.lock "
+            f"sh -c '[ -x {tool} ] || dotnet tool install --global dotnet-coverage'"
+        )
+        # Fall back to globbing when no artifact could be read from the test logs.
+        inputs = " ".join(shlex.quote(artifact) for artifact in artifacts) or "**/*.cobertura.xml"
+        return [
+            install_if_missing,
+            f"{tool} merge --remove-input-files {inputs} -f cobertura",
+        ]
+
     def _docker_to_local_path(self, docker_path: str) -> str:
         """
         Convert a path inside the Docker container to a path on the local machine.
@@ -234,54 +292,12 @@ class CoverageManager:
         local_path = Path(self.repo_path).joinpath(rel_path)
         return str(local_path)
 
-    # TODO: Java has this same method. Refactor to a common method.
     def _adapt_cobertura_report(self, report: dict):
         """
         Adapt the cobertura report to the format that the coverage report expects.
-
-        Mainly carries out two operations.
-        1. Renames the sources
-            The sources point to the docker mount path, which is not the local full path.
+        The sources point to the docker mount path, which is not the local full path.
             ex) old: /app/src/MediatR/
             ex) new: /datadisk/src/tmp/MediatR/src/MediatR
+        See `plum.utils.cobertura.adapt_cobertura_report`.
         """
-        # Check for multiproject repos
-        if '.' in report:
-            if len(report) > 1:
-                logging.warning(f"Found multiple projects in the coverage report. Using aggregated report.")
-            report = report['.']
-
-        # Change the Cobertura source paths to point to the repo full path instead of the docker mount path.
-        if isinstance(report['coverage']['sources']['source'], str):
-            new_source = self._docker_to_local_path(report['coverage']['sources']['source'])
-            report['coverage']['sources']['source'] = new_source
-            new_sources = [new_source]
-        else:
-            new_sources = []
-            for source in report['coverage']['sources']['source']:
-                # The source states docker work dir, replace it with the repo full dir.
-                if source.startswith(self.docker.mount_dir):
-                    source = self._docker_to_local_path(source)
-                new_sources.append(source)
-            report['coverage']['sources']['source'] = new_sources
-
-        # Change the Cobertura packages to point to the repo full path instead of the docker mount path.
-        packages = report['coverage']['packages']['package']
-        if isinstance(packages, dict):
-            packages = [packages]
-
-        for package in packages:
-            file_dicts = package['classes']['class']
-            if isinstance(file_dicts, dict):
-                file_dicts = [file_dicts]
-
-            for f in file_dicts:
-                filepath = f.get('@filename')
-
-                for source in new_sources:
-                    potential_path = Path(source) / filepath
-                    if potential_path.exists():
-                        f['@filename'] = str(potential_path.relative_to(self.repo_path))
-                        break
-
-        return report
\ No newline at end of file
+        return adapt_cobertura_report(report, self.repo_path, self.docker.mount_dir)
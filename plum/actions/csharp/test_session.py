@@ -0,0 +1,230 @@
+import logging
+import re
+import shlex
+from pathlib import Path
+from typing import Optional, Set, Tuple, Union
+
+
+from plum.actions._docker_session import DockerSession
+
+
+GENERATED_TESTS_DIR = "PlumGenerated"
+"""Directory inside a test project the generated tests are written to."""
+
+_CLASS_REGEX = re.compile(r'\bclass\s+(\w+)')
+_NAMESPACE_REGEX = re.compile(r'^\s*namespace\s+([\w.]+)', re.MULTILINE)
+
+
+def get_generated_class_name(generated_test: str) -> str:
+    """Name of the first class of a generated test, GeneratedTest if it has none."""
+    class_match = _CLASS_REGEX.search(generated_test)
+    return class_match.group(1) if class_match else "GeneratedTest"
+
+
+def get_generated_test_filter(generated_test: str) -> str:
+    """
+    `dotnet test --filter` selecting the tests of the first class of a generated test only.
+
+    Test names are the fully qualified class name followed by the method name, so the filter matches on the
+    namespace qualified class name and the dot after it: classes whose name merely contains it do not match.
+    """
+    namespace_match = _NAMESPACE_REGEX.search(generated_test)
+    full_class_name = get_generated_class_name(generated_test)
+    if namespace_match:
+        full_class_name = f"{namespace_match.group(1)}.{full_class_name}"
+    return f"FullyQualifiedName~{full_class_name}."
+
+
+def write_generated_test(repo_path: Union[str, Path], test_project: str, generated_test: str) -> Tuple[str, Path]:
+    """
+    Write a generated test class into the GENERATED_TESTS_DIR of a test project, compiled with it by its next build.
+
+    Returns:
+        Tuple of (class name, path of the written file)
+    """
+    class_name = get_generated_class_name(generated_test)
+    test_dir = Path(repo_path) / Path(test_project).parent / GENERATED_TESTS_DIR
+    test_dir.mkdir(exist_ok=True)
+    test_file = test_dir / f"{class_name}.cs"
+    test_file.write_text(generated_test)
+    return class_name, test_file
+
+
+def remove_generated_test(test_file: Path):
+    """Remove a generated test written by write_generated_test, and its directory once empty."""
+    test_file.unlink(missing_ok=True)
+    if test_file.parent.is_dir() and not any(test_file.parent.iterdir()):
+        test_file.parent.rmdir()
+
+
+class DotnetTestSession:
+    """
+    Persistent container workflow for running the tests of a .NET repo repeatedly.
+
+    The solution is restored and built once when the session starts. Test runs then use
+    `dotnet test --no-build --no-restore`, optionally with a `--filter`, and generated tests are compiled
+    incrementally into an existing test project, so only that project is rebuilt.
+    """
+    _SUMMARY_REGEX = re.compile(
+        r'(Failed|Passed)!\s+-\s+Failed:\s+(\d+),\s+Passed:\s+(\d+),\s+Skipped:\s+(\d+),\s+Total:\s+(\d+)'
+    )
+    """The regex to find the summary line of each test project."""
+
+    def __init__(self, docker: DockerSession, repo_path: Union[str, Path], target: Optional[str] = None):
+        """
+        Args:
+            docker: Docker session the dotnet commands run in.
+            repo_path: Full path to the repo on the host, mounted in the session container.
+            target: Solution or project to restore, build and test, relative to the repo root.
+                Defaults to the one dotnet finds in the repo root.
+        """
+        self.docker = docker
+        """Docker session the dotnet commands run in."""
+        self.repo_path = Path(repo_path)
+        """Full path to the repo on the host."""
+        self.target = target
+        """Solution or project to restore, build and test, relative to the repo root."""
+        self.needs_build = True
+        """Whether the solution needs a full build, ex) the last one failed."""
+        self.stale_projects: Set[str] = set()
+        """Test projects whose sources changed since their last build, ex) a generated test was removed."""
+
+    def start(self, timeout=900) -> dict:
+        """
+        Start the session container, then restore and build the solution once.
+
+        Returns:
+            Dictionary with 'success', 'stdout' and 'stderr' keys of the restore and build.
+        """
+        self.docker.start(self.repo_path)
+        returncode, stdout, stderr = self.docker.exec(
+            f"dotnet restore {self._target()} && dotnet build {self._target()} --no-restore", timeout=timeout
+        )
+        self.needs_build = returncode != 0
+        return {"success": returncode == 0, "stdout": stdout, "stderr": stderr}
+
+    def is_alive(self) -> bool:
+        return self.docker.is_alive()
+
+    def build(self, project: Optional[str] = None, timeout=900) -> dict:
+        """
+        Incrementally build the solution, or a single project, without restoring.
+
+        Returns:
+            Dictionary with 'success', 'stdout' and 'stderr' keys.
+        """
+        returncode, stdout, stderr = self.docker.exec(
+            f"dotnet build {shlex.quote(project) if project else self._target()} --no-restore", timeout=timeout
+        )
+        if project is None:
+            self.needs_build = returncode != 0
+            if returncode == 0:
+                self.stale_projects.clear()
+        elif returncode == 0:
+            self.stale_projects.discard(project)
+        return {"success": returncode == 0, "stdout": stdout, "stderr": stderr}
+
+    def run_tests(self, test_filter: Optional[str] = None, project: Optional[str] = None, timeout=900) -> dict:
+        """
+        Run the already built tests.
+
+        Args:
+            test_filter: Value of `dotnet test --filter`, ex) FullyQualifiedName~MyNamespace.MyTests
+            project: Test project to run, relative to the repo root. Defaults to the session target.
+            timeout: Time in seconds before the test run times out.
+
+        Returns:
+            Dictionary with status_result, test_results (summed over the test projects), stdout and stderr.
+        """
+        if not self.docker.is_alive():
+            self.start(timeout=timeout)
+        if self.needs_build:
+            self.build(timeout=timeout)
+        for stale_project in sorted(self.stale_projects):
+            if project is None or stale_project == project:
+                self.build(project=stale_project, timeout=timeout)
+
+        command = f"dotnet test {shlex.quote(project) if project else self._target()} --no-build --no-restore"
+        if test_filter:
+            command += f" --filter {shlex.quote(test_filter)}"
+        _, stdout, stderr = self.docker.exec(command, timeout=timeout)
+
+        test_results = self.parse_test_summary(stdout)
+        return {
+            "status_result": "SUCCESS" if test_results and test_results["status"] == "Passed" else "FAILURE",
+            "test_results": test_results,
+            "stdout": stdout,
+            "stderr": stderr,
+        }
+
+    def run_generated_test(self, generated_test: str, test_project: str, timeout=900) -> dict:
+        """
+        Compile a generated test into an existing test project and run only its class.
+
+        Args:
+            generated_test: C# code of the generated test class.
+            test_project: Path of the test project (.csproj) to compile the test into, relative to the repo root.
+            timeout: Time in seconds for each of the build and the test run.
+
+        Returns:
+            The run_tests result with an additional build_result key. When the build fails the tests are not run,
+            status_result is FAILURE and test_results is None.
+        """
+        if not self.docker.is_alive():
+            self.start(timeout=timeout)
+
+        _, test_file = write_generated_test(self.repo_path, test_project, generated_test)
+        try:
+            build_result = self.build(project=test_project, timeout=timeout)
+            if not build_result["success"]:
+                return {
+                    "status_result": "FAILURE",
+                    "test_results": None,
+                    "build_result": build_result,
+                    "stdout": build_result["stdout"],
+                    "stderr": build_result["stderr"],
+                }
+            result = self.run_tests(
+                test_filter=get_generated_test_filter(generated_test), project=test_project, timeout=timeout
+            )
+            result["build_result"] = build_result
+            return result
+        finally:
+            remove_generated_test(test_file)
+            # The built test project still contains the generated test, rebuild it before it runs again.
+            self.stale_projects.add(test_project)
+
+    def close(self):
+        """Stop the session container."""
+        self.docker.close()
+
+    @staticmethod
+    def parse_test_summary(stdout: str) -> Optional[dict]:
+        """
+        Sum the `dotnet test` summary lines of all test projects.
+
+        Returns:
+            Dictionary with the keys status (Passed or Failed), failed, passed, skipped and total,
+            None if no summary line was found.
+        """
+        matches = DotnetTestSession._SUMMARY_REGEX.findall(stdout)
+        if not matches:
+            logging.debug("No dotnet test summary found.")
+            return None
+        return {
+            "status": "Failed" if any(m[0] == "Failed" for m in matches) else "Passed",
+            "failed": sum(int(m[1]) for m in matches),
+            "passed": sum(int(m[2]) for m in matches),
+            "skipped": sum(int(m[3]) for m in matches),
+            "total": sum(int(m[4]) for m in matches),
+        }
+
+    def _target(self) -> str:
+        return shlex.quote(self.target) if self.target else ""
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -3,13 +3,14 @@ from pathlib import Path
 from typing import Union
 
 from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
 
 
 class UpgradeManager():
     def __init__(
         self,
         repo_full_path: Union[Path, str],
-        docker_runner: DockerRunner,
+        docker_runner: Union[DockerRunner, DockerSession],
         upgrade_to_version: str,
         timeout=60,
     ):
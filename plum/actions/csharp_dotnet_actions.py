@@ -6,12 +6,25 @@ import shlex
 
 from glob import glob
 from pathlib import Path
-from plum.actions._docker_runner import DockerRunner
+from plum.actions._containers import name_docker_command, new_container_name
+from plum.actions._dependency_snapshots import get_snapshot_volume, is_snapshot_complete, mark_snapshot_complete
+from plum.actions._docker_runner import DockerRunner, get_container_limits
+from plum.actions._docker_session import DockerSession
 from plum.actions.actions import Actions
+from plum.actions.csharp._dotnet_test_log_parser import DotnetTestParser
 from plum.actions.csharp._sln_parser import Solution
 from plum.actions.csharp.build_manager import BuildManager
 from plum.actions.csharp.upgrade_manager import UpgradeManager
 from plum.actions.csharp.coverage_manager import CoverageManager
+from plum.actions.csharp.test_session import (
+    DotnetTestSession,
+    get_generated_class_name,
+    get_generated_test_filter,
+    remove_generated_test,
+    write_generated_test,
+)
+from plum.actions.evaluation_engine import EvaluationJob
+from plum.harnesslib.languages import Language
 from plum.utils.cobertura import get_function_coverage
 from plum.utils.logger import Logger
 
@@ -19,6 +32,11 @@ TIMEOUT = 1000
 DOCKER_TIMEOUT = 900
 
 
+def _is_timeout(return_code, stdout, stderr):
+    """Whether a DockerRunner or DockerSession command timed out."""
+    return return_code == 1 and stdout == "" and stderr == "Timeout"
+
+
 class CsharpDotnetActions(Actions):
     """
     Class used to represent the Maven actions that can be taken on an environment object
@@ -51,6 +69,10 @@ class CsharpDotnetActions(Actions):
 
         self.docker_runner = DockerRunner(docker_image, docker_tag, docker_work_dir)
         """Holds Docker configuration and runs Docker commands."""
+        self.test_session = None
+        """Persistent restore and build for repeated test runs, set by start_test_session."""
+        self.snapshot_volume = None
+        """Volume holding every NuGet package of the repo, mounted as the packages folder once set by snapshot_dependencies."""
 
     def clean(self):
         """
@@ -60,18 +82,11 @@ class CsharpDotnetActions(Actions):
         Returns:
             dict: A dictionary with the cleaning result, including status, stdout, and stderr.
         """
-        try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} dotnet clean"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-
-        except subprocess.TimeoutExpired:
+        return_code, stdout, stderr = self.docker_runner.run("dotnet clean", self.repo_full_path, timeout=TIMEOUT)
+        if _is_timeout(return_code, stdout, stderr):
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
         status_result = self.parse_build(stdout)
         result = {
             "status_result": status_result,
@@ -142,23 +157,26 @@ class CsharpDotnetActions(Actions):
         Returns:
             dict: A dictionary with the testing result, including status, stdout, stderr, and number of passed/failed/skipped tests.
         """
-        try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} dotnet test"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=timeout
-            )
+        if self.test_session is not None:
+            return self.test_session.run_tests(timeout=timeout)
 
-        except subprocess.TimeoutExpired:
+        test_parser = DotnetTestParser()
+        return_code, stdout, stderr = self.docker_runner.run(
+            "dotnet test", self.repo_full_path, timeout=timeout, parsers=[test_parser]
+        )
+        if _is_timeout(return_code, stdout, stderr):
             Logger().get_logger().error(f"TimeoutExpired: Your timeout is currently {timeout}s. Increase timeout if needed")
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
-        test_results = self.parse_dotnet_test(stdout)
+        return self._parse_test_run(stdout, stderr, test_parser.result())
+
+    def _parse_test_run(self, stdout, stderr, test_results=None):
+        if test_results is None:
+            test_results = self.parse_dotnet_test(stdout)
         status_result = "FAILURE"
-        if "status" in test_results:
-            status_result = test_results["status"]
+        if test_results and test_results.get("status") == "Passed":
+            status_result = "SUCCESS"
         result = {
             "status_result": status_result,
             "test_results": test_results,
@@ -167,6 +185,164 @@ class CsharpDotnetActions(Actions):
         }
         return result
 
+    def run_generated_test(self, generated_test: str, test_project: str = None, timeout=TIMEOUT):
+        """
+        Compile a generated test class into an existing test project and run only that class.
+        Uses the test session, started if needed, so only the test project is rebuilt.
+
+        Args:
+            generated_test: C# code of the generated test class.
+            test_project: Path of the test project (.csproj) relative to the repo root. Defaults to the first test project.
+
+        Returns:
+            dict: A dictionary with the testing result, including status, stdout, stderr, and number of passed/failed/skipped tests.
+        """
+        if test_project is None:
+            test_project = self._get_default_test_project()
+            if test_project is None:
+                return {"success": False, "stdout": "n/a", "stderr": "No test project found"}
+        if self.test_session is None:
+            self.start_test_session(timeout=timeout)
+        return self.test_session.run_generated_test(generated_test, test_project, timeout=timeout)
+
+    def prepare_generated_test(self, generated_test: str, test_project: str = None, timeout=TIMEOUT):
+        """
+        Prepare a generated test to be run by an EvaluationEngine, compiled into an existing test project
+        and run by class filter in a new container. Jobs of the same repo share its build outputs, so they run one at a time.
+
+        Args:
+            generated_test: C# code of the generated test class.
+            test_project: Path of the test project (.csproj) relative to the repo root. Defaults to the first test project.
+
+        Returns:
+            EvaluationJob: job writing the test class when it starts, with results in the format of run_test_suite.
+            dict: A failure dictionary instead, when no test project is given and the repo has none.
+        """
+        if test_project is None:
+            test_project = self._get_default_test_project()
+            if test_project is None:
+                return {"success": False, "stdout": "n/a", "stderr": "No test project found"}
+        written = {}
+
+        def setup():
+            written["class_name"], written["test_file"] = write_generated_test(self.repo_full_path, test_project, generated_test)
+
+        def cleanup():
+            if "test_file" in written:
+                remove_generated_test(written["test_file"])
+
+        class_name = get_generated_class_name(generated_test)
+        limits = " ".join(get_container_limits().get_options())
+        command = f"docker run --rm {limits} -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} dotnet test {test_project} --filter {get_generated_test_filter(generated_test)}"
+        container = new_container_name()
+        return EvaluationJob(
+            key=class_name,
+            language=Language.Csharp,
+            command=name_docker_command(shlex.split(command), container),
+            parse=lambda returncode, stdout, stderr: self._parse_test_run(stdout, stderr),
+            timeout=timeout,
+            setup=setup,
+            cleanup=cleanup,
+            lock_key=str(self.repo_full_path),
+            container=container,
+        )
+
+    def start_docker_session(self):
+        """
+        Run the following build, upgrade, clean, test and coverage commands in one long-lived container
+        rather than a new container per command, until stop_docker_session is called.
+        Restored packages and build outputs kept inside the container are reused from one command to the next.
+        """
+        if isinstance(self.docker_runner, DockerSession):
+            return
+        self.docker_runner = DockerSession(
+            self.docker_runner.image,
+            self.docker_runner.tag,
+            self.docker_runner.mount_dir,
+            self.docker_runner.volumes,
+        )
+
+    def stop_docker_session(self):
+        """Stop the long-lived container, commands go back to one container each."""
+        if not isinstance(self.docker_runner, DockerSession):
+            return
+        self.docker_runner.close()
+        # Keep the image and tag the BuildManager may have recovered with.
+        self.docker_runner = DockerRunner(
+            self.docker_runner.image,
+            self.docker_runner.tag,
+            self.docker_runner.mount_dir,
+            self.docker_runner.volumes,
+        )
+
+    def start_test_session(self, target: str = None, timeout=DOCKER_TIMEOUT):
+        """
+        Start a persistent container that restores and builds the solution once.
+        run_test_suite then runs `dotnet test --no-build --no-restore` in it until stop_test_session is called.
+
+        Args:
+            target: Solution or project to build and test, relative to the repo root. Defaults to the one dotnet picks.
+
+        Returns:
+            dict: A dictionary with the restore and build result, including success, stdout, and stderr.
+        """
+        self.stop_test_session()
+        docker = DockerSession(
+            self.docker_runner.image,
+            self.docker_runner.tag,
+            self.docker_work_dir,
+            # In place of the shared NuGet packages cache volume, mounted otherwise.
+            volumes={self.snapshot_volume: CoverageManager.NUGET_PACKAGES_DIR} if self.snapshot_volume else None,
+        )
+        self.test_session = DotnetTestSession(docker, self.repo_full_path, target)
+        return self.test_session.start(timeout=timeout)
+
+    def stop_test_session(self):
+        """Stop the test session container, test runs go back to one container each."""
+        if self.test_session is not None:
+            self.test_session.close()
+            self.test_session = None
+
+    def snapshot_dependencies(self, target: str = None, timeout=DOCKER_TIMEOUT):
+        """
+        Restore the NuGet packages of the repo once into a volume keyed by the hash of its project files,
+        see `_dependency_snapshots`. Following commands mount that volume as the NuGet packages folder,
+        so their restores find every package locally rather than resolving them again.
+
+        Args:
+            target: Solution or project to restore, relative to the repo root. Defaults to the first solution of the root.
+
+        Returns:
+            dict: A dictionary with success, volume, created (whether the packages were restored now), stdout and stderr.
+        """
+        volume = get_snapshot_volume(self.repo_full_path, "nuget")
+        if volume is None:
+            return {"success": False, "stdout": "n/a", "stderr": "No project files found"}
+
+        # Mounted in place of the shared NuGet packages volume.
+        volumes = {
+            source: path for source, path in self.docker_runner.volumes.items()
+            if path != CoverageManager.NUGET_PACKAGES_DIR
+        }
+        volumes[volume] = CoverageManager.NUGET_PACKAGES_DIR
+
+        result = {"success": True, "volume": volume, "created": False, "stdout": "", "stderr": ""}
+        if not is_snapshot_complete(volume):
+            if target is None:
+                solutions = sorted(glob(os.path.join(self.repo_full_path, "*.sln")))
+                target = os.path.basename(solutions[0]) if solutions else ""
+            command = f"dotnet restore {shlex.quote(target)}" if target else "dotnet restore"
+            runner = DockerRunner(self.docker_runner.image, self.docker_runner.tag, self.docker_work_dir, volumes)
+            return_code, stdout, stderr = runner.run(command, self.repo_full_path, timeout=timeout)
+            if _is_timeout(return_code, stdout, stderr):
+                return {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
+            if return_code != 0 or not mark_snapshot_complete(volume):
+                return {"success": False, "volume": volume, "created": False, "stdout": stdout, "stderr": stderr}
+            result.update(created=True, stdout=stdout, stderr=stderr)
+
+        self.snapshot_volume = volume
+        self.docker_runner.volumes = volumes
+        return result
 
     def run_custom_command(self, command):
         """
@@ -176,16 +352,11 @@ class CsharpDotnetActions(Actions):
         Returns:
             dict: A dictionary with the testing result, including status, stdout, stderr.
         """
-        try:
-            command = f'docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} {command}'
-            output = subprocess.run(shlex.split(command), capture_output=True, timeout=TIMEOUT)
-
-        except subprocess.TimeoutExpired:
+        return_code, stdout, stderr = self.docker_runner.run(command, self.repo_full_path, timeout=TIMEOUT)
+        if _is_timeout(return_code, stdout, stderr):
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
         result = {"stdout": stdout, "stderr": stderr}
         return result
 
@@ -197,11 +368,8 @@ class CsharpDotnetActions(Actions):
         if not coverage_manager_res["success"]:
             return coverage_manager_res
 
+        # Coverlet is added to the test projects as part of the coverage run.
         coverage_manager = coverage_manager_res["manager"]
-        coverlet_install_res = coverage_manager.install_coverlet()
-        if not coverlet_install_res["success"]:
-            return coverlet_install_res
-
         coverage_reports = coverage_manager.run_coverage()
 
         return coverage_reports
@@ -242,30 +410,8 @@ class CsharpDotnetActions(Actions):
             return "SUCCESS"
 
     def parse_dotnet_test(self, stdout):
-        # Regular expression pattern to match the test results line
-        pattern = r'(Failed|Passed)!\s+-\s+Failed:\s+(\d+),\s+Passed:\s+(\d+),\s+Skipped:\s+(\d+),\s+Total:\s+(\d+)'
-
-        # Search for the pattern in the input string
-        match = re.search(pattern, stdout)
-
-        if match:
-            # Extract the numbers of failed, passed, and skipped tests
-            status = match.group(1)
-            failed = int(match.group(2))
-            passed = int(match.group(3))
-            skipped = int(match.group(4))
-            total = int(match.group(5))
-
-            return {
-                'status': status,
-                'failed': failed,
-                'passed': passed,
-                'skipped': skipped,
-                'total': total
-            }
-        else:
-            # If no match is found, return None
-            return None
+        # Numbers of failed, passed and skipped tests of the first test results line, None if there is none.
+        return DotnetTestParser().parse(stdout)
 
     def get_test_projects(self):
         """
@@ -282,3 +428,13 @@ class CsharpDotnetActions(Actions):
         solution_path = os.path.join(self.repo_full_path, sln_files[0])
         solution = Solution.from_file(solution_path)
         return solution.get_test_projects()
+
+    def _get_default_test_project(self):
+        """Path of the first test project relative to the repo root, None if the repo has no solution or test project."""
+        try:
+            test_projects = self.get_test_projects()
+        except FileNotFoundError:
+            return None
+        if not test_projects:
+            return None
+        return os.path.relpath(test_projects[0].csproj_path, self.repo_full_path)
@@ -0,0 +1,177 @@
+import asyncio
+import inspect
+import os
+import signal
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Union
+
+from plum.actions._containers import kill_container
+from plum.harnesslib.languages import Language
+from plum.utils.helpers import available_cpus
+from plum.utils.logger import Logger
+
+
+@dataclass
+class EvaluationJob:
+    """
+    One generated test to run as a subprocess, built by the `prepare_generated_test` method of an Actions class.
+    """
+    key: Hashable
+    """Identifies the job in the results, ex) the path of the generated test file."""
+    language: Union[Language, str]
+    """Language of the job, selects its concurrency limit."""
+    command: List[str]
+    """Command running the generated test."""
+    parse: Callable[[int, str, str], dict]
+    """Builds the result from the return code, stdout and stderr, in the format of the Actions class."""
+    cwd: Optional[Union[str, Path]] = None
+    """Directory the command runs in."""
+    env: Optional[Dict[str, str]] = None
+    """Environment of the command, defaults to the environment of this process."""
+    timeout: float = 30
+    """Time in seconds before the command and all its children are killed."""
+    setup: Optional[Callable[[], Any]] = None
+    """Called right before the command runs, ex) writes the generated test into the repo."""
+    cleanup: Optional[Callable[[], Any]] = None
+    """Called once the command finished or was killed, ex) restores the files setup changed."""
+    lock_key: Optional[Hashable] = None
+    """Jobs sharing a lock key run one at a time, ex) Maven runs sharing the target directory of a repo."""
+    timeout_result: Optional[dict] = None
+    """Result when the job times out, defaults to TIMEOUT_RESULT."""
+    container: Optional[str] = None
+    """Name of the container the command starts, removed on timeout: killing `docker run` leaves it running."""
+
+
+TIMEOUT_RESULT = {"success": False, "stdout": "n/a", "stderr": "Timeout"}
+"""Result of a job timing out, in the format of the Actions classes."""
+
+
+class EvaluationEngine:
+    """
+    Runs generated tests of many repos and languages concurrently on an asyncio event loop.
+
+    Each job runs in its own process group, so on timeout the test command and everything it started
+    (ex. `npm test` and its node workers) are killed together. Concurrency is bounded per language,
+    and results are streamed to a callback as soon as each job finishes.
+    """
+    def __init__(self, limits: Optional[Dict[Union[Language, str], int]] = None, default_limit: Optional[int] = None):
+        """
+        Args:
+            limits: Maximum number of jobs running at once per language, ex) {Language.Java: 2}.
+            default_limit: Maximum number of jobs running at once for languages without a limit.
+                Defaults to the number of available CPUs.
+        """
+        self.limits = dict(limits) if limits else {}
+        """Maximum number of jobs running at once per language."""
+        self.default_limit = default_limit or available_cpus()
+        """Maximum number of jobs running at once for languages without a limit."""
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def evaluate(
+            self,
+            jobs: Iterable[EvaluationJob],
+            on_result: Optional[Callable[[EvaluationJob, dict], Optional[Awaitable]]] = None,
+        ) -> Dict[Hashable, dict]:
+        """Run the jobs from synchronous code, see `run`."""
+        return asyncio.run(self.run(jobs, on_result))
+
+    async def run(
+            self,
+            jobs: Iterable[EvaluationJob],
+            on_result: Optional[Callable[[EvaluationJob, dict], Optional[Awaitable]]] = None,
+        ) -> Dict[Hashable, dict]:
+        """
+        Run the jobs concurrently within the limits.
+
+        Args:
+            jobs: Jobs to run.
+            on_result: Called with each job and its result as soon as the job finishes. May be a coroutine function.
+
+        Returns:
+            Dictionary of job key to result.
+        """
+        # Semaphores and locks belong to the event loop of this run.
+        self._semaphores = {}
+        self._locks = {}
+
+        async def run_and_report(job):
+            result = await self.run_job(job)
+            if on_result is not None:
+                callback_result = on_result(job, result)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
+            return job.key, result
+
+        results = {}
+        for future in asyncio.as_completed([run_and_report(job) for job in jobs]):
+            key, result = await future
+            results[key] = result
+        return results
+
+    async def run_job(self, job: EvaluationJob) -> dict:
+        """Run a single job once its language limit and lock allow it."""
+        async with self._get_semaphore(job.language):
+            if job.lock_key is None:
+                return await self._run_process(job)
+            async with self._locks.setdefault(job.lock_key, asyncio.Lock()):
+                return await self._run_process(job)
+
+    async def _run_process(self, job: EvaluationJob) -> dict:
+        try:
+            try:
+                if job.setup is not None:
+                    job.setup()
+                process = await asyncio.create_subprocess_exec(
+                    *job.command,
+                    cwd=job.cwd,
+                    env=job.env,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True, # Own process group, killed as a whole on timeout.
+                )
+            except OSError as e:
+                return {"success": False, "stdout": "n/a", "stderr": str(e)}
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=job.timeout)
+            except asyncio.TimeoutError:
+                Logger().get_logger().error(f"TimeoutExpired: {job.key} exceeded {job.timeout}s")
+                _kill_process_group(process.pid)
+                await process.wait()
+                await _kill_container(job)
+                return dict(job.timeout_result or TIMEOUT_RESULT)
+            except asyncio.CancelledError:
+                _kill_process_group(process.pid)
+                await _kill_container(job)
+                raise
+
+            return job.parse(
+                process.returncode,
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"),
+            )
+        finally:
+            if job.cleanup is not None:
+                job.cleanup()
+
+    def _get_semaphore(self, language: Union[Language, str]) -> asyncio.Semaphore:
+        language = language.value if isinstance(language, Language) else language
+        if language not in self._semaphores:
+            limit = self.limits.get(language, self.default_limit)
+            self._semaphores[language] = asyncio.Semaphore(limit)
+        return self._semaphores[language]
+
+
+async def _kill_container(job: EvaluationJob):
+    if job.container is not None:
+        await asyncio.get_running_loop().run_in_executor(None, kill_container, job.container)
+
+
+def _kill_process_group(pid: int):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
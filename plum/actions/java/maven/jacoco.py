@@ -0,0 +1,156 @@
+import posixpath
+from pathlib import Path
+from types import MappingProxyType
+from typing import Union
+
+
+from plum.utils.cobertura import parse_xml_as_dict
+from plum.actions.java.maven._pom_parser_lxml import PomXML
+
+
+JACOCO_DETAILS = MappingProxyType(
+    {
+        "group_id": "org.jacoco",
+        "artifact_id": "jacoco-maven-plugin",
+        "version": "0.8.12"
+    }
+)
+"""Pseudo frozendict containing the details for the JaCoCo Maven plugin."""
+
+
+def _as_list(value) -> list:
+    """xmltodict returns a dict for a single child element and a list for multiple, normalize to a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+class JacocoMavenPlugin:
+    """
+    Controller class for interacting with the JaCoCo Maven plugin.
+
+    Unlike Cobertura, JaCoCo instruments classes on the fly through a Java agent attached to surefire.
+    The plugin goals are invoked by their fully qualified name, so the pom.xml is never modified.
+    """
+    def __init__(self, pom_path: Union[str, Path], pom: PomXML):
+        self.root_pom_path: Path = Path(pom_path)
+        """Path to the root pom.xml file."""
+
+        self.root_pom = pom
+        """PomXML object for the root pom.xml file."""
+
+    @staticmethod
+    def load(pom_path: Union[str, Path]):
+        """Load the JaCoCo Maven plugin controller from the project pom.xml."""
+        pom = PomXML.from_file(pom_path)
+        return JacocoMavenPlugin(pom_path, pom)
+
+    @staticmethod
+    def get_plugin_prefix() -> str:
+        """Fully qualified plugin prefix, ex) org.jacoco:jacoco-maven-plugin:0.8.12"""
+        return f"{JACOCO_DETAILS['group_id']}:{JACOCO_DETAILS['artifact_id']}:{JACOCO_DETAILS['version']}"
+
+    def get_coverage_command(self, threads: str = "1C") -> str:
+        """
+        Maven command that attaches the JaCoCo agent to surefire, runs the tests and writes jacoco.xml.
+
+        Args:
+            threads: Value for Maven's `-T` flag, used to build independent modules in parallel.
+        """
+        prefix = JacocoMavenPlugin.get_plugin_prefix()
+        return (
+            f"mvn -B -T {threads} "
+            f"{prefix}:prepare-agent " # Sets the surefire argLine to attach the agent.
+            "test "
+            f"{prefix}:report " # Writes target/site/jacoco/jacoco.xml for each module.
+            "-Dmaven.test.failure.ignore=true " # Failing tests should not prevent the report.
+            "-Djacoco.report.formats=XML"
+        )
+
+    def get_report(self, module: Path):
+        """
+        Get the JaCoCo report for the given module.
+        """
+        expected_file = module / 'target' / 'site' / 'jacoco' / 'jacoco.xml'
+
+        # Parent (pom packaging) modules and modules without tests have no report.
+        if expected_file.exists():
+            return parse_xml_as_dict(expected_file)
+        else:
+            return None
+
+    def get_all_reports(self, docker_work_dir: str):
+        """
+        Aggregate the JaCoCo reports of all submodules into a single Cobertura formatted report.
+
+        Args:
+            docker_work_dir: Directory the repo was mounted at when Maven ran.
+                The sources are expressed relative to it, the same way the Cobertura plugin reports them.
+
+        Returns:
+            Dictionary with a single '.' key holding the aggregated report,
+            matching the structure of the multi-module Cobertura reports.
+        """
+        root_path, submodules = self.root_pom.find_all_submodules()
+        root = Path(root_path)
+
+        module_reports = {}
+        for module in submodules:
+            report = self.get_report(root / module)
+            if report is not None:
+                module_reports[module] = report
+
+        return {'.': jacoco_to_cobertura(module_reports, docker_work_dir)}
+
+
+def jacoco_to_cobertura(module_reports: dict, source_root: str) -> dict:
+    """
+    Convert parsed jacoco.xml reports into the Cobertura dictionary structure
+    consumed by `plum.utils.cobertura.get_function_coverage`.
+
+    Args:
+        module_reports: Dictionary of module path (relative to the repo root) to the parsed jacoco.xml.
+        source_root: Path prepended to each module's source directory in the `sources` section.
+
+    Returns:
+        Cobertura formatted dictionary. Class file names are relative to the module source roots.
+    """
+    sources = []
+    packages = []
+
+    for module, report in module_reports.items():
+        sources.append(posixpath.normpath(posixpath.join(source_root, module, 'src', 'main', 'java')))
+
+        for package in _as_list(report['report'].get('package')):
+            package_name = package['@name']
+            classes = []
+
+            for sourcefile in _as_list(package.get('sourcefile')):
+                lines = [
+                    {
+                        '@number': line['@nr'],
+                        # Covered instructions are the closest equivalent of Cobertura's hit count.
+                        '@hits': line['@ci'],
+                    }
+                    for line in _as_list(sourcefile.get('line'))
+                ]
+                classes.append({
+                    '@name': sourcefile['@name'],
+                    '@filename': posixpath.join(package_name, sourcefile['@name']),
+                    'lines': {'line': lines} if lines else None,
+                })
+
+            if classes:
+                packages.append({
+                    '@name': package_name.replace('/', '.'),
+                    'classes': {'class': classes},
+                })
+
+    return {
+        'coverage': {
+            'sources': {'source': sources},
+            'packages': {'package': packages},
+        }
+    }
@@ -0,0 +1,60 @@
+import re
+
+from plum.actions._output_capture import LineParser
+
+
+class MavenLogParser(LineParser):
+    """
+    Incremental parser of a Maven output, fed line by line while Maven runs.
+    Sums the "Results" sections of the Surefire runs, finds the overall BUILD status, the files failing to compile
+    and the artifacts missing while offline.
+    """
+    _results_regex = re.compile(r"\[INFO\] Results:\s*$")
+    _separator_regex = re.compile(r"\[INFO\]\s*$")
+    _tests_run_regex = re.compile(r"\[INFO\]\s*Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)")
+    _status_regex = re.compile(r"BUILD (SUCCESS|FAILURE)")
+    _offline_miss_regex = re.compile(r"Cannot access .* in offline mode")
+    _compilation_error_regex = re.compile(r"\[ERROR\] (\S+\.java):\[\d+(?:,\d+)?\]")
+
+    def __init__(self):
+        self.test_results = {"tests_run": 0, "failures": 0, "errors": 0, "skipped": 0}
+        self.status = "UNKNOWN"
+        self.compilation_errors = set()
+        """Paths, as seen by Maven, of the source files with compilation errors."""
+        self.offline_miss = False
+        """Whether Maven failed resolving an artifact missing from the local repository while offline."""
+        self._expecting = None
+        """Next line of a Results section expected: the separator, then the totals."""
+
+    def feed(self, line: str):
+        if self.status == "UNKNOWN":
+            match = MavenLogParser._status_regex.search(line)
+            if match:
+                self.status = match.group(1)
+
+        if MavenLogParser._offline_miss_regex.search(line):
+            self.offline_miss = True
+
+        match = MavenLogParser._compilation_error_regex.match(line)
+        if match:
+            self.compilation_errors.add(match.group(1))
+
+        if MavenLogParser._results_regex.search(line):
+            self._expecting = "separator"
+        elif self._expecting == "separator":
+            if MavenLogParser._separator_regex.match(line):
+                self._expecting = "totals"
+            elif line.strip():
+                self._expecting = None
+        elif self._expecting == "totals":
+            match = MavenLogParser._tests_run_regex.match(line)
+            if match:
+                for key, value in zip(self.test_results, match.groups()):
+                    self.test_results[key] += int(value)
+                self._expecting = None
+            elif not MavenLogParser._separator_regex.match(line):
+                self._expecting = None
+
+    def result(self) -> dict:
+        """Summed test results, in the format of `JavaMavenActions.parse_mvn_test`."""
+        return dict(self.test_results)
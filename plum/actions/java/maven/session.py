@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+from plum.actions._docker_session import DockerSession
+from plum.actions.java.maven import surefire
+from plum.actions.java.maven.log_parser import MavenLogParser
+
+
+class MavenSession:
+    """
+    Warm Maven environment for running many test classes of a repo.
+
+    One container is kept alive for the repo. Plugins and dependencies are resolved into its local Maven
+    repository once, compiled classes stay in `target/` so Maven only recompiles what changed, and the
+    Maven daemon (mvnd) is used when the image provides it so the JVM also stays warm between runs.
+    """
+    def __init__(self, docker: DockerSession, repo_path: Union[str, Path], maven_options: str = ""):
+        self.docker = docker
+        """Docker session the Maven commands run in."""
+        self.repo_path = Path(repo_path)
+        """Full path to the repo on the host, mounted in the session container."""
+        self.maven_options = maven_options
+        """Options added to every Maven command, ex) logging levels."""
+        self.maven = "mvn"
+        """Maven executable, mvnd when available in the image."""
+
+    def start(self, timeout=900) -> dict:
+        """
+        Start the session container and warm it up by compiling the main and test sources.
+
+        Returns:
+            Dictionary with the keys status_result, stdout and stderr of the warm up build.
+        """
+        self.docker.start(self.repo_path)
+        returncode, _, _ = self.docker.exec("command -v mvnd", timeout=30)
+        self.maven = "mvnd" if returncode == 0 else "mvn"
+
+        stdout, stderr = self._exec_maven("-B test-compile", timeout)
+        return {"status_result": _parse_status(stdout), "stdout": stdout, "stderr": stderr}
+
+    def is_alive(self) -> bool:
+        return self.docker.is_alive()
+
+    def run_test_classes(self, class_names: Iterable[str], timeout=900) -> dict:
+        """
+        Run several test classes, or single test methods as `Class#method`, in one Maven invocation.
+
+        Returns:
+            Dictionary with the keys status_result, test_results (summed counts), class_results
+            (per class results parsed from the Surefire XML reports), stdout and stderr.
+        """
+        class_names = list(class_names)
+        if not self.docker.is_alive():
+            self.start(timeout=timeout)
+
+        remove_class_reports(self.repo_path, class_names)
+        stdout, stderr = self._exec_maven(f"-B test {get_test_selection_options(class_names)}", timeout)
+
+        class_results = collect_class_results(self.repo_path, class_names)
+        return {
+            "status_result": _parse_status(stdout),
+            "test_results": surefire.summarize(class_results),
+            "class_results": class_results,
+            "stdout": stdout,
+            "stderr": stderr,
+        }
+
+    def _exec_maven(self, arguments: str, timeout) -> Tuple[str, str]:
+        """Run Maven in the session container, online again if it ran offline and missed artifacts."""
+        _, stdout, stderr = self.docker.exec(f"{self.maven} {arguments} {self.maven_options}", timeout=timeout)
+        maven_options = self.maven_options.split()
+        if "-o" in maven_options:
+            maven_log = MavenLogParser()
+            maven_log.parse(stdout)
+            if maven_log.offline_miss:
+                online_options = " ".join(option for option in maven_options if option != "-o")
+                _, stdout, stderr = self.docker.exec(f"{self.maven} {arguments} {online_options}", timeout=timeout)
+        return stdout, stderr
+
+    def close(self):
+        """Stop the session container."""
+        self.docker.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_test_selection_options(class_names: List[str]) -> str:
+    """Surefire options running only the given test classes, without failing modules that have none of them."""
+    return (
+        f"-Dtest={','.join(class_names)} "
+        "-DfailIfNoTests=false " # Surefire < 2.22
+        "-Dsurefire.failIfNoSpecifiedTests=false" # Surefire >= 2.22
+    )
+
+
+def _class_name(selection: str) -> str:
+    return selection.split("#")[0]
+
+
+def remove_class_reports(repo_path: Union[str, Path], class_names: List[str]):
+    """Remove stale Surefire reports of the selected classes, given as simple or fully qualified names."""
+    selected = {_class_name(name) for name in class_names}
+    for report in surefire.find_reports(repo_path):
+        full_name = report.stem[len("TEST-"):]
+        if full_name in selected or full_name.rsplit(".", 1)[-1] in selected:
+            report.unlink(missing_ok=True)
+
+
+def collect_class_results(repo_path: Union[str, Path], class_names: List[str]) -> dict:
+    """Per class results of the selected classes, parsed from the Surefire reports of all modules."""
+    selected = {_class_name(name) for name in class_names}
+    return {
+        full_name: result
+        for full_name, result in surefire.parse_reports(surefire.find_reports(repo_path)).items()
+        if full_name in selected or full_name.rsplit(".", 1)[-1] in selected
+    }
+
+
+def _parse_status(maven_output: str) -> str:
+    if "BUILD SUCCESS" in maven_output:
+        return "SUCCESS"
+    if "BUILD FAILURE" in maven_output:
+        return "FAILURE"
+    return "UNKNOWN"
@@ -0,0 +1,77 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from lxml import etree as ET
+
+
+REPORTS_DIR = Path("target") / "surefire-reports"
+"""Directory of each Maven module the Surefire plugin writes its XML reports to."""
+
+
+def find_reports(repo_root: Union[str, Path]) -> List[Path]:
+    """Find the Surefire XML reports of all the modules of a repo."""
+    repo_root = Path(repo_root)
+    return sorted(
+        report for report in repo_root.glob(f"**/{REPORTS_DIR.as_posix()}/TEST-*.xml")
+        if "node_modules" not in report.parts
+    )
+
+
+def parse_report(report_path: Union[str, Path]) -> dict:
+    """
+    Parse a Surefire `TEST-<class>.xml` report.
+
+    Returns:
+        Dictionary with the keys class_name, tests, failures, errors, skipped, time
+        and testcases, a list of dictionaries with the keys name, outcome (passed, failed, error or skipped),
+        message and time.
+    """
+    suite = ET.parse(str(report_path)).getroot()
+
+    testcases = []
+    for testcase in suite.iter("testcase"):
+        outcome, message = "passed", ""
+        for child in testcase:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[child.tag]
+                message = child.get("message") or (child.text or "").strip()
+                break
+        testcases.append({
+            "name": testcase.get("name"),
+            "outcome": outcome,
+            "message": message,
+            "time": float(testcase.get("time") or 0),
+        })
+
+    return {
+        "class_name": suite.get("name"),
+        "tests": int(suite.get("tests") or 0),
+        "failures": int(suite.get("failures") or 0),
+        "errors": int(suite.get("errors") or 0),
+        "skipped": int(suite.get("skipped") or 0),
+        "time": float((suite.get("time") or "0").replace(",", "")),
+        "testcases": testcases,
+    }
+
+
+def parse_reports(report_paths: Iterable[Union[str, Path]]) -> Dict[str, dict]:
+    """Parse Surefire reports into a dictionary of fully qualified test class name to its results."""
+    results = {}
+    for report_path in report_paths:
+        try:
+            result = parse_report(report_path)
+        except ET.XMLSyntaxError:
+            # Surefire was killed while writing the report.
+            continue
+        results[result["class_name"]] = result
+    return results
+
+
+def summarize(class_results: Dict[str, dict]) -> dict:
+    """Sum the per class results into the test_results format of `JavaMavenActions.parse_mvn_test`."""
+    return {
+        "tests_run": sum(r["tests"] for r in class_results.values()),
+        "failures": sum(r["failures"] for r in class_results.values()),
+        "errors": sum(r["errors"] for r in class_results.values()),
+        "skipped": sum(r["skipped"] for r in class_results.values()),
+    }
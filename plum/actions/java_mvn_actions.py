@@ -9,13 +9,30 @@ from pathlib import Path
 import shlex
 
 
-from plum.utils.cobertura import get_function_coverage
+from plum.utils.cobertura import adapt_cobertura_report, get_function_coverage
 from plum.actions.actions import Actions
+from plum.actions._cache_volumes import CACHE_VOLUMES, MAVEN_LOCK_OPTIONS
+from plum.actions._docker_runner import get_container_limits
+from plum.actions._containers import name_docker_command, new_container_name, run_container
+from plum.actions._dependency_snapshots import get_snapshot_volume, is_snapshot_complete, mark_snapshot_complete
+from plum.actions._docker_session import DockerSession
+from plum.actions.evaluation_engine import EvaluationJob
+from plum.actions.java.maven import surefire
 from plum.actions.java.maven.cobertura import CoberturaMavenPlugin
+from plum.actions.java.maven.jacoco import JacocoMavenPlugin
+from plum.actions.java.maven.log_parser import MavenLogParser
+from plum.actions.java.maven.session import (
+    MavenSession,
+    collect_class_results,
+    get_test_selection_options,
+    remove_class_reports,
+)
+from plum.harnesslib.languages import Language
 from plum.utils.logger import Logger
 
 TIMEOUT = 1000
 DOCKER_TIMEOUT = 900
+MAVEN_REPOSITORY_DIR = "/root/.m2/repository"
 
 
 class JavaMavenActions(Actions):
@@ -37,6 +54,7 @@ class JavaMavenActions(Actions):
         docker_tag,
         docker_work_dir="/usr/src/mymaven",
         local_repository="",
+        coverage_tool="cobertura",
     ):
         super().__init__(environment)
         self.docker_image = docker_image
@@ -49,25 +67,49 @@ class JavaMavenActions(Actions):
             self.repo_full_path = environment.base
 
         self.spotbugs_path = ""
-        self.repository_setting = ""
+        self.local_repository = local_repository
         if local_repository:
             self.repository_setting = f"-v {local_repository}:/root/.m2"
+        else:
+            # Without a local repository, share the named Maven cache volume across all containers.
+            self.repository_setting = " ".join(f"-v {volume}:{target}" for volume, target in CACHE_VOLUMES["maven"].items())
+        # Concurrent containers write to the same repository, lock its artifacts.
+        self.repository_setting += f" -e MAVEN_OPTS={shlex.quote(MAVEN_LOCK_OPTIONS)}"
+
+        self.maven_session: MavenSession = None
+        """Warm Maven session used to run test classes. Started on demand with start_maven_session."""
+
+        self.snapshot_volume: str = None
+        """Volume holding every dependency of the repo, used as the Maven repository once set by snapshot_dependencies."""
 
         self.cobertura_plugin: CoberturaMavenPlugin = None
         """Cobertura Maven plugin helper class. Initialized on demand."""
 
+        self.jacoco_plugin: JacocoMavenPlugin = None
+        """JaCoCo Maven plugin helper class. Initialized on demand."""
+
+        self.coverage_tool = coverage_tool
+        """Coverage tool used by get_coverage, either 'cobertura' or 'jacoco'."""
+
         self.maven_logging_level = "-Dorg.slf4j.simpleLogger.log.org.apache.maven.cli.transfer.Slf4jMavenTransferListener=warn"
+        self.maven_offline = False
+        """Whether Maven runs offline, set once the dependencies are snapshotted."""
+
+    @property
+    def maven_options(self) -> str:
+        """Options of the Maven commands building and testing the repo as is."""
+        return f"{self.maven_logging_level} -o" if self.maven_offline else self.maven_logging_level
+
+    @property
+    def docker_options(self) -> str:
+        """Options of the `docker run` commands: the Maven repository and the container limits of the process."""
+        return " ".join([self.repository_setting, *get_container_limits().get_options()])
 
     def clean(self):
         try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_image}:{self.docker_tag} mvn clean -B {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            result = {"status_result": status_result, "stdout": stdout, "stderr": stderr}
+            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn clean -B {self.maven_options}"
+            stdout, stderr, maven_log = self._run_maven(command)
+            result = {"status_result": maven_log.status, "stdout": stdout, "stderr": stderr}
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
@@ -76,14 +118,9 @@ class JavaMavenActions(Actions):
 
     def compile(self):
         try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} mvn clean compile -B {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            result = {"status_result": status_result, "stdout": stdout, "stderr": stderr}
+            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn clean compile -B {self.maven_options}"
+            stdout, stderr, maven_log = self._run_maven(command)
+            result = {"status_result": maven_log.status, "stdout": stdout, "stderr": stderr}
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
@@ -92,18 +129,11 @@ class JavaMavenActions(Actions):
 
     def build(self):
         try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} mvn clean install -B {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            test_results = self.parse_mvn_test(stdout)
+            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn clean install -B {self.maven_options}"
+            stdout, stderr, maven_log = self._run_maven(command)
             result = {
-                "status_result": status_result,
-                "test_results": test_results,
+                "status_result": maven_log.status,
+                "test_results": maven_log.result(),
                 "stdout": stdout,
                 "stderr": stderr,
             }
@@ -115,18 +145,11 @@ class JavaMavenActions(Actions):
 
     def run_test_suite(self, timeout=TIMEOUT):
         try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} mvn test -B {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=timeout
-            )
-
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            test_results = self.parse_mvn_test(stdout)
+            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn test -B {self.maven_options}"
+            stdout, stderr, maven_log = self._run_maven(command, timeout)
             result = {
-                "status_result": status_result,
-                "test_results": test_results,
+                "status_result": maven_log.status,
+                "test_results": maven_log.result(),
                 "stdout": stdout,
                 "stderr": stderr,
             }
@@ -201,25 +224,11 @@ public class {class_name} {{
                 "stderr": stderr,
             }
         """
-        # set the path to which we will write the generated test
-        # If we haven't run get_gentest_directory already, run it now to get the location
-        test_write_path = self.environment.test_write_location
-        if not test_write_path:
-            test_write_path = self.environment.get_gentest_directory()
-        
-        if test_write_path == "not_possible":
+        generated_test_file = self._get_generated_test_file(generated_test)
+        if generated_test_file is None:
             result = {"success": False, "stdout": "n/a", "stderr": f"Cannot parse structure of the repo to write and run generated tests"}
             return result
-
-        class_name = self.get_class_name(generated_test)
-
-        # given a path such as src/test/java/foo/bar/alpha, returns foo.bar.alpha, 
-        # which needs to be added at the beginning of the test file
-        package_import = str(test_write_path).split("src/test/java/")[1].replace("/", ".")
-        # write a file whose first line is the package information (all the directories after java to get to this file)
-
-        testfile_code = self.write_gentest_file(generated_test, package_import, class_name)
-        testfile_path = test_write_path / f"{class_name}.java"
+        testfile_path, testfile_code, full_class_name = generated_test_file
 
         # if the file already exists, save the existing code and re-write it after running our test class
         contents = None
@@ -230,7 +239,7 @@ public class {class_name} {{
             Logger().get_logger().info(f"### Generated Test to be Run: ###\n```{testfile_code}\n```")
             tf.write(testfile_code)
         
-        test_result = self.run_test_class(f"{package_import}.{class_name}")
+        test_result = self.run_test_class(full_class_name)
 
         #   rewrite original file contents if we replaced the existing code
         if contents:
@@ -242,6 +251,72 @@ public class {class_name} {{
 
         return test_result
 
+    def prepare_generated_test(self, generated_test, timeout=TIMEOUT):
+        """
+        Prepare a generated test to be run by an EvaluationEngine, like run_generated_test in a new container.
+        Jobs of the same repo share its target directory, so they run one at a time.
+
+        :param generated_test: code to insert into the newly created test file & run
+        :param timeout: time in seconds the Maven run is allowed to take
+        returns: job writing the test class when it starts, with results in the format of run_test_class,
+            None if the structure of the repo does not allow running generated tests
+        """
+        generated_test_file = self._get_generated_test_file(generated_test)
+        if generated_test_file is None:
+            return None
+        testfile_path, testfile_code, full_class_name = generated_test_file
+        original_contents = {}
+
+        def setup():
+            original_contents["code"] = open(testfile_path).read() if os.path.exists(testfile_path) else None
+            with open(testfile_path, "w") as tf:
+                tf.write(testfile_code)
+
+        def cleanup():
+            if original_contents.get("code") is not None:
+                with open(testfile_path, "w") as f:
+                    f.write(original_contents["code"])
+            elif os.path.exists(testfile_path):
+                os.remove(testfile_path)
+
+        container = new_container_name()
+        return EvaluationJob(
+            key=full_class_name,
+            language=Language.Java,
+            command=name_docker_command(shlex.split(self._get_test_command(full_class_name)), container),
+            parse=lambda returncode, stdout, stderr: self._parse_test_run(stdout, stderr),
+            timeout=timeout,
+            setup=setup,
+            cleanup=cleanup,
+            lock_key=str(self.repo_full_path),
+            container=container,
+        )
+
+    def _get_generated_test_file(self, generated_test):
+        """
+        Path, code and fully qualified class name of the test class wrapping a generated test,
+        None if the structure of the repo does not allow running generated tests.
+        """
+        # set the path to which we will write the generated test
+        # If we haven't run get_gentest_directory already, run it now to get the location
+        test_write_path = self.environment.test_write_location
+        if not test_write_path:
+            test_write_path = self.environment.get_gentest_directory()
+        
+        if test_write_path == "not_possible":
+            return None
+
+        class_name = self.get_class_name(generated_test)
+
+        # given a path such as src/test/java/foo/bar/alpha, returns foo.bar.alpha, 
+        # which needs to be added at the beginning of the test file
+        package_import = str(test_write_path).split("src/test/java/")[1].replace("/", ".")
+        # write a file whose first line is the package information (all the directories after java to get to this file)
+
+        testfile_code = self.write_gentest_file(generated_test, package_import, class_name)
+        testfile_path = test_write_path / f"{class_name}.java"
+        return testfile_path, testfile_code, f"{package_import}.{class_name}"
+
 
     def get_class_name(self, class_code):
         """
@@ -261,21 +336,12 @@ public class {class_name} {{
         """
         Run a single specified test class.
         """
+        if self.maven_session is not None:
+            return self.maven_session.run_test_classes([class_name], timeout=TIMEOUT)
         try:
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} mvn -Dtest={class_name} -B test {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            test_results = self.parse_mvn_test(stdout)
-            result = {
-                "status_result": status_result,
-                "test_results": test_results,
-                "stdout": stdout,
-                "stderr": stderr,
-            }
+            command = self._get_test_command(class_name)
+            stdout, stderr, maven_log = self._run_maven(command)
+            result = self._parse_test_run(stdout, stderr, maven_log)
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
@@ -283,19 +349,69 @@ public class {class_name} {{
         return result
 
     def run_test_case(self, class_name, test_method_name):
+        if self.maven_session is not None:
+            return self.maven_session.run_test_classes([f"{class_name}#{test_method_name}"], timeout=TIMEOUT)
         try:
             full_test_name = f"{class_name}#{test_method_name}"
-            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} mvn -Dtest={full_test_name} -B test {self.maven_logging_level}"
-            output = subprocess.run(
-                shlex.split(command), capture_output=True, timeout=TIMEOUT
-            )
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            test_results = self.parse_mvn_test(stdout)
+            command = self._get_test_command(full_test_name)
+            stdout, stderr, maven_log = self._run_maven(command)
+            result = self._parse_test_run(stdout, stderr, maven_log)
+
+        except subprocess.TimeoutExpired:
+            result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
+
+        return result
+
+    def _get_test_command(self, test_selection):
+        """Command running a test class, or a single test method as Class#method, in a new container."""
+        return f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn -Dtest={test_selection} -B test {self.maven_options}"
+
+    def _parse_test_run(self, stdout, stderr, maven_log: MavenLogParser = None):
+        if maven_log is None:
+            maven_log = MavenLogParser()
+            maven_log.parse(stdout)
+        return {
+            "status_result": maven_log.status,
+            "test_results": maven_log.result(),
+            "stdout": stdout,
+            "stderr": stderr,
+        }
+
+    def _run_maven(self, command, timeout=TIMEOUT):
+        """
+        Run a docker command, parsing the Maven output as it comes and keeping only its head and tail in memory.
+        :returns: tuple of (stdout, stderr, MavenLogParser)
+        """
+        maven_log = MavenLogParser()
+        output = run_container(shlex.split(command), timeout=timeout, parsers=[maven_log])
+        if maven_log.offline_miss and self.maven_offline:
+            # Artifacts missing from the snapshot are resolved into it online, once.
+            Logger().get_logger().info("Maven is missing artifacts offline, running it again online")
+            maven_log = MavenLogParser()
+            online_command = [arg for arg in shlex.split(command) if arg != "-o"]
+            output = run_container(online_command, timeout=timeout, parsers=[maven_log])
+        return output.stdout, output.stderr, maven_log
+
+    def run_test_classes(self, class_names, timeout=TIMEOUT):
+        """
+        Run several test classes in a single Maven invocation, in the Maven session if one is started.
+        :param class_names: test classes, or single test methods as Class#method
+        :returns: dict with the keys status_result, test_results, class_results (per class results
+            parsed from the Surefire XML reports), stdout and stderr
+        """
+        if self.maven_session is not None:
+            return self.maven_session.run_test_classes(class_names, timeout=timeout)
+
+        class_names = list(class_names)
+        try:
+            remove_class_reports(self.repo_full_path, class_names)
+            command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} mvn -B test {get_test_selection_options(class_names)} {self.maven_options}"
+            stdout, stderr, maven_log = self._run_maven(command, timeout)
+            class_results = collect_class_results(self.repo_full_path, class_names)
             result = {
-                "status_result": status_result,
-                "test_results": test_results,
+                "status_result": maven_log.status,
+                "test_results": surefire.summarize(class_results),
+                "class_results": class_results,
                 "stdout": stdout,
                 "stderr": stderr,
             }
@@ -305,6 +421,155 @@ public class {class_name} {{
 
         return result
 
+    def run_generated_tests(self, generated_tests):
+        """
+        Write several generated tests as separate test classes and run them all in a single Maven invocation.
+        Generated classes sharing a name are renamed with a numeric suffix.
+        Classes failing to compile are left out and the others run again, so they still get their results.
+        :param generated_tests: list of generated test code
+        :returns: list with, for each generated test, a dict with the keys class_name and class_result
+            (the parsed Surefire results, None if the class did not run, ex) it failed to compile),
+            along with the status_result, stdout and stderr of the last run the class was part of
+        """
+        test_write_path = self.environment.test_write_location
+        if not test_write_path:
+            test_write_path = self.environment.get_gentest_directory()
+
+        if test_write_path == "not_possible":
+            result = {"success": False, "stdout": "n/a", "stderr": f"Cannot parse structure of the repo to write and run generated tests"}
+            return [result for _ in generated_tests]
+
+        package_import = str(test_write_path).split("src/test/java/")[1].replace("/", ".")
+
+        class_names = []
+        original_contents = {}
+        for i, generated_test in enumerate(generated_tests):
+            class_name = self.get_class_name(generated_test)
+            if class_name in class_names:
+                # rename the generated class, or the default class wrapping the generated test
+                unique_name = f"{class_name}{i}"
+                generated_test = re.sub(rf"\b{re.escape(class_name)}\b", unique_name, generated_test)
+                class_name = unique_name
+            class_names.append(class_name)
+
+            testfile_path = test_write_path / f"{class_name}.java"
+            original_contents[class_name] = open(testfile_path).read() if os.path.exists(testfile_path) else None
+            with open(testfile_path, "w") as tf:
+                tf.write(self.write_gentest_file(generated_test, package_import, class_name))
+
+        def restore(class_name):
+            testfile_path = test_write_path / f"{class_name}.java"
+            contents = original_contents.pop(class_name)
+            if contents is not None:
+                with open(testfile_path, "w") as f:
+                    f.write(contents)
+            else:
+                os.remove(testfile_path)
+
+        runs = {}
+        remaining = list(class_names)
+        try:
+            while remaining:
+                run = self.run_test_classes([f"{package_import}.{name}" for name in remaining])
+                runs.update((name, run) for name in remaining)
+                # A class failing to compile keeps every other class from running, rerun the others without it.
+                broken = self._get_uncompiled_classes(run, package_import, remaining)
+                if not broken or len(broken) == len(remaining):
+                    break
+                for name in broken:
+                    restore(name)
+                remaining = [name for name in remaining if name not in broken]
+        finally:
+            for name in list(original_contents):
+                restore(name)
+
+        results = []
+        for name in class_names:
+            run = runs[name]
+            results.append({
+                "class_name": f"{package_import}.{name}",
+                "class_result": run.get("class_results", {}).get(f"{package_import}.{name}"),
+                "status_result": run.get("status_result", "UNKNOWN"),
+                "stdout": run["stdout"],
+                "stderr": run["stderr"],
+            })
+        return results
+
+    def _get_uncompiled_classes(self, run, package_import, class_names):
+        """Generated classes among class_names with compilation errors in the output of the run."""
+        if run.get("status_result") != "FAILURE":
+            return []
+        maven_log = MavenLogParser()
+        maven_log.parse(run["stdout"])
+        package_path = package_import.replace(".", "/")
+        return [
+            name for name in class_names
+            if any(path.endswith(f"/{package_path}/{name}.java") for path in maven_log.compilation_errors)
+        ]
+
+    def start_maven_session(self):
+        """
+        Keep one container alive for the repo, warmed up by compiling it once.
+        Until stop_maven_session is called, run_test_class, run_test_case, run_test_classes and
+        run_generated_test(s) run in it, saving container startup, plugin resolution and full recompilation.
+        :returns: the result of the warm up build
+        """
+        if self.maven_session is None:
+            if self.local_repository:
+                volumes = {self.local_repository: "/root/.m2"}
+            elif self.snapshot_volume:
+                volumes = {self.snapshot_volume: MAVEN_REPOSITORY_DIR}
+            else:
+                volumes = dict(CACHE_VOLUMES["maven"])
+            docker = DockerSession(self.docker_image, self.docker_tag, self.docker_work_dir, volumes, cache_volumes=False)
+            self.maven_session = MavenSession(
+                docker, self.repo_full_path, f"{self.maven_options} {MAVEN_LOCK_OPTIONS}"
+            )
+        return self.maven_session.start(timeout=TIMEOUT)
+
+    def snapshot_dependencies(self, timeout=TIMEOUT):
+        """
+        Resolve every dependency of the repo once into a volume keyed by the hash of its pom files, see
+        `_dependency_snapshots`. Following Maven commands use that volume as their repository and run offline, rather
+        than resolving the dependencies again. Coverage runs stay online, they add plugins.
+        Besides `mvn dependency:go-offline`, the test goals run once online, resolving what go-offline misses,
+        ex) the Surefire providers. Test failures do not fail the snapshot.
+        Does nothing with a local repository.
+        :returns: dict with the keys success, volume, created (whether the dependencies were resolved now), stdout and stderr
+        """
+        if self.local_repository:
+            return {"success": False, "stdout": "n/a", "stderr": "Dependency snapshots are not used with a local repository"}
+        volume = get_snapshot_volume(self.repo_full_path, "maven")
+        if volume is None:
+            return {"success": False, "stdout": "n/a", "stderr": "No pom.xml found"}
+
+        result = {"success": True, "volume": volume, "created": False, "stdout": "", "stderr": ""}
+        if not is_snapshot_complete(volume):
+            try:
+                command = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self._get_repository_setting(volume)} {' '.join(get_container_limits().get_options())} {self.docker_image}:{self.docker_tag} mvn dependency:go-offline test -Dmaven.test.failure.ignore=true -B {self.maven_logging_level}"
+                stdout, stderr, maven_log = self._run_maven(command, timeout)
+            except subprocess.TimeoutExpired:
+                return {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
+            if maven_log.status != "SUCCESS" or not mark_snapshot_complete(volume):
+                return {"success": False, "volume": volume, "created": False, "stdout": stdout, "stderr": stderr}
+            result.update(created=True, stdout=stdout, stderr=stderr)
+
+        self.stop_maven_session()
+        self.snapshot_volume = volume
+        self.repository_setting = self._get_repository_setting(volume)
+        self.maven_offline = True
+        return result
+
+    def _get_repository_setting(self, volume):
+        """Repository setting of the `docker run` commands using the volume as Maven repository."""
+        return f"-v {volume}:{MAVEN_REPOSITORY_DIR} -e MAVEN_OPTS={shlex.quote(MAVEN_LOCK_OPTIONS)}"
+
+    def stop_maven_session(self):
+        """Stop the Maven session, if started."""
+        if self.maven_session is not None:
+            self.maven_session.close()
+            self.maven_session = None
+
     def install_spotbugs(self, spotbugs_path):
         """Download Spotbugs from official release page to home directory"""
         r = requests.get(
@@ -331,11 +596,9 @@ public class {class_name} {{
             # commandS = f"docker run --rm -v {local_workspace}:/home -w /home {self.docker_image}:{self.docker_tag} java -jar /home/spotbugs/spotbugs-4.7.3/lib/spotbugs.jar -textui -sarif={self.docker_work_dir}/spotbugs.sarif -low {self.docker_work_dir}"
             commandS = f"docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -v {str(spotbugs_path)}:/home/spotbugs/ {self.docker_image}:{self.docker_tag} java -jar /home/spotbugs/spotbugs-4.7.3/lib/spotbugs.jar -textui -sarif={self.docker_work_dir}/spotbugs.sarif -low {self.docker_work_dir} {self.maven_logging_level}"
 
-            output = subprocess.run(
-                shlex.split(commandS), capture_output=True, timeout=TIMEOUT
-            )
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
+            output = run_container(shlex.split(commandS), timeout=TIMEOUT)
+            stdout = output.stdout
+            stderr = output.stderr
             result = {"stdout": stdout, "stderr": stderr.strip(), "spotbugs_sarif": Path(self.repo_full_path) / "spotbugs.sarif"}
 
         except subprocess.TimeoutExpired:
@@ -345,22 +608,54 @@ public class {class_name} {{
 
     def run_custom_command(self, command):
         try:
-            command = f'docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.repository_setting} {self.docker_image}:{self.docker_tag} {command}'
-            output = subprocess.run(shlex.split(command), capture_output=True, timeout=TIMEOUT)
-            stdout = output.stdout.decode("utf-8")
-            stderr = output.stderr.decode("utf-8")
-            status_result = self.parse_mvn_status(stdout)
-            result = {"status_result": status_result, "stdout": stdout, "stderr": stderr}
+            command = f'docker run --rm -v {self.repo_full_path}:{self.docker_work_dir} -w {self.docker_work_dir} {self.docker_options} {self.docker_image}:{self.docker_tag} {command}'
+            stdout, stderr, maven_log = self._run_maven(command)
+            result = {"status_result": maven_log.status, "stdout": stdout, "stderr": stderr}
 
         except subprocess.TimeoutExpired:
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
 
         return result
 
-    def get_coverage(self):
+    def get_coverage(self, coverage_tool: str = None):
         """
-        Run Cobertura Maven plugin to generate coverage report.
+        Generate a coverage report with the configured coverage tool.
         Note that the current methodology is hard coupled with Maven.
+
+        :param coverage_tool: 'cobertura' or 'jacoco'. Defaults to the tool given at construction.
+        """
+        coverage_tool = coverage_tool or self.coverage_tool
+        if coverage_tool == "jacoco":
+            return self.get_jacoco_coverage()
+        elif coverage_tool != "cobertura":
+            raise ValueError(f"Unsupported coverage tool: {coverage_tool}")
+
+        return self.get_cobertura_coverage()
+
+    def get_jacoco_coverage(self, threads: str = "1C"):
+        """
+        Run the JaCoCo agent through surefire to generate coverage report.
+        Modules are built in parallel with Maven's -T flag, and the pom.xml is left untouched.
+
+        :param threads: value for Maven's -T flag
+        :returns: Cobertura formatted report under the '.' key, or the failed command result
+        """
+        pom_path = Path(self.repo_full_path) / "pom.xml"
+        if not self.jacoco_plugin:
+            self.jacoco_plugin = JacocoMavenPlugin.load(pom_path)
+
+        custom_command = f"{self.jacoco_plugin.get_coverage_command(threads)} {self.maven_logging_level}"
+        result = self.run_custom_command(custom_command)
+
+        # Failed to generate coverage report
+        if result.get("status_result") != "SUCCESS":
+            return result
+
+        return self.jacoco_plugin.get_all_reports(self.docker_work_dir)
+
+    def get_cobertura_coverage(self):
+        """
+        Run Cobertura Maven plugin to generate coverage report.
         """
         pom_path = Path(self.repo_full_path) / "pom.xml"
         if not self.cobertura_plugin:
@@ -425,56 +720,12 @@ public class {class_name} {{
 
         return fn2coverage
 
-    # TODO: C# has this same method. Refactor to a common method.
     def _adapt_cobertura_report(self, report: dict):
         """
         Adapt the cobertura report to the format that the coverage report expects.
-
-        Mainly carries out two operations.
-        1. Renames the sources
-            The sources point to the docker mount path, which is not the repo full path.
-            ex) old: /usr/src/mymaven/apollo-adminservice/src/main/java
-            ex) new: /datadisk/src/apollo/apollo-adminservice/src/main/java
-        2. Renames the package file paths
-            The file paths are relative to "com" or "org" or "net" etc. Change them to be relative to the repo root.
-            ex) old: com/ctrip/framework/apollo/adminservice/config/ConfigServiceConfig.java
-            ex) new: apollo-adminservice/src/main/java/com/ctrip/framework/apollo/adminservice/config/ConfigServiceConfig.java
-        """
-        # Check for multiproject repos
-        if '.' in report:
-            if len(report) > 1:
-                logging.warning(f"Found multiple projects in the coverage report. Using aggregated report.")
-            report = report['.']
-
-        # Change the Cobertura source paths to point to the repo full path instead of the docker mount path.
-        new_sources = []
-        for source in report['coverage']['sources']['source']:
-            # The source states docker work dir, replace it with the repo full dir.
-            if source.startswith(self.docker_work_dir):
-                source = source.replace(self.docker_work_dir, str(self.repo_full_path))
-            new_sources.append(source)
-        report['coverage']['sources']['source'] = new_sources
-
-        # Change the Cobertura packages to point to the repo full path instead of the docker mount path.
-        packages = report['coverage']['packages']['package']
-        if isinstance(packages, dict):
-            packages = [packages]
-
-        for package in packages:
-            file_dicts = package['classes']['class']
-            if isinstance(file_dicts, dict):
-                file_dicts = [file_dicts]
-
-            for f in file_dicts:
-                filepath = f.get('@filename')
-
-                for source in new_sources:
-                    potential_path = Path(source) / filepath
-                    if potential_path.exists():
-                        f['@filename'] = str(potential_path.relative_to(self.repo_full_path))
-                        break
-
-        return report
+        See `plum.utils.cobertura.adapt_cobertura_report`.
+        """
+        return adapt_cobertura_report(report, self.repo_full_path, self.docker_work_dir)
 
     # ------------------- PARSING UTILITIES -------------------
 
@@ -501,28 +752,8 @@ public class {class_name} {{
         return spotbugs_result
 
     def parse_mvn_test(self, maven_output):
-        # Find all matches of the "Results" section in the Maven output
-        results_matches = re.findall(
-            r"\[INFO\] Results:\s*\[INFO\]\s*\n\[INFO\]\s*Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)",
-            maven_output,
-        )
-
-        # Summing up the values for each category from the "Results" section
-        tests_run = sum(int(match[0]) for match in results_matches)
-        failures = sum(int(match[1]) for match in results_matches)
-        errors = sum(int(match[2]) for match in results_matches)
-        skipped = sum(int(match[3]) for match in results_matches)
-
-        result_status = self.parse_mvn_status(maven_output)
-
-        test_results = {
-            "tests_run": tests_run,
-            "failures": failures,
-            "errors": errors,
-            "skipped": skipped,
-        }
-
-        return test_results
+        # Sum up the "Results" sections of the Maven output, the same way as while Maven runs.
+        return MavenLogParser().parse(maven_output)
 
     def parse_mvn_status(self, maven_output):
         # Determining overall success or failure based on BUILD status
@@ -0,0 +1,187 @@
+/*
+ * Long-lived Jest/Mocha harness. See plum/actions/javascript/test_server.py.
+ *
+ * Usage: node _test_server.js <repo_root> <jest|mocha>
+ *
+ * Protocol: one JSON request per line on stdin, one JSON response per line on stdout.
+ *   request:  {"id": 1, "path": "/abs/path/foo.test.js", "timeout": 5000}
+ *   response: {"id": 1, "outcome": "passed", "tests": [...], "stdout": "", "stderr": "", "duration": 12}
+ *
+ * The test framework is loaded from the repo's node_modules once; anything it prints while running
+ * a request is captured and returned instead of corrupting the protocol stream.
+ */
+"use strict";
+
+const path = require("path");
+const readline = require("readline");
+
+const repoRoot = path.resolve(process.argv[2] || ".");
+const testLibrary = process.argv[3] || "jest";
+
+function requireFromRepo(name) {
+  return require(require.resolve(name, { paths: [repoRoot] }));
+}
+
+const protocolWrite = process.stdout.write.bind(process.stdout);
+function send(message) {
+  protocolWrite(JSON.stringify(message) + "\n");
+}
+
+/* Redirect everything written to stdout/stderr while a test runs into buffers. */
+function captureOutput() {
+  const captured = { stdout: "", stderr: "" };
+  const originals = { stdout: process.stdout.write, stderr: process.stderr.write };
+  for (const stream of ["stdout", "stderr"]) {
+    process[stream].write = function (chunk, encoding, callback) {
+      captured[stream] += typeof chunk === "string" ? chunk : Buffer.from(chunk).toString("utf8");
+      if (typeof encoding === "function") encoding();
+      else if (typeof callback === "function") callback();
+      return true;
+    };
+  }
+  captured.restore = () => {
+    process.stdout.write = originals.stdout;
+    process.stderr.write = originals.stderr;
+  };
+  return captured;
+}
+
+function summarize(tests, error) {
+  if (error) return "error";
+  if (tests.length === 0) return "error";
+  if (tests.some((t) => t.outcome === "error")) return "error";
+  if (tests.some((t) => t.outcome === "failed")) return "failed";
+  if (tests.every((t) => t.outcome === "skipped")) return "error";
+  return "passed";
+}
+
+/* Jest: runCLI in band, Jest caches its haste map and transforms between calls. */
+let jest = null;
+async function runJest(request) {
+  if (jest === null) jest = requireFromRepo("jest");
+  const argv = {
+    _: [request.path],
+    $0: "jest",
+    runInBand: true,
+    runTestsByPath: true,
+    ci: true,
+    silent: true,
+    watch: false,
+    watchman: false,
+    testTimeout: request.timeout,
+  };
+  const { results } = await jest.runCLI(argv, [repoRoot]);
+
+  const tests = [];
+  let error = "";
+  for (const suite of results.testResults) {
+    if (suite.testExecError || (suite.failureMessage && suite.testResults.length === 0)) {
+      error = suite.failureMessage || String(suite.testExecError.message || suite.testExecError);
+    }
+    for (const assertion of suite.testResults) {
+      tests.push({
+        name: assertion.fullName || assertion.title,
+        outcome: { passed: "passed", failed: "failed" }[assertion.status] || "skipped",
+        message: (assertion.failureMessages || []).join("\n"),
+      });
+    }
+  }
+  return { tests, error };
+}
+
+/* Mocha: a fresh Mocha instance per request, the repo's own modules are reloaded each time. */
+let Mocha = null;
+let mochaOptions = {};
+function loadMocha() {
+  Mocha = requireFromRepo("mocha");
+  try {
+    // Honors .mocharc.* and the "mocha" key of package.json, ex) --require ts-node/register
+    const { loadOptions } = requireFromRepo("mocha/lib/cli/options");
+    mochaOptions = loadOptions([]);
+  } catch (e) {
+    mochaOptions = {};
+  }
+  for (const module of [].concat(mochaOptions.require || [])) {
+    requireFromRepo(module);
+  }
+}
+
+function unloadRepoModules() {
+  for (const key of Object.keys(require.cache)) {
+    if (key.startsWith(repoRoot) && !key.includes(`${path.sep}node_modules${path.sep}`)) {
+      delete require.cache[key];
+    }
+  }
+}
+
+async function runMocha(request) {
+  if (Mocha === null) loadMocha();
+  const mocha = new Mocha({ ...mochaOptions, spec: undefined, timeout: request.timeout, reporter: Mocha.reporters.Base });
+  mocha.addFile(request.path);
+
+  const tests = [];
+  try {
+    if (typeof mocha.loadFilesAsync === "function") await mocha.loadFilesAsync();
+    await new Promise((resolve) => {
+      const runner = mocha.run(() => resolve());
+      runner.on("pass", (test) => tests.push({ name: test.fullTitle(), outcome: "passed", message: "" }));
+      runner.on("pending", (test) => tests.push({ name: test.fullTitle(), outcome: "skipped", message: "" }));
+      runner.on("fail", (test, err) =>
+        tests.push({
+          name: test.fullTitle(),
+          // failing before/after hooks mean the tests could not run
+          outcome: test.type === "hook" ? "error" : "failed",
+          message: String((err && (err.stack || err.message)) || err),
+        })
+      );
+    });
+    return { tests, error: "" };
+  } finally {
+    if (typeof mocha.dispose === "function") mocha.dispose();
+    unloadRepoModules();
+  }
+}
+
+async function handle(request) {
+  const start = Date.now();
+  const captured = captureOutput();
+  let result;
+  try {
+    result = testLibrary === "mocha" ? await runMocha(request) : await runJest(request);
+  } catch (e) {
+    result = { tests: [], error: String((e && (e.stack || e.message)) || e) };
+  } finally {
+    captured.restore();
+  }
+  return {
+    id: request.id,
+    path: request.path,
+    outcome: summarize(result.tests, result.error),
+    tests: result.tests,
+    error: result.error,
+    duration: Date.now() - start,
+    stdout: captured.stdout,
+    stderr: captured.stderr,
+  };
+}
+
+function main() {
+  process.chdir(repoRoot);
+  // Framework load failures surface as errors of the first request rather than killing the server.
+  send({ ready: true, testLibrary });
+
+  let queue = Promise.resolve();
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on("line", (line) => {
+    if (!line.trim()) return;
+    const request = JSON.parse(line);
+    if (request.command === "shutdown") {
+      lines.close();
+      return;
+    }
+    queue = queue.then(() => handle(request)).then(send);
+  });
+  lines.on("close", () => queue.then(() => process.exit(0)));
+}
+
+main();
@@ -0,0 +1,162 @@
+"""
+Persistent Jest/Mocha runner for evaluating generated tests.
+
+`npm test <file>` boots npm, Node, the test framework and its transpilers for every generated test.
+The test server loads the repo's test framework once in a long-lived Node process and runs each
+submitted test file in it, returning structured per test results instead of console output.
+"""
+import json
+import select
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from plum.utils.logger import Logger
+
+
+SERVER_SCRIPT = Path(__file__).with_name("_test_server.js")
+"""Node script implementing the server side of the protocol."""
+
+SUPPORTED_TEST_LIBRARIES = ("jest", "mocha")
+
+
+class NodeTestServer:
+    """Client for a long-lived Node process running Jest or Mocha tests of a repo."""
+
+    def __init__(
+            self,
+            repo_root: Union[str, Path],
+            test_library: str,
+            node_path: str = "node",
+            startup_timeout: float = 30,
+            grace_period: float = 10,
+        ):
+        """
+        Args:
+            repo_root: Root of the repo, the test framework is loaded from its node_modules.
+            test_library: jest or mocha.
+            node_path: Node executable.
+            startup_timeout: Time in seconds to wait for the server to start.
+            grace_period: Time in seconds added to the test timeout before the server is considered hung.
+                Covers the per run overhead of the framework, ex) Jest resolving its configuration.
+        """
+        if test_library not in SUPPORTED_TEST_LIBRARIES:
+            raise ValueError(f"Unsupported test library {test_library}, expected one of {SUPPORTED_TEST_LIBRARIES}")
+        self.repo_root = Path(repo_root)
+        """Root of the repo."""
+        self.test_library = test_library
+        """jest or mocha."""
+        self.node_path = node_path
+        """Node executable."""
+        self.startup_timeout = startup_timeout
+        """Time in seconds to wait for the server to start."""
+        self.grace_period = grace_period
+        """Time in seconds added to the test timeout before the server is considered hung."""
+
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self):
+        """Start the server and wait until it is ready to accept tests."""
+        if self.is_alive():
+            return
+        if shutil.which(self.node_path) is None:
+            raise RuntimeError(f"{self.node_path} was not found")
+
+        self._process = subprocess.Popen(
+            [self.node_path, str(SERVER_SCRIPT), str(self.repo_root), self.test_library],
+            cwd=self.repo_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        message = self._read_message(self.startup_timeout)
+        if message is None or not message.get("ready"):
+            self.close()
+            raise RuntimeError(f"Node test server failed to start in {self.repo_root}")
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, test_file: Union[str, Path], timeout: float = 5) -> dict:
+        """
+        Run a single test file.
+
+        Args:
+            test_file: Path to the test file, absolute or relative to the repo root.
+            timeout: Time in seconds each test is allowed to run.
+
+        Returns:
+            Dictionary with the keys path, outcome (passed, failed, error or timeout), tests (name, outcome
+            and message of each test), error, duration (ms), stdout and stderr.
+            A test hanging the server past the timeout restarts it and is reported as a timeout.
+        """
+        path = str((self.repo_root / test_file).resolve())
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+
+            self._next_id += 1
+            request = {"id": self._next_id, "path": path, "timeout": int(timeout * 1000)}
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+
+            response = self._read_message(timeout + self.grace_period)
+            if response is not None:
+                return response
+
+            # The test crashed Node, or is stuck in a synchronous loop that cannot be interrupted from inside Node.
+            # Either way the server is discarded and restarted by the next run.
+            # After a crash stdout is at EOF, which select reports as readable; a hung server has nothing to read.
+            timed_out = not select.select([self._process.stdout], [], [], 0)[0]
+            Logger().get_logger().error(f"Node test server {'timed out' if timed_out else 'exited'} on {path}")
+            self._process.kill()
+            self._process.wait()
+            self.close()
+            return {
+                "path": path,
+                "outcome": "timeout" if timed_out else "error",
+                "tests": [],
+                "error": "" if timed_out else "The test server exited",
+                "duration": int((timeout + self.grace_period) * 1000),
+                "stdout": "n/a",
+                "stderr": "Timeout" if timed_out else "n/a",
+            }
+
+    def close(self):
+        """Stop the server."""
+        if self._process is None:
+            return
+        try:
+            if self._process.poll() is None:
+                self._process.stdin.write(json.dumps({"command": "shutdown"}) + "\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        finally:
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process = None
+
+    def _read_message(self, timeout: float) -> Optional[dict]:
+        """Read a single JSON line from the server, None if it died or timed out."""
+        ready, _, _ = select.select([self._process.stdout], [], [], timeout)
+        if not ready:
+            return None
+        line = self._process.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
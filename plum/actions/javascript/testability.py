@@ -0,0 +1,157 @@
+"""
+Batched testability probe for JavaScript and TypeScript files.
+
+A file is testable when a test loading it runs under the repo's test framework. Rather than running
+`npm test` once per source file, a probe test loading each file is generated next to it, so that the
+repo's test framework configuration (ex. Jest `roots`) applies, and all probes are run at once:
+in a single Jest invocation reading the `--json` report, or one after the other in a single Mocha process
+(Mocha aborts the whole run when one file fails to load, so the probes cannot share a run).
+"""
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from plum.actions.javascript.test_server import NodeTestServer
+from plum.utils.logger import Logger
+
+
+SANITY_TEST = {
+    "jest": """
+describe('Trivial Sanity Test', () => {
+test('trivial (always passes)', () => {
+expect(3).toBe(3);
+});
+});
+""",
+    "mocha": """
+describe('Trivial Sanity Test', () => {
+it('trivial (always passes)', () => {});
+});
+""",
+}
+"""Test appended to each probe, passes whenever the probed file loads."""
+
+
+def _probe_source(source_file: Path, test_library: str) -> str:
+    """Contents of the probe test loading the given source file."""
+    if source_file.suffix in (".ts", ".tsx"):
+        # TypeScript projects may not have the node typings `require` needs.
+        load = f"import {json.dumps(source_file.with_suffix('').as_posix())};"
+    else:
+        load = f"require({json.dumps(source_file.as_posix())});"
+    return load + "\n" + SANITY_TEST[test_library]
+
+
+PROBE_MARKER = "plum-probe"
+"""Part of the probe file names, also used as the Jest test path pattern selecting the probes."""
+
+
+def write_probes(source_files: List[Path], test_library: str) -> Dict[Path, Path]:
+    """
+    Write one probe test next to each source file, ex) `src/foo.plum-probe.test.js` for `src/foo.js`.
+    Source files with an existing file at the probe path, or in a read only directory, are skipped.
+
+    Returns:
+        Dictionary of probe path to the source file it loads.
+    """
+    probes = {}
+    for source_file in source_files:
+        probe = source_file.with_name(f"{source_file.stem}.{PROBE_MARKER}.test{source_file.suffix}")
+        if probe.exists():
+            continue
+        try:
+            probe.write_text(_probe_source(source_file, test_library))
+        except OSError:
+            continue
+        probes[probe] = source_file
+    return probes
+
+
+def _testable_from_jest_report(report: dict, probes: Dict[Path, Path]) -> List[Path]:
+    testable = []
+    for suite in report.get("testResults", []):
+        source_file = probes.get(Path(suite["name"]))
+        assertions = suite.get("assertionResults", [])
+        if (
+            source_file is not None
+            and suite.get("status") == "passed"
+            and assertions
+            and all(a["status"] == "passed" for a in assertions)
+        ):
+            testable.append(source_file)
+    return testable
+
+
+def probe_testable_files(
+        repo_root: Union[str, Path],
+        source_files: List[Union[str, Path]],
+        test_library: Optional[str] = "jest",
+        timeout: Optional[float] = None,
+    ) -> List[Path]:
+    """
+    Find which of the given source files are testable with the repo's test framework.
+
+    Args:
+        repo_root: Root of the repo, with its node_modules installed.
+        source_files: Absolute paths of the files to probe.
+        test_library: jest or mocha. Defaults to jest like `is_testable_file`.
+        timeout: Time in seconds for the whole probe. Defaults to a minute plus a second per file.
+
+    Returns:
+        The testable source files, in the order given.
+    """
+    repo_root = Path(repo_root).resolve()
+    source_files = [Path(f).resolve() for f in source_files]
+    test_library = test_library or "jest"
+    if not source_files:
+        return []
+    if timeout is None:
+        timeout = 60 + len(source_files)
+
+    probes = write_probes(source_files, test_library)
+    try:
+        if not probes:
+            testable = []
+        elif test_library == "mocha":
+            testable = _probe_with_mocha(repo_root, probes, timeout)
+        else:
+            testable = _probe_with_jest(repo_root, probes, timeout)
+    finally:
+        for probe in probes:
+            probe.unlink(missing_ok=True)
+
+    testable = set(testable)
+    return [f for f in source_files if f in testable]
+
+
+def _probe_with_jest(repo_root: Path, probes: Dict[Path, Path], timeout: float) -> List[Path]:
+    report_dir = Path(tempfile.mkdtemp())
+    report_path = report_dir / "report.json"
+    # The positional argument restricts the run to the probes, `npm test` runs the repo's jest binary.
+    command = ["npm", "test", "--", "--json", f"--outputFile={report_path}", "--ci", "--silent", rf"\.{PROBE_MARKER}\.test\."]
+    try:
+        subprocess.run(command, cwd=repo_root, capture_output=True, timeout=timeout)
+        with open(report_path) as f:
+            report = json.load(f)
+        return _testable_from_jest_report(report, probes)
+    except subprocess.TimeoutExpired:
+        Logger().get_logger().error(f"TimeoutExpired: probing {len(probes)} files exceeded {timeout}s")
+        return []
+    except (OSError, ValueError):
+        Logger().get_logger().error(f"Jest did not write a report while probing {repo_root}")
+        return []
+    finally:
+        shutil.rmtree(report_dir, ignore_errors=True)
+
+
+def _probe_with_mocha(repo_root: Path, probes: Dict[Path, Path], timeout: float) -> List[Path]:
+    testable = []
+    with NodeTestServer(repo_root, "mocha") as server:
+        per_file_timeout = max(timeout / len(probes), 1)
+        for probe, source_file in probes.items():
+            if server.run(probe, timeout=per_file_timeout)["outcome"] == "passed":
+                testable.append(source_file)
+    return testable
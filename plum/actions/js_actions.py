@@ -11,7 +11,11 @@ from plum.harnesslib.languages import Language
 import plum.harnesslib.tasks as tasks
 
 from plum.environments.repository import Repository
+from plum.actions._execution_backend import ExecutionBackend
+from plum.actions._local_backend import LocalProcessBackend
 from plum.actions.actions import Actions
+from plum.actions.evaluation_engine import EvaluationJob
+from plum.actions.javascript.test_server import NodeTestServer
 from plum.utils.cobertura import get_function_coverage, parse_xml_as_dict
 from plum.utils.logger import Logger
 from plum.utils.helpers import temporary_file_content_change
@@ -29,8 +33,12 @@ class JavascriptActions(Actions):
 
     """
 
-    def __init__(self, environment):
+    def __init__(self, environment, execution_backend: ExecutionBackend = None):
         super().__init__(environment)
+        self.test_server: NodeTestServer = None
+        """Long-lived Jest/Mocha runner used by run_npm_test. Started on demand with start_test_server."""
+        self.execution_backend = execution_backend or LocalProcessBackend(sandbox=False)
+        """Backend run_test_suite runs npm in. Defaults to a plain local process, node is on the host."""
 
 
     def run_test_suite(self, timeout=30):
@@ -41,35 +49,32 @@ class JavascriptActions(Actions):
         TODO downstream: get javascript working for non-mocha or jest repos
         """
 
-        try:
-
-            if self.environment.test_library == 'mocha':
-
-                test_command = 'mocha --reporter mocha-json-output-reporter'
-                test_report = 'test-report.json'
-            elif self.environment.test_library == 'jest':
-                # TODO fix this
-                test_command = 'jest --json --outputFile=test-report.json'
-                test_report = 'test-report.json'
-            # elif self.environment.test_library == 'tap':
-            #     test_command = ''
-            else:
-                raise Exception("Unsupported test library")
+        if self.environment.test_library == 'mocha':
 
-            self.environment.overwrite_package_json(command=test_command, old_pkg_path='package_run_test_suite.json')
-            path = self.environment.base / self.environment.internal_repo_path
+            test_command = 'mocha --reporter mocha-json-output-reporter'
+            test_report = 'test-report.json'
+        elif self.environment.test_library == 'jest':
+            # TODO fix this
+            test_command = 'jest --json --outputFile=test-report.json'
+            test_report = 'test-report.json'
+        # elif self.environment.test_library == 'tap':
+        #     test_command = ''
+        else:
+            raise Exception("Unsupported test library")
 
+        self.environment.overwrite_package_json(command=test_command, old_pkg_path='package_run_test_suite.json')
+        path = self.environment.base / self.environment.internal_repo_path
+        try:
             command = f'npm test'
-            output = subprocess.run(shlex.split(command), cwd=path, capture_output=True, timeout=timeout)
+            run_result = self.execution_backend.run(command, path, timeout=timeout)
+        finally:
             self.environment.rewrite_package_json(old_pkg_path='package_run_test_suite.json')
 
-        except subprocess.TimeoutExpired:
+        if run_result.timed_out:
             Logger().get_logger().error(f"TimeoutExpired: Your timeout is currently {timeout}s. Increase timeout if needed")
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
-        # stdout = output.stdout.decode("utf-8")
-        # stderr = output.stderr.decode("utf-8")
         if os.path.exists(path / test_report):
             with open(path / test_report, 'r') as f:
                 test_report = json.load(f)
@@ -207,10 +212,53 @@ class JavascriptActions(Actions):
         :param timeout: the timeout for the test execution
         """
 
+        # The server restarts its Node process when a previous test hung or crashed it.
+        if self.test_server is not None:
+            try:
+                return self._run_test_in_server(relative_path, timeout)
+            except RuntimeError as e:
+                Logger().get_logger().error(f"Node test server failed, falling back to npm test: {e}")
+
         path = Path(self.environment.base) / self.environment.internal_repo_path
         output = subprocess.run(['npm', 'test', relative_path], cwd=path, timeout=timeout, capture_output=True)
         stdout = output.stdout.decode("utf-8")
         stderr = output.stderr.decode("utf-8")
+        return self._parse_npm_test(stdout, stderr, test_library)
+
+    def prepare_generated_test(self, generated_test: str, test_file: Path, timeout: int = 5) -> EvaluationJob:
+        """
+        Prepare a generated test to be run by an EvaluationEngine, like run_generated_test with `npm test`.
+        With mocha the generated test is appended to test_file for the duration of the job.
+
+        :param generated_test: string output from the model of a generated test suite/test case
+        :param test_file: the path to the file where the generated test should be saved, unique for each job
+        :param timeout: the timeout for the test execution
+        :return: job saving the test when it starts, with results in the format of run_npm_test
+        """
+        test_library = self.environment.test_library
+        setup, cleanup = None, None
+        if test_library == "mocha":
+            file_change = temporary_file_content_change(test_file, generated_test, mode='a')
+            setup = file_change.__enter__
+            cleanup = lambda: file_change.__exit__(None, None, None)
+        else:
+            saved_file = test_file.with_name(f"{test_file.stem}.test{test_file.suffix}")
+            setup = lambda: self.save_generated_test(generated_test, test_file)
+            test_file = saved_file
+
+        return EvaluationJob(
+            key=str(test_file),
+            language=self.environment.language,
+            command=['npm', 'test', str(test_file)],
+            cwd=Path(self.environment.base) / self.environment.internal_repo_path,
+            parse=lambda returncode, stdout, stderr: self._parse_npm_test(stdout, stderr, test_library),
+            timeout=timeout,
+            setup=setup,
+            cleanup=cleanup,
+            lock_key=str(test_file),
+        )
+
+    def _parse_npm_test(self, stdout, stderr, test_library):
         result = {
             "stdout": stdout,
             "stderr": stderr,
@@ -228,4 +276,32 @@ class JavascriptActions(Actions):
             else:
                 result['success'] = False
 
-        return result
\ No newline at end of file
+        return result
+
+    def start_test_server(self):
+        """
+        Start a long-lived Node process with the repo's Jest or Mocha loaded.
+        Once started, run_npm_test sends test files to it instead of running `npm test` for each one,
+        and results are built from the framework's per test results rather than console output.
+        """
+        if self.test_server is None:
+            path = Path(self.environment.base) / self.environment.internal_repo_path
+            self.test_server = NodeTestServer(path, self.environment.test_library)
+        self.test_server.start()
+
+    def stop_test_server(self):
+        """Stop the Node test server, if running."""
+        if self.test_server is not None:
+            self.test_server.close()
+            self.test_server = None
+
+    def _run_test_in_server(self, relative_path, timeout):
+        """Run run_npm_test through the Node test server, keeping the run_npm_test result format."""
+        response = self.test_server.run(relative_path, timeout=timeout)
+        return {
+            "stdout": response["stdout"],
+            "stderr": response["stderr"],
+            "success": response["outcome"] == "passed",
+            "outcome": response["outcome"],
+            "tests": response["tests"],
+        }
@@ -6,13 +6,22 @@ from pathlib import Path
 import shlex
 from tree_sitter import Language as L, Parser
 import fileinput
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-from plum.utils import fix_indentation, get_pytest_test_failures, remove_fn_from_file, fnhash
+from plum.utils import fix_indentation, get_pytest_test_failures, remove_fn_from_file, fnhash, available_cpus
 from plum.harnesslib.languages import Language
 import plum.harnesslib.tasks as tasks
 
 from plum.environments.repository import Repository
+from plum.environments.workspace_pool import WorkspacePool
+from plum.actions._execution_backend import ExecutionBackend
+from plum.actions._local_backend import LocalProcessBackend
 from plum.actions.actions import Actions
+from plum.actions.evaluation_engine import EvaluationJob
+from plum.actions.python.pytest_batch import run_pytest_batch
+from plum.actions.python.pytest_worker import PytestWorker
+from plum.actions.python.test_impact import TestImpactSelector, filter_test_report, fn2tests_from_coverage_contexts
 from plum.utils.logger import Logger
 
 
@@ -28,32 +37,55 @@ class PythonActions(Actions):
 
     """
 
-    def __init__(self, environment):
+    def __init__(self, environment, execution_backend: ExecutionBackend = None):
         super().__init__(environment)
+        self.pytest_worker: PytestWorker = None
+        """Warm pytest worker used by execute_test. Started on demand with start_pytest_worker."""
+        self.execution_backend = execution_backend or LocalProcessBackend(sandbox=False)
+        """Backend run_test_suite runs pytest in. Defaults to a plain local process, the venv is on the host."""
 
 
-    def run_test_suite(self, timeout=30):
+    def run_test_suite(self, timeout=30, parallel=False, workers=None, per_test_timeout=None, repo_root=None, test_ids=None):
         """
         Run the existing test suite of the environment
+        :param timeout: time in seconds the whole test suite is allowed to run
+        :param parallel: whether to distribute the tests over several processes with pytest-xdist.
+            pytest-json-report merges the reports of the xdist workers, so the report format is unchanged
+        :param workers: number of xdist workers, defaults to the number of available CPUs
+        :param per_test_timeout: time in seconds each test is allowed to run, enforced by pytest-timeout
+        :param repo_root: copy of the repo to run the tests in, ex) a workspace of a WorkspacePool.
+            Defaults to the environment's repo root
+        :param test_ids: pytest node ids to run, ex) selected by a TestImpactSelector. Defaults to the whole suite
         :returns: JSON report of which tests passed and failed
         """
-
-        try:
-            command = f'{os.fspath(self.environment.interpreter_path)} -m pytest --json-report'
-            output = subprocess.run(shlex.split(command), cwd=self.environment.repo_root, capture_output=True, timeout=timeout)
-
-        except subprocess.TimeoutExpired:
+        repo_root = Path(repo_root) if repo_root is not None else self.environment.repo_root
+        env = None
+        if repo_root != self.environment.repo_root:
+            # The venv may hold an editable install pointing at the original clone, make the copy win.
+            source_dirs = [str(d) for d in [repo_root / "src", repo_root] if d.is_dir()]
+            env = {"PYTHONPATH": os.pathsep.join(source_dirs + [os.environ.get("PYTHONPATH", "")]).rstrip(os.pathsep)}
+
+        command = f'{os.fspath(self.environment.interpreter_path)} -m pytest --json-report'
+        if parallel:
+            command += f' -n {workers or available_cpus()}'
+        if per_test_timeout:
+            command += f' --timeout={per_test_timeout}'
+        if test_ids:
+            command += ' ' + shlex.join(test_ids)
+        run_result = self.execution_backend.run(command, repo_root, timeout=timeout, env=env)
+
+        if run_result.timed_out:
             Logger().get_logger().error(f"TimeoutExpired: Your timeout is currently {timeout}s. Increase timeout if needed")
             result = {"success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
 
-        stdout = output.stdout.decode("utf-8")
-        stderr = output.stderr.decode("utf-8")
+        # Only the head and tail of the output are kept, the results come from the JSON report.
+        return_code, stdout, stderr = run_result
         Logger().get_logger().info(stdout)
         Logger().get_logger().debug(stderr)
 
-        with open(self.environment.repo_root / '.report.json', 'r') as f:
+        with open(repo_root / '.report.json', 'r') as f:
             pytest_report = json.load(f)
         return pytest_report
 
@@ -68,7 +100,7 @@ class PythonActions(Actions):
 
                 # run 2 subprocess commands to get coverage json
                 # map tests back to functions by running pytest for each individual test & getting which lines are covered                
-                command = f"{os.fspath(self.environment.interpreter_path)} -m coverage run {self.environment.repo_root}-venv/bin/pytest"
+                command = f"{os.fspath(self.environment.interpreter_path)} -m coverage run -m pytest"
                 output = subprocess.run(shlex.split(command), cwd=self.environment.repo_root, capture_output=True)
 
                 command = f"{os.fspath(self.environment.interpreter_path)} -m coverage json"
@@ -112,13 +144,50 @@ class PythonActions(Actions):
             return result
     
 
-    def map_tests_to_functions(self, control_test_report):
+    def get_fn2tests_from_coverage(self, timeout=None):
+        """
+        Map functions to the tests executing them with a single coverage run, recording which test
+        executed each line through pytest-cov's test contexts. Much cheaper than map_tests_to_functions,
+        but it reports the tests reaching a function rather than the tests depending on it.
+        :param timeout: time in seconds the test suite is allowed to run
+        :returns: dictionary mapping function hash to list of tests that execute it, usable by a TestImpactSelector
+        :raises subprocess.TimeoutExpired: if the test suite did not finish within the timeout
+        :raises RuntimeError: if the coverage run produced no report
+        """
+        repo_root = self.environment.repo_root
+        config_path = repo_root / '.plum-coveragerc'
+        report_path = repo_root / '.plum-coverage-contexts.json'
+        config_path.write_text("[json]\nshow_contexts = True\n")
+        try:
+            command = [
+                os.fspath(self.environment.interpreter_path), '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+                '--cov=.', f'--cov-config={config_path}', '--cov-context=test', f'--cov-report=json:{report_path}',
+            ]
+            output = subprocess.run(command, cwd=repo_root, capture_output=True, timeout=timeout)
+            if not report_path.exists():
+                raise RuntimeError(f"Coverage run produced no report: {output.stderr.decode('utf-8', errors='replace')}")
+            with open(report_path, 'r') as f:
+                coverage_report = json.load(f)
+            return fn2tests_from_coverage_contexts(coverage_report, self.environment.hash2function)
+
+        finally:
+            config_path.unlink(missing_ok=True)
+            report_path.unlink(missing_ok=True)
+            (repo_root / '.coverage').unlink(missing_ok=True)
+
+    def map_tests_to_functions(self, control_test_report, workers=1, selector: TestImpactSelector = None):
         """
         Map tests to the functions they test in the focal file
         NOTE: this is a time intensive call
         :param control_test_report: the test report for the repo before any methods have been removed
+        :param workers: number of functions to process in parallel, each in its own copy of the repo.
+            With a single worker the functions are removed from the repo in place and restored afterwards
+        :param selector: only run the tests impacted by each function, ex) built from get_fn2tests_from_coverage.
+            Functions without a mapping run the full suite
         :returns: dictionary mapping function hash to list of tests that cover it
         """
+        if workers > 1:
+            return self._map_tests_to_functions_in_workspaces(control_test_report, workers, selector)
 
         fn2tests = {}
 
@@ -133,12 +202,9 @@ class PythonActions(Actions):
             with open(file_path, "w") as f:
                 f.write(updated_file_contents)
 
-            # run full test suite
-            test_report = self.run_test_suite()
+            # run the impacted tests, or the full test suite, and map failing tests to focal function
+            failing_tests = self.get_failing_tests(fnhash, control_test_report, selector)
 
-            # map failing tests to focal function
-            failing_tests = get_pytest_test_failures(control_test_report, test_report)
-            
             fn2tests[fnhash] = failing_tests.keys()
 
             # rewrite original file contents
@@ -146,7 +212,9 @@ class PythonActions(Actions):
                 f.write(original_file_contents)
         
         # delete the json report file (if it still exists)
-        os.remove(self.environment.base / self.environment.internal_repo_path / '.report.json')
+        report_path = self.environment.base / self.environment.internal_repo_path / '.report.json'
+        if os.path.exists(report_path):
+            os.remove(report_path)
 
         return fn2tests
         # TODO update to this algorithm once I find a way to run coverage for specific tests
@@ -158,6 +226,44 @@ class PythonActions(Actions):
         # issue: how to get coverage for each individual test? requires unittest?
         # run coverage * # tests
 
+    def get_failing_tests(self, fnhash, control_test_report, selector: TestImpactSelector = None, repo_root=None):
+        """
+        Run the tests impacted by a change to the given function and compare them to the control run
+        :param fnhash: hash of the changed function
+        :param control_test_report: the test report for the repo before the function was changed
+        :param selector: picks the tests covering the function, the full suite runs without one
+        :param repo_root: copy of the repo the function was changed in, defaults to the environment's repo root
+        :returns: dict of the tests failing after the change, in the format of get_pytest_test_failures
+        """
+        test_ids = selector.select(fnhash) if selector is not None else None
+        if test_ids is not None:
+            if not test_ids:
+                # no test reaches the function, nothing can fail
+                return {}
+            control_test_report = filter_test_report(control_test_report, test_ids)
+
+        test_report = self.run_test_suite(repo_root=repo_root, test_ids=test_ids)
+        if test_report.get("success", "") == False:
+            # the suite timed out, every test counts as not run
+            test_report = {"tests": []}
+        return get_pytest_test_failures(control_test_report, test_report)
+
+    def _map_tests_to_functions_in_workspaces(self, control_test_report, workers, selector=None):
+        """map_tests_to_functions, removing each function in a workspace of a WorkspacePool rather than in the repo"""
+
+        def map_function(fnhash, function, pool):
+            with pool.acquire() as workspace:
+                workspace.write(function.relative_path, remove_fn_from_file(function, self.environment))
+                return self.get_failing_tests(fnhash, control_test_report, selector, repo_root=workspace.root).keys()
+
+        with WorkspacePool(self.environment.repo_root, workers) as pool:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    fnhash: executor.submit(map_function, fnhash, function, pool)
+                    for fnhash, function in self.environment.hash2function.items()
+                }
+                return {fnhash: future.result() for fnhash, future in futures.items()}
+
 
     def write_snippet_to_file(self, snippet, file_path, snippet_type='function'):
         """
@@ -204,6 +310,39 @@ class PythonActions(Actions):
         saved_file = self.save_generated_test(generated_test, test_file, overwrite)
         return self.execute_test(saved_file)
     
+    def run_generated_tests(self, generated_tests, test_dir: Path = None, timeout=2, keep_files=False) -> dict:
+        """
+        Run many generated tests in a single pytest session and return the results of each.
+        Every candidate is saved to its own uniquely named module, so candidates cannot overwrite each other.
+        :param generated_tests: dict of candidate key to generated test string, or a list of generated test strings
+        :param test_dir: directory where the candidate modules are saved, defaults to the repo root
+        :param timeout: time in seconds each test is allowed to run, enforced by pytest-timeout
+        :param keep_files: whether to keep the candidate modules after the run
+        :return: dict mapping each candidate key (or list index) to a result in the format of execute_test,
+            with an additional outcome key of passed, failed, error or timeout
+        """
+        if not isinstance(generated_tests, dict):
+            generated_tests = dict(enumerate(generated_tests))
+        test_dir = Path(test_dir) if test_dir is not None else self.environment.repo_root
+
+        batch_id = uuid.uuid4().hex[:8]
+        test_files = {}
+        for index, (key, generated_test) in enumerate(generated_tests.items()):
+            test_file = test_dir / f"test_plum_generated_{batch_id}_{index}.py"
+            test_files[key] = self.save_generated_test(generated_test, test_file)
+
+        try:
+            return run_pytest_batch(
+                self.environment.interpreter_path,
+                self.environment.repo_root,
+                test_files,
+                timeout=timeout,
+            )
+        finally:
+            if not keep_files:
+                for test_file in test_files.values():
+                    test_file.unlink(missing_ok=True)
+
     def save_generated_test(self, generated_test: str, test_file: Path = None, overwrite=True) -> Path:
         """
         Save the generated test at the correct location, with the correct formatting.
@@ -233,18 +372,79 @@ class PythonActions(Actions):
         }
         """
 
+        if self.pytest_worker is not None and self.pytest_worker.is_alive():
+            try:
+                return self._execute_test_in_worker(test_file, timeout)
+            except RuntimeError as e:
+                Logger().get_logger().error(f"pytest worker failed, falling back to a new process: {e}")
+
         try:
-            repo_path = self.environment.base / self.environment.internal_repo_path
-            output = subprocess.run([f"{repo_path}-venv/bin/pytest", test_file], capture_output=True, timeout=timeout)
+            output = subprocess.run(self._get_pytest_command(test_file), capture_output=True, timeout=timeout)
         except subprocess.TimeoutExpired:
             result = {"path": str(test_file), "success": False, "stdout": "n/a", "stderr": f"Timeout"}
             return result
 
         stdout = output.stdout.decode("utf-8")
         stderr = output.stderr.decode("utf-8")
-        if "passed" in stdout:
-            result = {"path": str(test_file), "success": True, "stdout": stdout, "stderr": stderr}
-        else:
-            result = {"path": str(test_file), "success": False, "stdout": stdout, "stderr": stderr}
+        return self._parse_execute_test(test_file, stdout, stderr)
 
-        return result
+    def prepare_generated_test(self, generated_test: str, test_file: Path, timeout=2) -> EvaluationJob:
+        """
+        Prepare a generated test to be run by an EvaluationEngine, like run_generated_test in a new pytest process.
+        :param generated_test: string output from the model of a generated test suite/test case
+        :param test_file: the path to the file where the generated test should be saved, unique for each job
+        :param timeout: time in seconds the test is allowed to run
+        :return: job saving the test when it starts, with results in the format of execute_test
+        """
+        return EvaluationJob(
+            key=str(test_file),
+            language=Language.Python,
+            command=self._get_pytest_command(test_file),
+            parse=lambda returncode, stdout, stderr: self._parse_execute_test(test_file, stdout, stderr),
+            timeout=timeout,
+            setup=lambda: self.save_generated_test(generated_test, test_file),
+            lock_key=str(test_file),
+            timeout_result={"path": str(test_file), "success": False, "stdout": "n/a", "stderr": "Timeout"},
+        )
+
+    def _get_pytest_command(self, test_file):
+        # Through the interpreter, pytest may come from the template venv overlay, which has no script in the repo venv.
+        return [os.fspath(self.environment.interpreter_path), "-m", "pytest", str(test_file)]
+
+    def _parse_execute_test(self, test_file, stdout, stderr):
+        return {"path": str(test_file), "success": "passed" in stdout, "stdout": stdout, "stderr": stderr}
+
+    def start_pytest_worker(self, preload=None) -> dict:
+        """
+        Start a warm pytest worker in the repo's virtual environment.
+        Once started, execute_test runs each test in a forked child of the worker
+        instead of starting a new pytest process, so the timeout only covers the test itself.
+
+        :param preload: modules to import once, defaults to the repo's top level packages
+        :return: the worker's handshake, listing the preloaded and failed modules
+        """
+        if self.pytest_worker is None:
+            self.pytest_worker = PytestWorker(
+                interpreter_path=self.environment.interpreter_path,
+                cwd=self.environment.repo_root,
+                preload=preload,
+            )
+        return self.pytest_worker.start()
+
+    def stop_pytest_worker(self):
+        """Stop the warm pytest worker, if running."""
+        if self.pytest_worker is not None:
+            self.pytest_worker.close()
+            self.pytest_worker = None
+
+    def _execute_test_in_worker(self, test_file, timeout):
+        """Run execute_test through the warm pytest worker, keeping the execute_test result format."""
+        response = self.pytest_worker.run(test_file, timeout=timeout)
+        return {
+            "path": str(test_file),
+            "success": response["outcome"] == "passed",
+            "outcome": response["outcome"],
+            "tests": response["tests"],
+            "stdout": response["stdout"],
+            "stderr": response["stderr"],
+        }
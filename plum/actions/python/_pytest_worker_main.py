@@ -0,0 +1,139 @@
+"""
+Entry point of the warm pytest worker. See `plum.actions.python.pytest_worker`.
+
+This file is executed as a script by the interpreter of the repo's virtual environment,
+so it must only depend on the standard library, pytest and `pytest_plugins/plum_test_results`.
+
+Protocol: one JSON request per line on stdin, one JSON response per line on the original stdout.
+    request:  {"id": 1, "path": "/abs/path/test_x.py", "timeout": 2, "args": []}
+    response: {"id": 1, "outcome": "passed", "exitcode": 0, "tests": [...], "stdout": "", "stderr": "", ...}
+"""
+import argparse
+import importlib
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+
+# The results are recorded and classified like those of the batch report plugin, next to it.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "pytest_plugins"))
+from plum_test_results import ResultCollector, classify
+
+
+def _run_in_child(pytest, request, stdout_file, stderr_file, result_path):
+    """Body of the forked child: run pytest on the requested file and dump the results."""
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(stdout_file.fileno(), 1)
+    os.dup2(stderr_file.fileno(), 2)
+
+    collector = ResultCollector()
+    payload = {"exitcode": -1, "tests": collector.tests}
+    try:
+        args = [request["path"], "-q", "-p", "no:cacheprovider", *request.get("args", [])]
+        payload["exitcode"] = int(pytest.main(args, plugins=[collector]))
+    except BaseException as e:
+        payload["error"] = repr(e)
+
+    with open(result_path, "w") as f:
+        json.dump(payload, f)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
+
+
+def _read(file) -> str:
+    file.seek(0)
+    return file.read().decode("utf-8", errors="replace")
+
+
+def handle_request(pytest, request, protocol):
+    """Run one test file in a forked child, enforcing the timeout, and build the response."""
+    timeout = float(request.get("timeout", 2))
+    result_fd, result_path = tempfile.mkstemp(suffix=".json")
+    os.close(result_fd)
+
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        protocol.flush()
+        start = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            _run_in_child(pytest, request, stdout_file, stderr_file, result_path)
+
+        timed_out = False
+        while True:
+            done, _status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() - start >= timeout:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                timed_out = True
+                break
+            time.sleep(0.005)
+        duration = time.monotonic() - start
+
+        payload = {"exitcode": -1, "tests": []}
+        if not timed_out:
+            try:
+                with open(result_path) as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                payload["error"] = "The test process exited without reporting results."
+        os.remove(result_path)
+
+        return {
+            "id": request.get("id"),
+            "path": request["path"],
+            "outcome": classify(payload["tests"], timed_out, payload["exitcode"]),
+            "exitcode": payload["exitcode"],
+            "tests": payload["tests"],
+            "error": payload.get("error", ""),
+            "timed_out": timed_out,
+            "duration": duration,
+            "stdout": _read(stdout_file),
+            "stderr": "Timeout" if timed_out else _read(stderr_file),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm pytest worker")
+    parser.add_argument("--preload", nargs="*", default=[], help="Modules to import once before serving tests.")
+    args = parser.parse_args()
+
+    # Keep the original stdout for the protocol only; anything printed by imports goes to stderr.
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+
+    # Behave like `python -m pytest` run from the repo root rather than from this directory.
+    sys.path[0] = os.getcwd()
+
+    import pytest
+
+    preloaded, failed = [], {}
+    for name in args.preload:
+        try:
+            importlib.import_module(name)
+            preloaded.append(name)
+        except BaseException as e:
+            failed[name] = repr(e)
+
+    protocol.write(json.dumps({"ready": True, "preloaded": preloaded, "failed": failed}) + "\n")
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if request.get("command") == "shutdown":
+            break
+        try:
+            response = handle_request(pytest, request, protocol)
+        except Exception as e:
+            response = {"id": request.get("id"), "path": request.get("path"), "outcome": "error", "error": repr(e)}
+        protocol.write(json.dumps(response) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Run many test files in a single pytest session and report the outcome of each file.
+
+Evaluating generated tests one pytest process at a time pays interpreter startup, plugin loading
+and the repo's import time for every candidate. Here all candidates are collected by one session,
+per test timeouts are enforced by pytest-timeout and the `plum_batch_report` plugin records the
+results, which are then grouped back per test file.
+"""
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Union
+
+from plum.actions.python.pytest_plugins.plum_test_results import classify
+
+
+PLUGINS_DIR = Path(__file__).with_name("pytest_plugins")
+"""Directory added to the PYTHONPATH so that the repo's interpreter can load `plum_batch_report`."""
+
+def classify_outcome(tests: List[dict], timed_out: bool = False) -> str:
+    """
+    Summarize the per phase results of a test file into passed, failed, error or timeout, see `plum_test_results.classify`.
+    The session ran every file, its exit code says nothing about a single one.
+    """
+    return classify(tests, timed_out)
+
+
+def _result(path: Path, tests: List[dict], timed_out: bool = False) -> dict:
+    outcome = classify_outcome(tests, timed_out)
+    return {
+        "path": str(path),
+        "success": outcome == "passed",
+        "outcome": outcome,
+        "tests": tests,
+        "stdout": "\n".join(t["longrepr"] for t in tests if t["longrepr"]),
+        "stderr": "Timeout" if outcome == "timeout" else "",
+    }
+
+
+def run_pytest_batch(
+        interpreter_path: Union[str, Path],
+        cwd: Union[str, Path],
+        test_files: Dict[Hashable, Union[str, Path]],
+        timeout: float = 2,
+        session_timeout: Optional[float] = None,
+        args: Optional[List[str]] = None,
+    ) -> Dict[Hashable, dict]:
+    """
+    Run the given test files in one pytest session.
+
+    Args:
+        interpreter_path: Python interpreter of the repo's virtual environment.
+        cwd: Root of the repo, pytest runs from there.
+        test_files: Dictionary of candidate key to test file. The file names must be unique.
+        timeout: Time in seconds each test is allowed to run, enforced by pytest-timeout.
+        session_timeout: Time in seconds the whole session is allowed to run.
+            Defaults to the sum of the per test timeouts plus a minute for startup and collection.
+        args: Additional pytest arguments.
+
+    Returns:
+        Dictionary of candidate key to a result with the keys path, success, outcome
+        (passed, failed, error or timeout), tests (per test phase results), stdout and stderr.
+    """
+    paths = {key: Path(path).resolve() for key, path in test_files.items()}
+    if not paths:
+        return {}
+    if session_timeout is None:
+        session_timeout = timeout * len(paths) + 60
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [str(PLUGINS_DIR), env.get("PYTHONPATH", "")] if p)
+
+    report_fd, report_path = tempfile.mkstemp(suffix=".json")
+    os.close(report_fd)
+    command = [
+        os.fspath(interpreter_path), "-m", "pytest",
+        "-q", "-p", "no:cacheprovider",
+        # A candidate that fails to import must not abort the session for the others.
+        "--continue-on-collection-errors",
+        "-p", "plum_batch_report", f"--plum-batch-report={report_path}",
+        f"--timeout={timeout}", "-o", "timeout_method=signal",
+        *(args or []),
+        *[str(path) for path in paths.values()],
+    ]
+
+    try:
+        subprocess.run(command, cwd=cwd, env=env, capture_output=True, timeout=session_timeout)
+        with open(report_path) as f:
+            report = json.load(f)
+    except subprocess.TimeoutExpired:
+        logging.error(f"TimeoutExpired: the batch of {len(paths)} test files exceeded {session_timeout}s")
+        return {key: _result(path, [], timed_out=True) for key, path in paths.items()}
+    except (OSError, ValueError):
+        # pytest crashed before the session finished, ex) an unloadable plugin or a bad argument.
+        report = {"results": []}
+    finally:
+        os.remove(report_path)
+
+    by_file = {}
+    for test in report["results"]:
+        by_file.setdefault(os.path.realpath(test["file"]), []).append(test)
+
+    return {key: _result(path, by_file.get(os.path.realpath(path), [])) for key, path in paths.items()}
@@ -0,0 +1,38 @@
+"""
+Lightweight pytest plugin recording the outcome of every test phase into a JSON file.
+
+Loaded with `-p plum_batch_report` from the repo's virtual environment, so it must only
+depend on the standard library, pytest and `plum_test_results` next to it. Works with pytest-xdist, reports from the
+workers are forwarded to the controller which writes the file.
+"""
+import json
+
+from plum_test_results import ResultCollector
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--plum-batch-report",
+        action="store",
+        default=None,
+        help="Path of the JSON file the per test results are written to.",
+    )
+
+
+class BatchReport(ResultCollector):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        # xdist workers forward their reports to the controller, only it writes the file.
+        if hasattr(session.config, "workerinput"):
+            return
+        with open(self.path, "w") as f:
+            json.dump({"exitcode": int(exitstatus), "results": self.tests}, f)
+
+
+def pytest_configure(config):
+    path = config.getoption("--plum-batch-report")
+    if path:
+        config.pluginmanager.register(BatchReport(path), "plum_batch_report_collector")
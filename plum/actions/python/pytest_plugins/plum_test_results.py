@@ -0,0 +1,63 @@
+"""
+Per test results of a pytest run, shared by the warm pytest worker and the `plum_batch_report` plugin.
+
+Imported by the interpreter of the repo's virtual environment, so it must only depend on the
+standard library and pytest.
+"""
+import os
+import re
+
+
+TIMEOUT_REGEX = re.compile(r"Failed: Timeout \(?>")
+"""Failure raised by pytest-timeout, `Timeout >2.0s` in older releases and `Timeout (>2.0s)` in newer ones."""
+
+
+class ResultCollector:
+    """Minimal pytest plugin recording the outcome of each test phase."""
+    def __init__(self):
+        self.rootdir = ""
+        self.tests = []
+
+    def pytest_sessionstart(self, session):
+        self.rootdir = str(session.config.rootpath)
+
+    def _record(self, report, when, outcome):
+        file = report.nodeid.split("::")[0]
+        self.tests.append({
+            "nodeid": report.nodeid,
+            "file": os.path.join(self.rootdir, file) if file else "",
+            "when": when,
+            "outcome": outcome,
+            "duration": getattr(report, "duration", 0),
+            "longrepr": str(report.longrepr) if report.failed else "",
+        })
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self._record(report, "collect", "error")
+
+    def pytest_runtest_logreport(self, report):
+        # Passing setup and teardown phases carry no information.
+        if report.when == "call" or not report.passed:
+            self._record(report, report.when, report.outcome)
+
+
+def classify(tests, timed_out=False, exitcode=None):
+    """
+    Summarize the phase results of a test file, as recorded by `ResultCollector`, into passed, failed, error or timeout.
+
+    Args:
+        tests: Phase results of the file.
+        timed_out: Whether the run was killed before reporting.
+        exitcode: Exit code of pytest when it only ran the file, None when it ran other files too.
+    """
+    if timed_out or any(TIMEOUT_REGEX.search(t["longrepr"]) for t in tests):
+        return "timeout"
+    if any(t["when"] != "call" and t["outcome"] != "skipped" for t in tests):
+        return "error"
+    calls = [t for t in tests if t["when"] == "call"]
+    if not calls or exitcode not in (None, 0, 1):
+        return "error"
+    if any(t["outcome"] == "failed" for t in calls):
+        return "failed"
+    return "passed"
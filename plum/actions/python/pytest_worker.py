@@ -0,0 +1,169 @@
+"""
+Persistent pytest worker for evaluating generated tests.
+
+Starting a fresh `pytest` process per generated test pays interpreter startup, plugin loading and
+the repo's import time on every call, which can eat the whole timeout of a slow-importing repo.
+The worker imports pytest and the repo's top level packages once inside the repo's virtual environment,
+then runs every submitted test file in a forked child so that tests stay isolated from each other
+and the timeout only covers the test itself.
+"""
+import json
+import logging
+import select
+import subprocess
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+
+WORKER_SCRIPT = Path(__file__).with_name("_pytest_worker_main.py")
+"""Script executed by the virtual environment's interpreter."""
+
+
+def discover_top_level_packages(repo_root: Union[str, Path]) -> List[str]:
+    """
+    Find the importable top level packages of a repo, in both flat and `src/` layouts.
+    Test packages are skipped, they are imported by the tests themselves.
+    """
+    repo_root = Path(repo_root)
+    packages = []
+    for base in [repo_root, repo_root / "src"]:
+        if not base.is_dir():
+            continue
+        for entry in sorted(base.iterdir()):
+            if (
+                entry.is_dir()
+                and (entry / "__init__.py").exists()
+                and entry.name.isidentifier()
+                and not entry.name.startswith("test")
+            ):
+                packages.append(entry.name)
+    return packages
+
+
+class PytestWorker:
+    """Client for a warm pytest worker process running in a repo's virtual environment."""
+
+    def __init__(
+            self,
+            interpreter_path: Union[str, Path],
+            cwd: Union[str, Path],
+            preload: Optional[List[str]] = None,
+            startup_timeout: float = 120,
+        ):
+        """
+        Args:
+            interpreter_path: Python interpreter of the repo's virtual environment.
+            cwd: Root of the repo, the worker runs from there.
+            preload: Modules to import once. Defaults to the top level packages found in the repo.
+            startup_timeout: Time in seconds to wait for the worker to import pytest and the preloaded modules.
+        """
+        self.interpreter_path = Path(interpreter_path)
+        """Python interpreter of the repo's virtual environment."""
+        self.cwd = Path(cwd)
+        """Root of the repo."""
+        self.preload = discover_top_level_packages(self.cwd) if preload is None else list(preload)
+        """Modules imported once by the worker."""
+        self.startup_timeout = startup_timeout
+        """Time in seconds to wait for the worker to become ready."""
+
+        self.ready_message: dict = {}
+        """Handshake sent by the worker, lists the preloaded and failed modules."""
+
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self) -> dict:
+        """Start the worker and wait until it is ready to accept tests."""
+        if self.is_alive():
+            return self.ready_message
+
+        self._process = subprocess.Popen(
+            [str(self.interpreter_path), str(WORKER_SCRIPT), "--preload", *self.preload],
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        message = self._read_message(self.startup_timeout)
+        if message is None or not message.get("ready"):
+            self.close()
+            raise RuntimeError(f"pytest worker failed to start in {self.cwd}")
+
+        if message["failed"]:
+            logging.warning(f"pytest worker could not preload: {list(message['failed'])}")
+        self.ready_message = message
+        return message
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, test_file: Union[str, Path], timeout: float = 2, args: Optional[List[str]] = None) -> dict:
+        """
+        Run a single test file in the worker.
+
+        Args:
+            test_file: Path to the test file.
+            timeout: Time in seconds the test is allowed to run, excluding the warm imports.
+            args: Additional pytest arguments.
+
+        Returns:
+            Dictionary with the keys path, outcome (passed, failed, error or timeout), exitcode,
+            tests (per test phase results), timed_out, duration, stdout and stderr.
+        """
+        with self._lock:
+            if not self.is_alive():
+                raise RuntimeError("pytest worker is not running")
+
+            self._next_id += 1
+            request = {
+                "id": self._next_id,
+                "path": str(Path(test_file).resolve()),
+                "timeout": timeout,
+                "args": args or [],
+            }
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+
+            # The worker enforces the timeout itself, only guard against a hung worker here.
+            response = self._read_message(timeout + 30)
+            if response is None:
+                self.close()
+                raise RuntimeError("pytest worker stopped responding")
+            return response
+
+    def close(self):
+        """Stop the worker."""
+        if self._process is None:
+            return
+        try:
+            if self._process.poll() is None:
+                self._process.stdin.write(json.dumps({"command": "shutdown"}) + "\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        finally:
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process = None
+
+    def _read_message(self, timeout: float) -> Optional[dict]:
+        """Read a single JSON line from the worker, None if it died or timed out."""
+        ready, _, _ = select.select([self._process.stdout], [], [], timeout)
+        if not ready:
+            return None
+        line = self._process.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
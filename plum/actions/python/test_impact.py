@@ -0,0 +1,91 @@
+"""
+Coverage guided test selection.
+
+After a single function is removed or rewritten, only the tests that executed that function can
+change outcome. `TestImpactSelector` uses a stored function hash to tests mapping to pick those tests,
+plus a safety set of tests that always run, and falls back to the full suite for unmapped functions.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+
+def fn2tests_from_coverage_contexts(coverage_report: dict, hash2function: dict) -> Dict[str, List[str]]:
+    """
+    Build the function hash to tests mapping from a coverage.py JSON report with test contexts,
+    as produced by `pytest --cov --cov-context=test` with `show_contexts` enabled.
+
+    Args:
+        coverage_report: Parsed coverage JSON report.
+        hash2function: Dictionary of function hash to Function, as on the Repository.
+
+    Returns:
+        Dictionary of function hash to the sorted pytest node ids executing at least one line of the function body.
+        Functions of measured files without any covering test map to an empty list, functions of files
+        missing from the report are left out so that they fall back to the full suite.
+    """
+    fn2tests = {}
+    files = coverage_report.get("files", {})
+    for fnhash, function in hash2function.items():
+        file_report = files.get(str(function.relative_path))
+        if file_report is None:
+            continue
+        contexts = file_report.get("contexts", {})
+        tests = set()
+        # the signature line runs on import, only lines of the body tell which tests call the function
+        first_line = min(function.start_line + 2, function.end_line + 1)
+        for line in range(first_line, function.end_line + 2):
+            for context in contexts.get(str(line), []):
+                nodeid = context.rsplit("|", 1)[0]
+                if nodeid:
+                    tests.add(nodeid)
+        fn2tests[fnhash] = sorted(tests)
+    return fn2tests
+
+
+def filter_test_report(test_report: dict, test_ids: Iterable[str]) -> dict:
+    """Restrict a pytest JSON report to the given node ids, so that unselected tests are not reported as not run."""
+    test_ids = set(test_ids)
+    filtered = dict(test_report)
+    filtered["tests"] = [test for test in test_report.get("tests", []) if test["nodeid"] in test_ids]
+    return filtered
+
+
+class TestImpactSelector:
+    """Select the tests impacted by a change to a single function."""
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, fn2tests: Optional[Dict[str, Iterable[str]]] = None, safety_tests: Iterable[str] = ()):
+        """
+        Args:
+            fn2tests: Dictionary of function hash to the node ids of the tests covering it,
+                ex) from `fn2tests_from_coverage_contexts` or `PythonActions.map_tests_to_functions`.
+            safety_tests: Node ids always selected, ex) tests with import time side effects or smoke tests.
+        """
+        self.fn2tests: Dict[str, List[str]] = {fnhash: list(tests) for fnhash, tests in (fn2tests or {}).items()}
+        """Dictionary of function hash to the node ids of the tests covering it."""
+        self.safety_tests: List[str] = list(safety_tests)
+        """Node ids always selected."""
+
+    def select(self, fnhash: str) -> Optional[List[str]]:
+        """
+        Tests to run after changing the given function.
+
+        Returns:
+            Node ids of the covering tests and the safety set, possibly empty when nothing covers the function.
+            None when the function has no mapping, meaning the full suite has to run.
+        """
+        if fnhash not in self.fn2tests:
+            return None
+        return list(dict.fromkeys(self.fn2tests[fnhash] + self.safety_tests))
+
+    def save(self, path: Union[str, Path]):
+        with open(path, "w") as f:
+            json.dump({"fn2tests": self.fn2tests, "safety_tests": self.safety_tests}, f, indent=2)
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "TestImpactSelector":
+        with open(path) as f:
+            data = json.load(f)
+        return TestImpactSelector(data["fn2tests"], data.get("safety_tests", []))
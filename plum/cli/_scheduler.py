@@ -0,0 +1,196 @@
+import os
+import queue
+import re
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Union
+
+from tqdm import tqdm
+
+from plum.actions._docker_runner import ContainerLimits
+
+_SIZE_REGEX = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_size(size: Union[str, int, None]) -> Optional[int]:
+    """Number of bytes of a size as given to `docker run --memory`, ex) 512m or 4g."""
+    if size is None or isinstance(size, int):
+        return size
+    match = _SIZE_REGEX.match(size)
+    if match is None:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def get_cpu_load() -> Optional[float]:
+    """Number of CPUs busy on the host, from the 1 minute load average. None where unavailable, ex) Windows."""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+def get_available_memory() -> Optional[int]:
+    """Memory, in bytes, the host can give to new processes without swapping. None where unavailable."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def get_free_disk(path: Union[str, Path]) -> Optional[int]:
+    """Free space, in bytes, of the disk holding the path."""
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+class ResourceScheduler:
+    """
+    Admits jobs onto a process pool only while the host has headroom for them.
+
+    A job is admitted when the concurrency limits of its language are not reached, and, measured live,
+    the host has enough idle CPUs, available memory and free disk for it. The first job is always admitted,
+    so a busy host slows the run down rather than blocking it. Each admission waits for the previous one to
+    show up in the measurements, or for a job to finish, before the next.
+
+    The containers started by the jobs get the `container_limits`, so one build cannot take over the host.
+    """
+    def __init__(
+            self,
+            max_jobs: Optional[int] = None,
+            language_limits: Optional[Dict[str, int]] = None,
+            cpus_per_job: Optional[float] = None,
+            memory_per_job: Optional[str] = None,
+            min_free_memory: str = "1g",
+            min_free_disk: str = "5g",
+            disk_path: Union[str, Path] = ".",
+            admission_interval: float = 2.0,
+        ):
+        """
+        Args:
+            max_jobs: Maximum number of jobs running at once. Defaults to the number of processes of the pool.
+            language_limits: Maximum number of jobs running at once per language, ex) {"csharp": 4}.
+            cpus_per_job: CPUs each job's containers may use, reserved on admission. None for no limit.
+            memory_per_job: Memory each job's containers may use, ex) 4g, reserved on admission. None for no limit.
+            min_free_memory: Memory kept available for the host on top of the reservations.
+            min_free_disk: Disk space kept free on the disk of `disk_path`.
+            disk_path: Path on the disk the jobs write to, ex) the Plum project.
+            admission_interval: Seconds to wait after an admission before the next.
+        """
+        self.max_jobs = max_jobs
+        """Maximum number of jobs running at once."""
+        self.language_limits = dict(language_limits) if language_limits else {}
+        """Maximum number of jobs running at once per language."""
+        self.container_limits = ContainerLimits(cpus=cpus_per_job, memory=memory_per_job)
+        """CPU and memory limits of the containers started by each job."""
+        self.min_free_memory = parse_size(min_free_memory)
+        """Bytes of memory kept available for the host."""
+        self.min_free_disk = parse_size(min_free_disk)
+        """Bytes kept free on the disk of disk_path."""
+        self.disk_path = disk_path
+        """Path on the disk the jobs write to."""
+        self.admission_interval = admission_interval
+        """Seconds to wait after an admission before the next."""
+
+    def can_admit(self, language: Optional[str], running: Counter) -> bool:
+        """
+        Whether a job of the language can start now.
+
+        Args:
+            language: Language of the job, None if unknown.
+            running: Number of running jobs per language.
+        """
+        total = sum(running.values())
+        if self.max_jobs is not None and total >= self.max_jobs:
+            return False
+        limit = self.language_limits.get(language)
+        if limit is not None and running[language] >= limit:
+            return False
+        if total == 0:
+            return True
+
+        # Busy CPUs are at least what the running jobs reserved, the load average lags behind new jobs.
+        cpus_per_job = self.container_limits.cpus or 1
+        busy_cpus = max(get_cpu_load() or 0, total * cpus_per_job)
+        if busy_cpus + cpus_per_job > (os.cpu_count() or 1):
+            return False
+
+        available_memory = get_available_memory()
+        needed_memory = self.min_free_memory + (parse_size(self.container_limits.memory) or 0)
+        if available_memory is not None and available_memory < needed_memory:
+            return False
+
+        free_disk = get_free_disk(self.disk_path)
+        if free_disk is not None and free_disk < self.min_free_disk:
+            return False
+        return True
+
+    def run(self, pool, func: Callable, data: list, key: Optional[Callable[[object], Hashable]] = None) -> list:
+        """
+        Run a function on every item of data on a process pool, admitting the items one by one.
+
+        Args:
+            pool: multiprocessing Pool to run the function on.
+            func: Function to run, picklable.
+            data: Items to run the function on.
+            key: Language of an item. Items without one are only subject to max_jobs and the host headroom.
+
+        Returns:
+            Results of the function, in completion order.
+        """
+        pending = list(data)
+        running = Counter()
+        done = queue.Queue()
+        results = []
+
+        with tqdm(total=len(pending)) as progress:
+            while pending or sum(running.values()):
+                self._admit(pool, func, pending, running, done, key)
+                # With items pending, measure the host again after a while even if no job finished.
+                timeout = self.admission_interval if pending else None
+                for language, result, error in self._collect(done, timeout):
+                    running[language] -= 1
+                    if error is not None:
+                        raise error
+                    results.append(result)
+                    progress.update()
+        return results
+
+    def _admit(self, pool, func, pending: list, running: Counter, done: queue.Queue, key) -> bool:
+        """Start the first pending item that can be admitted, if any."""
+        for i, item in enumerate(pending):
+            language = key(item) if key is not None else None
+            if not self.can_admit(language, running):
+                continue
+
+            pending.pop(i)
+            running[language] += 1
+            pool.apply_async(
+                func, (item,),
+                callback=lambda result, language=language: done.put((language, result, None)),
+                error_callback=lambda error, language=language: done.put((language, None, error)),
+            )
+            return True
+        return False
+
+    @staticmethod
+    def _collect(done: queue.Queue, timeout: Optional[float]) -> list:
+        """Wait for a job to finish, up to the timeout, then take every finished job."""
+        try:
+            finished = [done.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                finished.append(done.get_nowait())
+            except queue.Empty:
+                return finished
+
@@ -1,16 +1,26 @@
 from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
 
-def multiprocess(func, data, num_processes=None):
-    """Run a function on multiple processes."""
+def multiprocess(func, data, num_processes=None, initializer=None, initargs=(), scheduler=None, key=None):
+    """
+    Run a function on multiple processes, each first running the optional initializer.
+    With a ResourceScheduler, items are only handed to the processes while the host has headroom for them,
+    `key` giving the language of an item for the scheduler's per-language limits.
+    """
     if num_processes is None:
         # Determine the number of processes.
         # We want to use as many processes as necessary, but not more than 60.
         # Python's multiprocessing library has innate problems on Windows.
         # We also leave 1 thread for OS processes.
         num_processes = min(cpu_count() - 1, len(data), 60)
+        if scheduler is not None and scheduler.max_jobs:
+            num_processes = min(num_processes, scheduler.max_jobs)
+    num_processes = max(1, num_processes)
 
-    with Pool(processes=num_processes) as pool:
-        results = list(tqdm(pool.imap_unordered(func, data), total=len(data)))
+    with Pool(processes=num_processes, initializer=initializer, initargs=initargs) as pool:
+        if scheduler is not None:
+            results = scheduler.run(pool, func, data, key)
+        else:
+            results = list(tqdm(pool.imap_unordered(func, data), total=len(data)))
 
     return results
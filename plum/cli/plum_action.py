@@ -5,24 +5,48 @@ from typing import Callable, Optional, TypeVar, Union
 
 from tqdm import tqdm
 
+from plum.actions._cache_volumes import CACHE_MAX_BYTES, collect_all_garbage, get_ecosystem
+from plum.actions._container_pool import ContainerPool, set_active_pool
+from plum.actions._containers import ContainerReaper
+from plum.actions._docker_images import ensure_images
+from plum.actions._docker_runner import ContainerLimits, set_container_limits
+from plum.actions._output_capture import set_log_dir
+from plum.cli._scheduler import ResourceScheduler
 from plum.cli._utils import multiprocess
 from plum.configuration.config_loader import PlumConfigurationConcurrencyManager
 from plum.configuration.detailed_configuration_model import KnownRepositoryDetails
+from plum.constants import PLUM_FOLDER
 
 T = TypeVar('T')
 """Generic type used for PlumAction._run_all()"""
 
+def _init_worker(pool: Optional[ContainerPool], limits: Optional[ContainerLimits], log_dir: Optional[Path]):
+    """Set up a process running configurations: its container pool, the limits of its containers and its output log directory."""
+    set_active_pool(pool)
+    set_container_limits(limits)
+    set_log_dir(log_dir)
+
+
 class PlumAction:
+    cache_max_bytes: Optional[int] = CACHE_MAX_BYTES
+    """Size cap of each cache volume, the volumes the run used are shrunk to it at its end. None to keep them whole."""
+
     def __init__(
         self,
         multiprocessing: bool,
         lang: Optional[str] = None,
         working_directory: Optional[Union[str, os.PathLike]] = None,
+        container_pool_size: int = 0,
+        scheduler: Optional[ResourceScheduler] = None,
     ):
         self.lang = lang.lower()
         self.multiprocessing = multiprocessing
         self.cwd = Path(working_directory or os.getcwd())
         """Plum project working directory."""
+        self.container_pool_size = container_pool_size
+        """Containers kept running per image:tag and shared by the repos. 0 starts containers per command."""
+        self.scheduler = scheduler
+        """Admits the configurations to the worker processes based on host headroom. None runs as many as there are processes."""
 
         self.config_manager = PlumConfigurationConcurrencyManager.get_manager(self.cwd)
         """Concurrency manager for the configuration files."""
@@ -76,19 +100,90 @@ class PlumAction:
         print(f"Success Rate: {success_rate:.2f}")
         print(f"Average Duration: {average_duration:.2f} seconds")
 
-    def _run_all(self, fx_to_run: Callable[[T], dict], all_configs: list[T]):
+    def _prefetch_images(self, image_tags: list[tuple[str, str]], max_workers: int = 4):
+        """Pull the Docker images the run needs once, with bounded concurrency, before any repository starts.
+
+        Args:
+            image_tags: Docker (image, tag) pairs.
+            max_workers: Maximum number of images pulled at once.
+        """
+        results = ensure_images([f"{image}:{tag}" for image, tag in image_tags], max_workers=max_workers)
+        for image_ref, is_local in results.items():
+            if not is_local:
+                print(f"Could not pull Docker image {image_ref}.")
+        return results
+
+    def _run_all(
+            self,
+            fx_to_run: Callable[[T], dict],
+            all_configs: list[T],
+            image_tags: Optional[list[tuple[str, str]]] = None,
+        ):
         """Run a function for all configurations.
 
         Args:
             fx_to_run: The function to run.
             all_configs: The configurations to run the function on.
+            image_tags: Docker (image, tag) pairs of the configurations. When a container pool is used,
+                containers of these are started before the function runs.
         """
+        # Pooled containers are started from this process, they get the same limits as in the workers.
+        set_container_limits(self._get_container_limits())
+        set_log_dir(self._get_output_log_dir())
+        # Removes the containers of previous runs and of workers that crashed during this one.
+        reaper = ContainerReaper()
+        reaper.start()
+        try:
+            if not self.container_pool_size:
+                results = self._run_all_with_pool(fx_to_run, all_configs, None)
+            else:
+                with ContainerPool(self.cwd, self.container_pool_size, shared=self.multiprocessing) as pool:
+                    pool.warm(image_tags or [])
+                    results = self._run_all_with_pool(fx_to_run, all_configs, pool)
+            # Once the pool's containers are removed, the volumes are no longer in use.
+            self._collect_cache_garbage(image_tags or [])
+            return results
+        finally:
+            reaper.stop()
+            set_container_limits(None)
+            set_log_dir(None)
+
+    def _run_all_with_pool(self, fx_to_run: Callable[[T], dict], all_configs: list[T], pool: Optional[ContainerPool]):
         if self.multiprocessing:
-            results = multiprocess(fx_to_run, all_configs)
-        else:
-            results = [fx_to_run(d) for d in tqdm(all_configs)]
-
-        return results
+            return multiprocess(
+                fx_to_run,
+                all_configs,
+                initializer=_init_worker,
+                initargs=(pool, self._get_container_limits(), self._get_output_log_dir()),
+                scheduler=self.scheduler,
+                key=PlumAction._get_config_language,
+            )
+
+        set_active_pool(pool)
+        try:
+            return [fx_to_run(d) for d in tqdm(all_configs)]
+        finally:
+            set_active_pool(None)
+
+    def _collect_cache_garbage(self, image_tags: list[tuple[str, str]]):
+        """Shrink the cache volumes of the images the run used under their size cap, see `collect_garbage`."""
+        if self.cache_max_bytes is None:
+            return
+        ecosystems = {get_ecosystem(image) for image, _ in image_tags} - {None}
+        if ecosystems:
+            collect_all_garbage(self.cache_max_bytes, sorted(ecosystems))
+
+    def _get_container_limits(self) -> Optional[ContainerLimits]:
+        return self.scheduler.container_limits if self.scheduler is not None else None
+
+    def _get_output_log_dir(self) -> Path:
+        """Directory the full, compressed, output of the commands is logged to. Results only keep its head and tail."""
+        return self.cwd / PLUM_FOLDER / "log" / "output"
+
+    @staticmethod
+    def _get_config_language(config) -> Optional[str]:
+        """Language of a configuration tuple of _retrieve_all_configurations, for the scheduler's per-language limits."""
+        return config[1] if isinstance(config, tuple) and len(config) > 1 else None
 
     def run(self, quiet: bool = False):
         raise NotImplementedError("This method should be implemented by subclasses.")
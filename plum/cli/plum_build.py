@@ -5,8 +5,9 @@ from time import time
 from typing import Optional, Type, Union
 
 
-from plum.actions._docker_runner import DockerRunner
+from plum.actions._container_pool import docker_for_repo
 from plum.actions.csharp.build_manager import BuildManager as CSharpBuild
+from plum.cli._scheduler import ResourceScheduler
 from plum.cli.plum_action import PlumAction
 from plum.configuration.detailed_configuration_model import EnvironmentConfig, KnownRepositoryDetails
 from plum.constants import PLUM_FOLDER
@@ -61,23 +62,19 @@ def _build_single(path_config: tuple[str, Path, KnownRepositoryDetails]) -> dict
     if config.env is None:
         config.env = EnvironmentConfig(**DEFAULT_BUILD_ENV[lang])
 
-    docker_runner = DockerRunner(
-        image=config.env.image,
-        tag=config.env.tag,
-        mount_dir=config.env.work_dir,
-    )
-    build_manager = build_class(
-        repo_full_path=full_path,
-        docker_runner=docker_runner,
-        timeout=600,
-    )
-    start = time()
-    res = build_manager.build()
-    duration = time() - start
-
-    # Save successful build configurations
-    res["env_config"] = build_manager.docker.get_config()
-    res["duration"] = duration
+    with docker_for_repo(config.env, full_path) as docker_runner:
+        build_manager = build_class(
+            repo_full_path=full_path,
+            docker_runner=docker_runner,
+            timeout=600,
+        )
+        start = time()
+        res = build_manager.build()
+        duration = time() - start
+
+        # Save successful build configurations
+        res["env_config"] = build_manager.docker.get_config()
+        res["duration"] = duration
 
     return res
 
@@ -88,6 +85,8 @@ class PlumBuild(PlumAction):
             multiprocessing: bool,
             working_directory: Optional[Union[str, os.PathLike]] = None,
             specific_subdir: str = None,
+            container_pool_size: int = 0,
+            scheduler: Optional[ResourceScheduler] = None,
         ):
         """Initialize the Plum build manager.
 
@@ -96,17 +95,42 @@ class PlumBuild(PlumAction):
             multiprocessing (bool): Whether to use multiprocessing
             working_directory (Optional[Union[str, os.PathLike]], optional): Plum project root. Defaults to the current working directory.
             specific_subdir (str, optional): Specific subdirectory to build. Defaults to None.
+            container_pool_size (int, optional): Containers shared by the repos per image:tag. Defaults to 0, a container per command.
+            scheduler (ResourceScheduler, optional): Admits repositories to the worker processes based on host headroom. Defaults to None, as many as there are processes.
         """
         super().__init__(
             multiprocessing=multiprocessing,
             lang=lang,
-            working_directory=working_directory
+            working_directory=working_directory,
+            container_pool_size=container_pool_size,
+            scheduler=scheduler,
         )
         self.is_single_repo = specific_subdir is not None
         """Whether we are building a single repository or all subdirectories in CWD."""
         self.specific_subdir = specific_subdir
         """Specific subdirectory to build."""
 
+    def _get_env(self, config) -> Optional[EnvironmentConfig]:
+        """Environment a repository will first build in, its own or the default of the language."""
+        default_env = DEFAULT_BUILD_ENV.get(self.lang)
+        return config.env or (EnvironmentConfig(**default_env) if default_env else None)
+
+    def _get_image_tags(self, repo_configs) -> list[tuple[str, str]]:
+        """Docker image and tag each repository will first build with."""
+        envs = [self._get_env(config) for _, _, _, config in repo_configs]
+        return [(env.image, env.tag) for env in envs if env is not None]
+
+    def _predict_image_tags(self, repo_configs) -> list[tuple[str, str]]:
+        """Docker image and tag each repository is expected to switch to while recovering from build errors."""
+        predict_images = getattr(BUILD_CLASSES.get(self.lang), "predict_images", None)
+        if predict_images is None:
+            return []
+        image_tags = []
+        for _, _, cwd, config in repo_configs:
+            env = self._get_env(config)
+            image_tags.extend(predict_images(cwd / config.repo.local_dir, env.tag if env is not None else None))
+        return image_tags
+
     def _update_configurations(self, results):
         """Update the configuration files."""
         active_groups = self.config_manager.read_active_groups()
@@ -143,7 +167,10 @@ class PlumBuild(PlumAction):
                 print("No configuration file found.")
                 return
 
-            results = self._run_all(_generate_config, repo_configs)
+            image_tags = self._get_image_tags(repo_configs)
+            self._prefetch_images(image_tags + self._predict_image_tags(repo_configs))
+
+            results = self._run_all(_generate_config, repo_configs, image_tags=image_tags)
 
             self._update_configurations(results)
             self._summarize_results(results)
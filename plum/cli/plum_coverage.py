@@ -4,8 +4,9 @@ from pathlib import Path
 from time import time
 from typing import Optional, Type, Union
 
-from plum.actions._docker_runner import DockerRunner
+from plum.actions._container_pool import docker_for_repo
 from plum.actions.csharp.coverage_manager import CoverageManager as CSharpCoverage
+from plum.cli._scheduler import ResourceScheduler
 from plum.cli.plum_action import PlumAction
 from plum.configuration.config_loader import PlumConfigurationConcurrencyManager
 from plum.configuration.detailed_configuration_model import KnownRepositoryDetails
@@ -46,25 +47,21 @@ def _coverage_single_repo(path_config: tuple[str, str, Path, KnownRepositoryDeta
             "stderr": f"No environment for {id}",
         }
 
-    docker_runner = DockerRunner(
-        image=config.env.image,
-        tag=config.env.tag,
-        mount_dir=config.env.work_dir,
-    )
-    load_res = coverage_class.load(
-        repo_full_path=cwd / config.repo.local_dir,
-        docker_runner=docker_runner,
-        timeout=420,
-    )
-
-    if not load_res["success"]:
-        load_res['id'] = id
-        return load_res
-
-    coverage_manager = load_res["manager"]
-    start = time()
-    res = coverage_manager.run_coverage()
-    duration = time() - start
+    with docker_for_repo(config.env, cwd / config.repo.local_dir) as docker_runner:
+        load_res = coverage_class.load(
+            repo_full_path=cwd / config.repo.local_dir,
+            docker_runner=docker_runner,
+            timeout=420,
+        )
+
+        if not load_res["success"]:
+            load_res['id'] = id
+            return load_res
+
+        coverage_manager = load_res["manager"]
+        start = time()
+        res = coverage_manager.run_coverage()
+        duration = time() - start
 
     res["duration"] = duration
     res['id'] = id
@@ -77,6 +74,8 @@ class PlumCoverage(PlumAction):
             multiprocessing: bool,
             working_directory: Optional[Union[str, os.PathLike]] = None,
             specific_subdir: str = None,
+            container_pool_size: int = 0,
+            scheduler: Optional[ResourceScheduler] = None,
         ):
         """Initialize the Plum build manager.
 
@@ -85,9 +84,15 @@ class PlumCoverage(PlumAction):
             multiprocessing (bool): Whether to use multiprocessing
             working_directory (Optional[Union[str, os.PathLike]], optional): Plum project root. Defaults to the current working directory.
             specific_subdir (str, optional): Specific subdirectory to build. Defaults to None.
+            container_pool_size (int, optional): Containers shared by the repos per image:tag. Defaults to 0, a container per command.
+            scheduler (ResourceScheduler, optional): Admits repositories to the worker processes based on host headroom. Defaults to None, as many as there are processes.
         """
         self.lang = lang.lower()
         self.multiprocessing = multiprocessing
+        self.container_pool_size = container_pool_size
+        """Containers kept running per image:tag and shared by the repos. 0 starts containers per command."""
+        self.scheduler = scheduler
+        """Admits the repositories to the worker processes based on host headroom."""
 
         self.cwd = Path(working_directory or os.getcwd())
         """Plum project working directory."""
@@ -121,7 +126,9 @@ class PlumCoverage(PlumAction):
                 print("No configuration file found.")
                 return
 
-            results = self._run_all(_coverage_single_repo, repo_configs)
+            image_tags = [(config.env.image, config.env.tag) for _, _, _, config in repo_configs if config.env is not None]
+            self._prefetch_images(image_tags)
+            results = self._run_all(_coverage_single_repo, repo_configs, image_tags=image_tags)
             self._summarize_results(results)
             self._save_results(results)
 
@@ -132,6 +139,6 @@ class PlumCoverage(PlumAction):
                     print(f"No configuration found for {self.specific_subdir}")
                 return
 
-            results = [_coverage_single_repo((id, self.lang, self.cwd, config))]
+            results = self._run_all(_coverage_single_repo, [(id, self.lang, self.cwd, config)])
             self._summarize_results(results)
             self._save_results(results)
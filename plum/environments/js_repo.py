@@ -14,6 +14,7 @@ from plum.harnesslib.languages import Language
 from plum.utils import is_testable_file
 from plum.utils import get_test_package
 from plum.environments.repository import Repository
+from plum.actions.javascript.testability import probe_testable_files
 from plum.utils.logger import Logger
 
 
@@ -162,17 +163,24 @@ class JavascriptRepository(Repository):
             json.dump(pkg_dict, package)
 
 
-    def get_testable_files(self):
+    def get_testable_files(self, batched=True):
         """
         Returns a list of all the files in the repo that are testable
+        :param batched: probe all the files in a single test run rather than running npm test once per file
         """
 
         test_library = self.test_library if self.test_library else "jest"
         self.overwrite_package_json(command=test_library)
         if self.test_library == "jest":
             self.overwrite_package_json(keys=('jest','testRegex'), command="")
-        testable_files = self.walk_repository(is_testable_file)
-        self.rewrite_package_json()
+        try:
+            if batched:
+                source_files = self.walk_repository(lambda repo, file_path: [file_path])
+                testable_files = probe_testable_files(self.repo_root, source_files, test_library)
+            else:
+                testable_files = self.walk_repository(is_testable_file)
+        finally:
+            self.rewrite_package_json()
 
         return testable_files
 
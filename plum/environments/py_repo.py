@@ -7,6 +7,8 @@ import re
 
 from plum.harnesslib.languages import Language
 import plum.harnesslib.tasks as tasks
+from plum.harnesslib.languages.python.template import VenvTemplate
+from plum.harnesslib.languages.python.wheelhouse import Wheelhouse, get_wheelhouse, set_wheelhouse
 
 from plum.environments.repository import Repository
 from plum.utils import fnhash, get_functions_from_file
@@ -22,7 +24,8 @@ class PythonRepository(Repository):
         repo_path="",
         commit_sha="",
         focal_functions=[],
-        language=None
+        language=None,
+        offline_install=False
     ):
         super().__init__(
             base, repo_path, commit_sha, focal_functions, language
@@ -39,8 +42,17 @@ class PythonRepository(Repository):
         self._extensions = [".py"]
         if self.repo_type.name == 'GITHUB':
             self.env_path = (Path(self.base) / f"{str(self.internal_repo_path)}-venv").resolve()
+            self.project_dir = Path(self.base)
         else:
             self.env_path = (Path(f"{str(self.base)}-venv")).resolve()
+            self.project_dir = Path(self.base).parent
+        """
+        Directory of the Plum project the repo is part of, next to the venvs of its repos.
+        Its wheelhouse and template venvs are shared by all of them.
+        """
+
+        self.offline_install = offline_install
+        """Whether dependencies are only installed from the wheels already in the wheelhouse, without the index."""
 
         self.interpreter_path = self.env_path / "bin/python"
 
@@ -50,7 +62,9 @@ class PythonRepository(Repository):
         Takes code generator object and:
         1. Clones the relevant repo if it's from GitHub
         2. Installs required dependencies one by one 
-                (will continue to install down the list even if some fail)
+                (will continue to install down the list even if some fail),
+                through the wheelhouse of the Plum project, into a venv overlaid onto
+                the project's template venv with the runner tooling
         3. Runs the tests to see if the original unit tests all run
         """
         self.access_focal_code()
@@ -59,13 +73,22 @@ class PythonRepository(Repository):
         # create it in the first place
         if (cleanup or not os.path.exists(self.env_path)) and install_reqs:
 
-            environment = tasks.CreatePythonEnvironment(repo_info=self.repo, venv_path=self.env_path).execute()
-            Logger().get_logger().warning("# Install any required dependencies.")
-            installed_deps = tasks.install_dependencies(
-                repo_info=self.repo,
-                language=Language.Python,
-                environment=environment
-            ).execute()
+            previous_wheelhouse = get_wheelhouse()
+            set_wheelhouse(Wheelhouse.for_project(self.project_dir, offline=self.offline_install))
+            try:
+                environment = tasks.CreatePythonEnvironment(
+                    repo_info=self.repo,
+                    venv_path=self.env_path,
+                    template=VenvTemplate.for_project(self.project_dir),
+                ).execute()
+                Logger().get_logger().warning("# Install any required dependencies.")
+                installed_deps = tasks.install_dependencies(
+                    repo_info=self.repo,
+                    language=Language.Python,
+                    environment=environment
+                ).execute()
+            finally:
+                set_wheelhouse(previous_wheelhouse)
 
 
     def get_test_functions(self):
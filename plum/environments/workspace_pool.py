@@ -0,0 +1,204 @@
+"""
+Pool of isolated copies of a repository clone.
+
+Mutation experiments (removing or rewriting a function, then running the test suite) used to edit
+the clone in place and restore it afterwards, which serializes the experiments of a repo and leaves
+the clone corrupted when a run crashes midway. Each workspace of the pool is an independent copy
+of the clone, so N experiments can run side by side, and workspaces are reset between jobs.
+"""
+import queue
+import shutil
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from plum.utils.logger import Logger
+
+
+STRATEGIES = ("worktree", "copy")
+"""
+worktree: `git worktree add`, checks out HEAD sharing the object store with the clone. The untracked and ignored files
+    of the clone, ex) built extensions or generated modules, are copied in next to it. Uncommitted changes to tracked
+    files are not included, so tests depending on them can fail in the workspaces but not in the clone.
+copy: `cp -a --reflink=auto`, a copy-on-write clone on file systems supporting it (btrfs, xfs), a full copy elsewhere.
+"""
+
+_COPY_BATCH_SIZE = 500
+"""Paths copied by a single `cp` command."""
+
+
+class Workspace:
+    """A single copy of the repository, handed out by `WorkspacePool.acquire`."""
+
+    def __init__(self, root: Path, strategy: str, untracked: Optional[List[str]] = None):
+        self.root: Path = root
+        """Root of the copy, use it in place of the repo root."""
+        self.strategy = strategy
+        """How the copy was created, one of STRATEGIES."""
+        self.untracked: List[str] = list(untracked or [])
+        """Untracked files and directories copied from the clone, not ignored by git but kept by `reset`."""
+        self._originals: Dict[Path, Optional[bytes]] = {}
+
+    def path(self, relative_path: Union[str, Path]) -> Path:
+        """Path of a file of the repository inside this workspace."""
+        return self.root / relative_path
+
+    def track(self, relative_path: Union[str, Path]) -> Path:
+        """Remember the original content of a file about to be edited in place, so `reset` restores it."""
+        file_path = self.path(relative_path)
+        if file_path not in self._originals:
+            self._originals[file_path] = file_path.read_bytes() if file_path.exists() else None
+        return file_path
+
+    def write(self, relative_path: Union[str, Path], content: str):
+        """Write a file of the workspace, remembering its original content for `reset`."""
+        self.track(relative_path).write_text(content)
+
+    def reset(self):
+        """Restore the workspace to the state of the repository."""
+        for file_path, original in self._originals.items():
+            if original is None:
+                file_path.unlink(missing_ok=True)
+            else:
+                file_path.write_bytes(original)
+        self._originals.clear()
+
+        if self.strategy == "worktree":
+            # Also undo edits made behind our back, ex) by the tests themselves. Ignored files, and the untracked
+            # ones copied from the clone, are kept.
+            kept = [option for path in self.untracked for option in ("-e", f"/{path}")]
+            subprocess.run(["git", "reset", "--hard", "-q"], cwd=self.root, capture_output=True)
+            subprocess.run(["git", "clean", "-fdq", *kept], cwd=self.root, capture_output=True)
+
+
+class WorkspacePool:
+    """
+    Fixed size pool of workspaces of a repository clone.
+
+    Usage:
+        with WorkspacePool(repo.repo_root, size=4) as pool:
+            with pool.acquire() as workspace:
+                workspace.write(function.relative_path, new_contents)
+                actions.run_test_suite(repo_root=workspace.root)
+    """
+
+    def __init__(
+            self,
+            repo_root: Union[str, Path],
+            size: int,
+            base_dir: Union[str, Path] = None,
+            strategy: str = None,
+        ):
+        """
+        Args:
+            repo_root: Root of the repository clone.
+            size: Number of workspaces.
+            base_dir: Directory the workspaces are created in. Defaults to a `<repo>-workspaces` sibling of the clone,
+                next to the `<repo>-venv` virtual environment.
+            strategy: One of STRATEGIES. Defaults to worktree for git clones and copy otherwise.
+        """
+        self.repo_root = Path(repo_root).resolve()
+        """Root of the repository clone."""
+        self.size = size
+        """Number of workspaces."""
+        self.base_dir = Path(base_dir) if base_dir else self.repo_root.with_name(f"{self.repo_root.name}-workspaces")
+        """Directory the workspaces are created in."""
+        if strategy is None:
+            strategy = "worktree" if (self.repo_root / ".git").exists() else "copy"
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown workspace strategy {strategy}, expected one of {STRATEGIES}")
+        self.strategy = strategy
+        """How the workspaces are created, one of STRATEGIES."""
+
+        self.workspaces: List[Workspace] = []
+        """All workspaces of the pool, created by `create`."""
+        self._available: queue.Queue = queue.Queue()
+
+    def create(self) -> List[Workspace]:
+        """Create the workspaces."""
+        if self.workspaces:
+            return self.workspaces
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(self.size):
+            root = self.base_dir / f"{self.repo_root.name}-{i}"
+            self._remove(root)
+            untracked = []
+            if self.strategy == "worktree":
+                command = ["git", "worktree", "add", "--detach", "-f", str(root), "HEAD"]
+                output = subprocess.run(command, cwd=self.repo_root, capture_output=True)
+                if output.returncode == 0:
+                    output, untracked = self._copy_untracked_files(root)
+            else:
+                command = ["cp", "-a", "--reflink=auto", str(self.repo_root), str(root)]
+                output = subprocess.run(command, capture_output=True)
+            if output.returncode != 0:
+                self.close()
+                raise RuntimeError(f"Failed to create workspace {root}: {output.stderr.decode('utf-8')}")
+
+            workspace = Workspace(root, self.strategy, untracked)
+            self.workspaces.append(workspace)
+            self._available.put(workspace)
+
+        Logger().get_logger().info(f"Created {self.size} {self.strategy} workspaces of {self.repo_root} in {self.base_dir}")
+        return self.workspaces
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a workspace, blocking until one is free. It is reset when returned to the pool."""
+        if not self.workspaces:
+            self.create()
+        workspace = self._available.get()
+        try:
+            yield workspace
+        finally:
+            workspace.reset()
+            self._available.put(workspace)
+
+    def close(self):
+        """Remove all workspaces."""
+        for workspace in self.workspaces:
+            self._remove(workspace.root)
+        self.workspaces = []
+        self._available = queue.Queue()
+        if self.strategy == "worktree":
+            subprocess.run(["git", "worktree", "prune"], cwd=self.repo_root, capture_output=True)
+        if self.base_dir.exists() and not any(self.base_dir.iterdir()):
+            self.base_dir.rmdir()
+
+    def _copy_untracked_files(self, root: Path):
+        """
+        Copy the untracked and ignored files of the clone into a worktree, which only checks out the tracked ones.
+
+        Returns:
+            Tuple of (output of the last `cp`, untracked files and directories that are not ignored).
+        """
+        ignored = self._list_untracked_files("--ignored")
+        untracked = self._list_untracked_files()
+        paths = ignored + untracked
+        output = subprocess.CompletedProcess([], 0, b"", b"")
+        for start in range(0, len(paths), _COPY_BATCH_SIZE):
+            command = ["cp", "-a", "--reflink=auto", "--parents", "-t", str(root), *paths[start:start + _COPY_BATCH_SIZE]]
+            output = subprocess.run(command, cwd=self.repo_root, capture_output=True)
+            if output.returncode != 0:
+                break
+        return output, untracked
+
+    def _list_untracked_files(self, *options: str) -> List[str]:
+        """Untracked files of the clone, whole untracked directories as a single entry ending with a slash."""
+        command = ["git", "ls-files", "-z", "--others", "--directory", "--exclude-standard", *options]
+        output = subprocess.run(command, cwd=self.repo_root, capture_output=True)
+        return [path for path in output.stdout.decode("utf-8").split("\0") if path]
+
+    def _remove(self, root: Path):
+        if self.strategy == "worktree":
+            subprocess.run(["git", "worktree", "remove", "--force", str(root)], cwd=self.repo_root, capture_output=True)
+        shutil.rmtree(root, ignore_errors=True)
+
+    def __enter__(self):
+        self.create()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
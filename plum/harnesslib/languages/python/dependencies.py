@@ -38,18 +38,27 @@ class PythonRepoDependencyInstaller(DependencyInstaller):
     repo_info: ClonedRepoInfo
     "The cloned repo in which to install dependencies"
 
+    bulk_install: bool
+    "Whether the lines of each requirements source are installed in a single pip run, rather than one run per line"
+
     def __init__(self,
                  repo_info: ClonedRepoInfo,
                  environment: PythonEnvironment = PythonEnvironment(
-                     interpreter_path=Path(sys.executable))):
+                     interpreter_path=Path(sys.executable)),
+                 bulk_install: bool = True):
         self.python_path = environment.interpreter_path.as_posix()
+        self.template_path = environment.template_path
+        self.bulk_install = bulk_install
 
         super().__init__(repo_info)
 
     def install_runner_dependencies(self) -> list[Dependency]:
         "Install dependencies needed for test runner"
+        if self.template_path is not None:
+            # Already installed in the template venv.
+            return []
         return pip_install(
-            ['-U', 'coverage', 'pytest', 'pytest-timeout', 'pytest-json-report'],
+            ['-U', 'coverage', 'pytest', 'pytest-timeout', 'pytest-json-report', 'pytest-xdist', 'pytest-cov'],
             "test_runner_dependencies",
             python_interpreter=self.python_path
         )
@@ -94,6 +103,28 @@ class PythonRepoDependencyInstaller(DependencyInstaller):
                     ['-U', line.split('>=')[0]], source, python_interpreter=self.python_path)
         return []
 
+    def _install_packages(self,
+                          lines: list[str],
+                          source: str) -> list[Dependency]:
+        """
+        Install dependencies in a single pip run, so pip resolves them together.
+
+        If the run fails, the lines are split in halves installed separately, down to the
+        lines failing on their own, which fall back to unpinned versions like `_install_package`.
+        """
+        if not self.bulk_install or len(lines) <= 1:
+            return [dep for line in lines for dep in self._install_package(line, source)]
+
+        lines = [PACKAGES_TO_REPLACE.get(line, line) for line in lines]
+        try:
+            return pip_install(['-U', *lines], source, python_interpreter=self.python_path)
+        except ValueError:
+            Logger().get_logger().info(
+                f"Installing {len(lines)} dependencies from {source} at once failed, bisecting")
+            middle = len(lines) // 2
+            return (self._install_packages(lines[:middle], source)
+                    + self._install_packages(lines[middle:], source))
+
     def install_from_requirements(self) -> list[Dependency]:
         # find any requirements.txt files in the repo
         ## TODO Debug 
@@ -106,19 +137,20 @@ class PythonRepoDependencyInstaller(DependencyInstaller):
         #     args, "requirements.txt glob search", python_interpreter=self.python_path
         # )
         "Install dependencies from requirements.txt and requirements_test.txt"
-        # Install requirements line by line to ignore failure
+        # Install requirements together, isolating the failing lines to ignore them
         deps: list[Dependency] = []
         for requirements_file in ['requirements.txt', 'requirements_test.txt']:
             requirements_path = self.repo_info.clone_path / requirements_file
             if requirements_path.exists():
+                lines = []
                 with requirements_path.open('rb') as f:
                     for line in f:
                         line = line.decode('utf-8').strip()
                         if (len(line) > 0 and
                             not line.startswith('#') and
                                 not any(pkg in line for pkg in PACKAGES_TO_IGNORE)):
-                            deps.extend(
-                                self._install_package(line, requirements_file))
+                            lines.append(line)
+                deps.extend(self._install_packages(lines, requirements_file))
 
         return deps
 
@@ -126,13 +158,20 @@ class PythonRepoDependencyInstaller(DependencyInstaller):
     def install_by_pipreqs(self) -> list[Dependency]:
         "Install dependencies by polling pipreqs"
         # Manufacture dependencies from sources and install those too
-        deps = pip_install(['-U', 'pipreqs'], "pipreqs")
+        if self.template_path is not None:
+            deps: list[Dependency] = []
+            pipreqs = (self.template_path / 'bin/pipreqs').as_posix()
+        else:
+            deps = pip_install(['-U', 'pipreqs'], "pipreqs")
+            pipreqs = 'pipreqs'
         pipreqs_output = run_subprocess(
-            ['pipreqs', '--mode', 'no-pin', '--print', str(self.repo_info.clone_path)])
+            [pipreqs, '--mode', 'no-pin', '--print', str(self.repo_info.clone_path)])
+        lines = []
         for req in pipreqs_output.stdout.splitlines():
             stripped = req.strip()
             if stripped != '' and not any(pkg in stripped for pkg in PACKAGES_TO_IGNORE):
-                deps.extend(self._install_package(stripped, 'pipreqs'))
+                lines.append(stripped)
+        deps.extend(self._install_packages(lines, 'pipreqs'))
 
         return deps
 
@@ -143,6 +182,8 @@ class PythonRepoDependencyInstaller(DependencyInstaller):
         pytest is not necessarily a dependency for the repo itself, but is used by harnesslib.
         TODO: Consider not installing pytest in this task.
         """
+        if self.template_path is not None:
+            return []
         return pip_install(
             ['-U', 'pytest', 'pytest-timeout'], "pytest", python_interpreter=self.python_path)
 
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 
 from plum.harnesslib.data_model.base import DataModel
 from plum.harnesslib.languages.python.helpers import python_subprocess
+from plum.harnesslib.languages.python.template import VenvTemplate
 from plum.harnesslib.data_model import ClonedRepoInfo
 from plum.harnesslib.tasks.task import SingleResultTask
 
@@ -21,6 +22,9 @@ class PythonEnvironment(DataModel):
     venv_path: Optional[Path] = None
     "Absolute path to the venv"
 
+    template_path: Optional[Path] = None
+    "Absolute path to the template venv providing the test runner tooling, see `VenvTemplate`"
+
     def __post_init__(self):
         if not self.interpreter_path.is_absolute():
             raise ValueError("interpreter_path must be absolute")
@@ -31,8 +35,11 @@ class PythonEnvironment(DataModel):
 class CreatePythonEnvironment(SingleResultTask[PythonEnvironment]):
     """Task to create a Python venv for a given repo."""
 
-    def __init__(self, repo_info: ClonedRepoInfo, venv_path: Optional[Path] = None):
+    def __init__(self, repo_info: ClonedRepoInfo, venv_path: Optional[Path] = None,
+                 template: Optional[VenvTemplate] = None):
         self.repo_info = repo_info
+        self.template = template
+        "Template venv the new venv is overlaid onto, so it does not install the test runner tooling itself"
 
         if venv_path is None:
             self.venv_path = (self.repo_info.clone_path.parent /
@@ -49,4 +56,6 @@ class CreatePythonEnvironment(SingleResultTask[PythonEnvironment]):
             result = python_subprocess(['-m', 'venv', self.venv_path.as_posix()])
             if result.returncode != 0:
                 return PythonEnvironment(venv_path=None, interpreter_path=Path(sys.executable))
-        return PythonEnvironment(venv_path=self.venv_path, interpreter_path=interpreter_path)
+        template_path = self.template.overlay(self.venv_path) if self.template is not None else None
+        return PythonEnvironment(
+            venv_path=self.venv_path, interpreter_path=interpreter_path, template_path=template_path)
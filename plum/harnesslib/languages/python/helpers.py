@@ -5,6 +5,7 @@ from typing import Optional, Union
 
 from plum.harnesslib.data_model import Dependency
 from plum.harnesslib.languages import Language
+from plum.harnesslib.languages.python.wheelhouse import get_wheelhouse
 from plum.harnesslib.util.shell import ShellOutput, run_subprocess
 import os
 import toml
@@ -29,9 +30,34 @@ def python_subprocess(args: list[str],
 def pip_install(args: list[str],
                 reason: str,
                 python_interpreter: Optional[str] = None) -> list[Dependency]:
-    "Run pip install with the given arguments"
-    output = python_subprocess(['-m', 'pip', 'install', *args],
+    """
+    Run pip install with the given arguments.
+
+    With a wheelhouse set, see `wheelhouse.set_wheelhouse`, the requirements are installed from the wheelhouse
+    without contacting the index when it has every wheel. On a miss, they are built into the wheelhouse first.
+
+    This trades freshness for speed: `-U`/`--upgrade` then upgrades to the newest wheel of the wheelhouse, and
+    only reaches the index on a miss. Releases published since a wheel was built are picked up once the
+    wheelhouse is cleared, see `Wheelhouse.clear`.
+    """
+    wheelhouse = get_wheelhouse()
+    options: list[str] = []
+    from_wheelhouse = False
+    if wheelhouse is not None:
+        requirements = [arg for arg in args if arg not in ('-U', '--upgrade')]
+        # Editable installs and other options are installed as is, only their dependencies come from the wheelhouse.
+        from_wheelhouse = not wheelhouse.offline and not any(arg.startswith('-') for arg in requirements)
+        options = wheelhouse.get_pip_options(offline=True if from_wheelhouse else None)
+    output = python_subprocess(['-m', 'pip', 'install', *options, *args],
                                python_interpreter=python_interpreter)
+    if output.returncode != 0 and from_wheelhouse:
+        # Missing from the wheelhouse, build the wheels into it and install again. Once every wheel is built
+        # the install needs no index, otherwise it falls back to the index for what could not be built.
+        all_built = wheelhouse.add(requirements, python_interpreter)
+        options = wheelhouse.get_pip_options(offline=all_built)
+        output = python_subprocess(['-m', 'pip', 'install', *options, *args],
+                                   python_interpreter=python_interpreter)
+    args = [*options, *args]
     if output.returncode != 0:
         raise ValueError(
             f'pip install {args=} failed with {output.returncode=}\nStderr: {output.stderr}')
@@ -76,6 +102,9 @@ def install_toml(interpreter_path: str, repo_root: str) -> None:
         command = [interpreter_path, "-m", "pip", "install", "-e" , repo_root + f"[{extras}]", "-vvv"]
     else:
         command = [interpreter_path, "-m", "pip", "install", "-e" , repo_root, "-vvv"]
+    wheelhouse = get_wheelhouse()
+    if wheelhouse is not None:
+        command += wheelhouse.get_pip_options()
     run_subprocess(
     command
     )
@@ -0,0 +1,116 @@
+"""
+Template venvs with the test runner tooling preinstalled, one per Python version.
+
+Every repo venv otherwise installs coverage, pytest and its plugins, and pipreqs, before any of the repo's
+own dependencies. A template venv installs them once per interpreter version. New repo venvs are overlaid
+onto it with a `.pth` file: the template's packages are importable from the repo venv, after the repo's own
+packages, so a repo pinning another pytest version still gets its own.
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+from filelock import FileLock
+
+from plum.constants import PLUM_FOLDER
+from plum.harnesslib.languages.python.helpers import pip_install, python_subprocess
+from plum.utils.logger import Logger
+
+
+RUNNER_PACKAGES = [
+    'coverage', 'pytest', 'pytest-timeout', 'pytest-json-report', 'pytest-xdist', 'pytest-cov', 'pipreqs',
+]
+"Packages installed in the template venvs: the test runner tooling and pipreqs"
+
+TEMPLATE_PTH = 'plum-template.pth'
+"Name of the .pth file overlaying a repo venv onto its template"
+
+_COMPLETE_MARKER = '.plum-template-complete'
+
+
+def get_python_version(python_interpreter: Union[str, os.PathLike]) -> Optional[str]:
+    "Major and minor version of a Python interpreter, ex) 3.11"
+    output = python_subprocess(
+        ['-c', 'import sys; print("%d.%d" % sys.version_info[:2])'], python_interpreter=os.fspath(python_interpreter))
+    return output.stdout.strip() if output.returncode == 0 else None
+
+
+def get_site_packages(python_interpreter: Union[str, os.PathLike]) -> Optional[Path]:
+    "Directory the packages of the venv of a Python interpreter are installed into"
+    output = python_subprocess(
+        ['-c', 'import sysconfig; print(sysconfig.get_paths()["purelib"])'], python_interpreter=os.fspath(python_interpreter))
+    return Path(output.stdout.strip()) if output.returncode == 0 else None
+
+
+class VenvTemplate:
+    "Venvs with the runner tooling installed, one per Python version, overlaid onto the repo venvs"
+
+    def __init__(self, root: Union[str, os.PathLike], packages: Optional[list[str]] = None):
+        self.root = Path(root).resolve()
+        "Directory of the template venvs"
+        self.packages = list(packages) if packages is not None else list(RUNNER_PACKAGES)
+        "Packages installed in the template venvs"
+
+    @staticmethod
+    def for_project(cwd: Union[str, os.PathLike], packages: Optional[list[str]] = None) -> "VenvTemplate":
+        "Template venvs of a Plum project"
+        return VenvTemplate(Path(cwd) / PLUM_FOLDER / "venv-templates", packages)
+
+    def get_path(self, version: str) -> Path:
+        "Path of the template venv of a Python version"
+        return self.root / f'py{version}'
+
+    def ensure(self, base_interpreter: Union[str, os.PathLike] = sys.executable) -> Optional[Path]:
+        """
+        Create the template venv of the interpreter's version with the packages installed, unless it exists.
+        Concurrent processes wait for the one creating it.
+
+        Returns:
+            Path of the template venv, None if it could not be created.
+        """
+        version = get_python_version(base_interpreter)
+        if version is None:
+            return None
+        path = self.get_path(version)
+        if (path / _COMPLETE_MARKER).exists():
+            return path
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with FileLock(self.root / f'py{version}.lock'):
+            if (path / _COMPLETE_MARKER).exists():
+                return path
+            # Left over by a process that failed or was killed while creating it.
+            shutil.rmtree(path, ignore_errors=True)
+            result = python_subprocess(['-m', 'venv', path.as_posix()], python_interpreter=os.fspath(base_interpreter))
+            if result.returncode != 0:
+                Logger().get_logger().error(f'Failed creating template venv {path}: {result.stderr}')
+                return None
+            try:
+                if self.packages:
+                    pip_install(['-U', *self.packages], 'venv_template', python_interpreter=(path / 'bin/python').as_posix())
+            except ValueError as e:
+                Logger().get_logger().error(f'Failed installing the template venv packages: {e}')
+                return None
+            (path / _COMPLETE_MARKER).touch()
+        return path
+
+    def overlay(self, venv_path: Union[str, os.PathLike]) -> Optional[Path]:
+        """
+        Make the packages of the template venv of the same Python version importable from a venv.
+
+        Returns:
+            Path of the template venv, None if there is none for the venv's version.
+        """
+        interpreter_path = Path(venv_path) / 'bin/python'
+        template_path = self.ensure(interpreter_path)
+        if template_path is None:
+            return None
+
+        site_packages = get_site_packages(interpreter_path)
+        template_site_packages = get_site_packages(template_path / 'bin/python')
+        if site_packages is None or template_site_packages is None:
+            return None
+        (site_packages / TEMPLATE_PTH).write_text(template_site_packages.as_posix() + '\n')
+        return template_path
@@ -0,0 +1,91 @@
+"""
+Local wheelhouse shared by the venvs of all repos.
+
+Every venv otherwise downloads, and for source distributions builds, the same popular packages again.
+With a wheelhouse active, `pip_install` installs from the wheelhouse only, without contacting the index. When
+wheels are missing, it builds the requirements into the wheelhouse, where they are found by every later install,
+and installs again, so upgrades only reach the index for wheels missing from the wheelhouse. pip's cache is shared too. In offline mode the index is never contacted: installs only succeed
+from wheels already in the wheelhouse, for reproducible, network-free reruns.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from plum.constants import PLUM_FOLDER
+from plum.harnesslib.util.shell import run_subprocess
+
+
+class Wheelhouse:
+    "Directory of built wheels, with the pip cache next to it."
+
+    def __init__(self, root: Union[str, os.PathLike], offline: bool = False):
+        self.root = Path(root).resolve()
+        "Directory of the wheelhouse"
+        self.offline = offline
+        "Whether pip installs from the wheelhouse only, without contacting the index"
+
+    @staticmethod
+    def for_project(cwd: Union[str, os.PathLike], offline: bool = False) -> "Wheelhouse":
+        "Wheelhouse of a Plum project"
+        return Wheelhouse(Path(cwd) / PLUM_FOLDER / "wheelhouse", offline)
+
+    @property
+    def wheels_dir(self) -> Path:
+        "Directory holding the wheels"
+        return self.root / "wheels"
+
+    @property
+    def cache_dir(self) -> Path:
+        "pip cache directory shared by the installs"
+        return self.root / "cache"
+
+    def get_pip_options(self, offline: Optional[bool] = None) -> list[str]:
+        "Options of `pip install` finding packages in the wheelhouse"
+        self.wheels_dir.mkdir(parents=True, exist_ok=True)
+        options = ['--find-links', self.wheels_dir.as_posix(), '--cache-dir', self.cache_dir.as_posix()]
+        if self.offline if offline is None else offline:
+            options.append('--no-index')
+        return options
+
+    def add(self, requirements: list[str], python_interpreter: Optional[str] = None) -> bool:
+        """
+        Build wheels of the requirements and all their dependencies into the wheelhouse.
+
+        Wheels are built in a temporary directory and moved in one by one, so concurrent installs
+        never find a partially written wheel.
+
+        Returns:
+            Whether pip built every wheel.
+        """
+        if self.offline:
+            return False
+        self.wheels_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.root) as build_dir:
+            output = run_subprocess([
+                python_interpreter or sys.executable, '-m', 'pip', 'wheel',
+                '--wheel-dir', build_dir, *self.get_pip_options(offline=False), *requirements,
+            ])
+            for wheel in Path(build_dir).glob('*.whl'):
+                os.replace(wheel, self.wheels_dir / wheel.name)
+        return output.returncode == 0
+
+    def clear(self):
+        "Remove every wheel and the cache"
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_wheelhouse: Optional[Wheelhouse] = None
+
+
+def set_wheelhouse(wheelhouse: Optional[Wheelhouse]):
+    "Set the wheelhouse the pip installs of the current process use. None to install from the index directly."
+    global _wheelhouse
+    _wheelhouse = wheelhouse
+
+
+def get_wheelhouse() -> Optional[Wheelhouse]:
+    "Wheelhouse the pip installs of the current process use, if any"
+    return _wheelhouse
@@ -17,7 +17,8 @@ from .helpers import (
     clone_repository, 
     get_test_package,
     fix_indentation,
-    get_head_commit_hash
+    get_head_commit_hash,
+    available_cpus
 )
 
 from .test_report_parsers import (
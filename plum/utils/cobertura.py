@@ -7,8 +7,10 @@ including Python and JavaScript.
 """
 
 
+import logging
+import os
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Union
 import xmltodict
 
 
@@ -25,6 +27,156 @@ def parse_xml_as_dict(path: Union[str, Path]) -> dict:
 
     return coverage_report
 
+class SourceRootIndex:
+    """
+    Index of every file below a set of Cobertura source roots.
+
+    Cobertura reports list class file names relative to one of the `<source>` roots.
+    Rather than checking `(root / filename).exists()` for every class and every root,
+    the roots are walked once with `os.scandir` and each file name is then resolved with a dictionary lookup.
+    """
+    _SKIPPED_DIRECTORIES = {'.git', 'node_modules'}
+    """Directory names that never contain covered sources."""
+
+    def __init__(self, source_roots: List[Union[str, Path]], repo_root: Union[str, Path]):
+        """
+        Args:
+            source_roots: Local source root directories, in order of priority.
+            repo_root: Root of the repository, the resolved paths are relative to it.
+        """
+        self.repo_root = os.path.normpath(str(repo_root))
+        """Root of the repository."""
+        self.source_roots = [os.path.normpath(str(root)) for root in source_roots]
+        """Local source root directories, in order of priority."""
+
+        self._index: Dict[str, str] = {}
+        """Path relative to a source root -> path relative to the repo root."""
+        self._build()
+
+    def _build(self):
+        """Walk every distinct top level source root once and index the files for all roots containing them."""
+        # Only roots inside the repo can be expressed relative to it.
+        roots = [
+            root for root in dict.fromkeys(self.source_roots)
+            if self._is_within(root, self.repo_root) and os.path.isdir(root)
+        ]
+        # Nested roots are covered by the walk of their ancestor.
+        top_level_roots = [
+            root for root in roots
+            if not any(other != root and self._is_within(root, other) for other in roots)
+        ]
+
+        priorities: Dict[str, int] = {}
+        for top_level_root in top_level_roots:
+            containing_roots = [
+                (priority, root) for priority, root in enumerate(roots)
+                if self._is_within(root, top_level_root)
+            ]
+
+            stack = [top_level_root]
+            while stack:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SourceRootIndex._SKIPPED_DIRECTORIES:
+                                stack.append(entry.path)
+                            continue
+
+                        repo_relative = self._relative(entry.path, self.repo_root)
+                        for priority, root in containing_roots:
+                            if not self._is_within(entry.path, root):
+                                continue
+                            key = self._relative(entry.path, root)
+                            # The first source root listed in the report wins, as in the original lookup order.
+                            if priority < priorities.get(key, len(roots)):
+                                priorities[key] = priority
+                                self._index[key] = repo_relative
+
+    @staticmethod
+    def _is_within(path: str, root: str) -> bool:
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    @staticmethod
+    def _relative(path: str, root: str) -> str:
+        return Path(os.path.relpath(path, root)).as_posix()
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Resolve a Cobertura class file name to a path relative to the repo root.
+
+        Returns:
+            The repo relative path, or None if the file is not found under any source root.
+        """
+        if os.path.isabs(filename):
+            filename = os.path.normpath(filename)
+            if self._is_within(filename, self.repo_root):
+                return self._relative(filename, self.repo_root)
+            return None
+
+        return self._index.get(Path(os.path.normpath(filename)).as_posix())
+
+
+def adapt_cobertura_report(report: dict, repo_root: Union[str, Path], mount_dir: str) -> dict:
+    """
+    Adapt a Cobertura report generated inside a Docker container to the local repository.
+
+    Mainly carries out two operations.
+    1. Renames the sources
+        The sources point to the docker mount path, which is not the repo full path.
+        ex) old: /usr/src/mymaven/apollo-adminservice/src/main/java
+        ex) new: /datadisk/src/apollo/apollo-adminservice/src/main/java
+    2. Renames the package file paths
+        The file paths are relative to one of the sources. Change them to be relative to the repo root.
+        ex) old: com/ctrip/framework/apollo/adminservice/config/ConfigServiceConfig.java
+        ex) new: apollo-adminservice/src/main/java/com/ctrip/framework/apollo/adminservice/config/ConfigServiceConfig.java
+
+    Args:
+        report: Parsed Cobertura report. Multi-project reports are reduced to the aggregated '.' report.
+        repo_root: Full local path of the repo.
+        mount_dir: Directory the repo was mounted at inside the container.
+    """
+    # Check for multiproject repos
+    if '.' in report:
+        if len(report) > 1:
+            logging.warning(f"Found multiple projects in the coverage report. Using aggregated report.")
+        report = report['.']
+
+    def to_local(path: str) -> str:
+        # The path states docker work dir, replace it with the repo full dir.
+        if path == mount_dir or path.startswith(mount_dir.rstrip('/') + '/'):
+            return str(Path(repo_root) / Path(path).relative_to(mount_dir))
+        return path
+
+    # Change the Cobertura source paths to point to the repo full path instead of the docker mount path.
+    sources = report['coverage']['sources']['source']
+    if isinstance(sources, str):
+        new_sources = [to_local(sources)]
+        report['coverage']['sources']['source'] = new_sources[0]
+    else:
+        new_sources = [to_local(source) for source in sources]
+        report['coverage']['sources']['source'] = new_sources
+
+    # Change the Cobertura packages to point to paths relative to the repo root.
+    index = SourceRootIndex(new_sources, repo_root)
+
+    packages = report['coverage']['packages']['package']
+    if isinstance(packages, dict):
+        packages = [packages]
+
+    for package in packages:
+        if not package.get('classes'):
+            continue
+        file_dicts = package['classes']['class']
+        if isinstance(file_dicts, dict):
+            file_dicts = [file_dicts]
+
+        for f in file_dicts:
+            resolved = index.resolve(to_local(f.get('@filename')))
+            if resolved is not None:
+                f['@filename'] = resolved
+
+    return report
+
 def get_function_coverage(cobertura_report: dict, hash2function: dict, language: str) -> dict[str, list[int]]:
     """
     Generate a per-function coverage, where the keys of the dictionary are the function hashes and
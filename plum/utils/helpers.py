@@ -225,3 +225,13 @@ def temporary_file_content_change(filename: Path, temporary_content: str, mode='
         with open(filename, mode) as fout2:
             fout2.write(original_file_content)
 
+
+
+def available_cpus():
+    """
+    Number of CPUs this process may run on, honoring CPU affinity (ex. taskset or container cpusets)
+    rather than the total number of CPUs on the machine.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
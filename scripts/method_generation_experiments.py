@@ -1,14 +1,22 @@
 """Code for completing the method generation experiment in Python using the plum api"""
 from plum.environments.py_repo import PythonRepository
+from plum.environments.workspace_pool import WorkspacePool
 from plum.actions.py_actions import PythonActions
+from plum.actions.python.test_impact import TestImpactSelector, filter_test_report
 from plum.utils.llms import nonchat_gpt
 import json
 from pathlib import Path
 import fileinput
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def method_generation_experiment(base_path, repo_name, cleanup):
+def method_generation_experiment(base_path, repo_name, cleanup, workers=1):
     """
     Experimental pipeline for one git repo: method generation using original docstrings.
+    Each altered function is written to its own workspace (an isolated copy of the repo),
+    so the clone itself is never modified. Pass `workers` > 1 to evaluate that many functions in parallel.
+    Workspaces hold the clone's untracked and ignored files too, ex) built extensions, but not its uncommitted
+    edits of tracked files, which the control run in the clone does see: commit them before the experiment.
     """
     # set up the repo environment and state
     print(repo_name)
@@ -38,38 +46,52 @@ def method_generation_experiment(base_path, repo_name, cleanup):
     if result != "success":
         raise Exception("Test suite is broken")
 
-    for fnhash, function in functions.items():
-        if fnhash in covered_functions:
-
-            # TODO CHANGE THIS BACK FOR OTHER EXPERIMENTS
-            new_function = get_altered_function_w_file_context(function, repo)
-
-            # new_function = get_altered_function(function)
-            # save original file contents before writing new function to file
-            file_path = repo.base / repo.internal_repo_path / function.relative_path
-            original_file_contents = open(file_path).read()
-
+    # only rerun the tests reaching each altered function, functions missing from the coverage run get the full suite
+    try:
+        fn2tests = plum.get_fn2tests_from_coverage()
+    except (subprocess.TimeoutExpired, RuntimeError) as e:
+        print(f"Coverage mapping failed, running the full suite for every function: {e}")
+        fn2tests = {}
+    selector = TestImpactSelector(fn2tests)
+
+    def run_experiment(fnhash, function, pool):
+        # TODO CHANGE THIS BACK FOR OTHER EXPERIMENTS
+        new_function = get_altered_function_w_file_context(function, repo)
+
+        # new_function = get_altered_function(function)
+        # the workspace is reset when it is returned to the pool, no need to restore the original file
+        with pool.acquire() as workspace:
+            file_path = workspace.track(function.relative_path)
             plum.write_snippet_to_file(new_function, file_path, snippet_type='function')
 
-            new_file_contents = open(file_path).read()
-            
-            test_report = plum.run_test_suite()
-            failed_tests = get_test_failures(control_test_report, test_report)
-
-            with open(file_path, "w") as f:
-                f.write(original_file_contents)
-            
-            # saving the data of the run
-            method_dict = {
-                "repo_name": repo_name,
-                "fnhash": fnhash,
-                "original_fn": function.function_dict,
-                "new_fn": new_function.function_dict,
-                "failed_tests": failed_tests,
-                "success": len(failed_tests)==0
-            }
+            test_ids = selector.select(fnhash)
+            if test_ids == []:
+                failed_tests = []
+            else:
+                test_report = plum.run_test_suite(repo_root=workspace.root, test_ids=test_ids)
+                control_report = control_test_report if test_ids is None else filter_test_report(control_test_report, test_ids)
+                failed_tests = get_test_failures(control_report, test_report)
+
+        # saving the data of the run
+        return {
+            "repo_name": repo_name,
+            "fnhash": fnhash,
+            "original_fn": function.function_dict,
+            "new_fn": new_function.function_dict,
+            "failed_tests": failed_tests,
+            "success": len(failed_tests)==0
+        }
+
+    with WorkspacePool(repo.repo_root, workers) as pool, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_experiment, fnhash, function, pool)
+            for fnhash, function in functions.items()
+            if fnhash in covered_functions
+        ]
+        for future in as_completed(futures):
+            method_dict = future.result()
             write_data_jsonl(method_dict, base_path / 'method_generation_experiment.jsonl')
-            print(fnhash)
+            print(method_dict["fnhash"])
 
 
 def write_data_jsonl(method_dict, writepath):
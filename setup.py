@@ -39,6 +39,7 @@ setup(
     packages=find_packages(exclude=["contrib", "docs", "test"]),  # Required
     python_requires=">=3.6, <4",
     include_package_data=True,
+    package_data={"plum.actions.javascript": ["*.js"]},
     entry_points={
         "console_scripts": [
             "plum=cli.entry:main",
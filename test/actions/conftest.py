@@ -0,0 +1,17 @@
+import pytest
+
+
+from plum.actions import _containers
+
+
+@pytest.fixture(autouse=True)
+def untrack_fake_containers():
+    """
+    Forget the containers tracked by a test once it is done. Tests run containers against a fake Docker CLI,
+    the containers they leave tracked would otherwise be removed with the real one when the tests exit.
+    """
+    with _containers._tracked_lock:
+        tracked = set(_containers._tracked)
+    yield
+    with _containers._tracked_lock:
+        _containers._tracked.intersection_update(tracked)
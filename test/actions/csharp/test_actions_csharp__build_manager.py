@@ -29,3 +29,27 @@ def test_csharp_build():
 
     # Assert that the build was successful
     assert res.success, "BUILD ERROR"
+
+
+def _write_csproj(path: Path, frameworks: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tag = "TargetFrameworks" if ";" in frameworks else "TargetFramework"
+    path.write_text(f'<Project Sdk="Microsoft.NET.Sdk"><PropertyGroup><{tag}>{frameworks}</{tag}></PropertyGroup></Project>')
+
+def test_predict_images(tmp_path):
+    _write_csproj(tmp_path / "src" / "Lib" / "Lib.csproj", "netstandard2.0;net8.0")
+    _write_csproj(tmp_path / "src" / "Legacy" / "Legacy.csproj", "net48")
+    _write_csproj(tmp_path / "tests" / "Lib.Tests" / "Lib.Tests.csproj", "netcoreapp3.1")
+    _write_csproj(tmp_path / "src" / "Lib" / "obj" / "Stale.csproj", "net5.0")
+
+    assert BuildManager.predict_images(tmp_path) == [
+        BuildManager.DOTNET_FRAMEWORK_IMAGE,
+        (BuildManager.DOTNET_SDK_IMAGE, "3.1"),
+        (BuildManager.DOTNET_SDK_IMAGE, "8.0"),
+    ]
+    # The configured SDK builds the older frameworks itself.
+    assert BuildManager.predict_images(tmp_path, sdk_tag="6.0") == [
+        BuildManager.DOTNET_FRAMEWORK_IMAGE,
+        (BuildManager.DOTNET_SDK_IMAGE, "8.0"),
+    ]
+    assert BuildManager.predict_images(tmp_path, sdk_tag="8.0-jammy") == [BuildManager.DOTNET_FRAMEWORK_IMAGE]
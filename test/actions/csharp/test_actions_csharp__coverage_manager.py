@@ -0,0 +1,79 @@
+import pytest
+
+
+from plum.actions._cache_volumes import CACHE_VOLUMES
+from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
+from plum.actions.csharp._sln_parser import Solution
+from plum.actions.csharp.coverage_manager import CoverageManager
+
+
+class _FakeProject:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+
+@pytest.fixture
+def manager():
+    solution = Solution("/repo", "Example.sln", [])
+    return CoverageManager(
+        repo_full_path="/repo",
+        root_solution=solution,
+        test_projects=[
+            _FakeProject("A.Tests", "tests/A.Tests/A.Tests.csproj"),
+            _FakeProject("B.Tests", "tests/B.Tests/B.Tests.csproj"),
+        ],
+        docker_runner=DockerRunner("mcr.microsoft.com/dotnet/sdk", "8.0", "/app"),
+        max_workers=2,
+    )
+
+def test_shared_volumes_mounted(manager):
+    """The tools and NuGet caches are shared by every container of the coverage run."""
+    assert manager.docker.volumes[CoverageManager.TOOLS_VOLUME] == CoverageManager.TOOLS_DIR
+    for volume, path in CACHE_VOLUMES["nuget"].items():
+        assert manager.docker.volumes[volume] == path
+
+def test_caller_runner_unchanged():
+    runner = DockerRunner("mcr.microsoft.com/dotnet/sdk", "8.0", "/app", volumes={"/host/data": "/data"})
+    manager = CoverageManager("/repo", Solution("/repo", "Example.sln", []), [], runner)
+
+    assert runner.volumes == {"/host/data": "/data"}
+    assert manager.docker is not runner
+    assert manager.docker.volumes["/host/data"] == "/data"
+    assert CoverageManager.TOOLS_VOLUME in manager.docker.volumes
+
+def test_session_runs_commands():
+    """A session, ex) a pooled container, is used as given, its container keeps the tools and packages."""
+    session = DockerSession("mcr.microsoft.com/dotnet/sdk", "8.0", "/plum/repo", volumes={"/host/data": "/data"})
+    manager = CoverageManager("/repo", Solution("/repo", "Example.sln", []), [], session)
+
+    assert manager.docker is session
+    assert session.volumes == {"/host/data": "/data"}
+
+def test_prepare_commands_build_once(manager):
+    commands = manager._create_prepare_commands()
+
+    assert commands[1:] == [
+        "dotnet add tests/A.Tests/A.Tests.csproj package coverlet.collector",
+        "dotnet add tests/B.Tests/B.Tests.csproj package coverlet.collector",
+        "dotnet build Example.sln",
+    ]
+
+def test_merge_commands_use_collected_artifacts(manager):
+    artifacts = [
+        "/app/tests/A.Tests/TestResults/1/coverage.cobertura.xml",
+        "/app/tests/B.Tests/TestResults/2/coverage.cobertura.xml",
+    ]
+    install, merge = manager._create_merge_commands(artifacts)
+
+    assert "[ -x /root/.dotnet/tools/dotnet-coverage ] ||" in install
+    assert merge == (
+        "/root/.dotnet/tools/dotnet-coverage merge --remove-input-files "
+        f"{artifacts[0]} {artifacts[1]} -f cobertura"
+    )
+
+def test_merge_commands_fall_back_to_glob(manager):
+    _, merge = manager._create_merge_commands([])
+
+    assert "**/*.cobertura.xml" in merge
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+from plum.actions.csharp_dotnet_actions import CsharpDotnetActions
+from plum.actions.csharp.test_session import GENERATED_TESTS_DIR, DotnetTestSession, get_generated_test_filter
+
+
+PASSED_SUMMARY = "Passed!  - Failed:     0, Passed:     3, Skipped:     1, Total:     4, Duration: 12 ms - A.Tests.dll (net8.0)"
+FAILED_SUMMARY = "Failed!  - Failed:     2, Passed:     5, Skipped:     0, Total:     7, Duration: 30 ms - B.Tests.dll (net8.0)"
+
+
+class _FakeDocker:
+    """Records the commands instead of running them in a container."""
+    def __init__(self, outputs=None):
+        self.commands = []
+        self.outputs = outputs or {}
+        self.started = False
+
+    def start(self, repo_path, timeout=120):
+        self.started = True
+
+    def is_alive(self):
+        return self.started
+
+    def exec(self, command, relative_work_dir=None, timeout=60):
+        self.commands.append(command)
+        for prefix, output in self.outputs.items():
+            if command.startswith(prefix):
+                return output
+        return 0, "", ""
+
+    def close(self):
+        self.started = False
+
+
+def test_parse_test_summary_sums_projects():
+    results = DotnetTestSession.parse_test_summary(f"{PASSED_SUMMARY}\n{FAILED_SUMMARY}\n")
+
+    assert results == {"status": "Failed", "failed": 2, "passed": 8, "skipped": 1, "total": 11}
+
+def test_parse_test_summary_no_summary():
+    assert DotnetTestSession.parse_test_summary("Build FAILED.") is None
+
+def test_restore_and_build_once(tmp_path):
+    docker = _FakeDocker({"dotnet test": (0, PASSED_SUMMARY, "")})
+    session = DotnetTestSession(docker, tmp_path, "Example.sln")
+
+    session.start()
+    session.run_tests()
+    result = session.run_tests(test_filter="FullyQualifiedName~A.Tests")
+
+    assert docker.commands == [
+        "dotnet restore Example.sln && dotnet build Example.sln --no-restore",
+        "dotnet test Example.sln --no-build --no-restore",
+        "dotnet test Example.sln --no-build --no-restore --filter 'FullyQualifiedName~A.Tests'",
+    ]
+    assert result["status_result"] == "SUCCESS"
+    assert result["test_results"]["passed"] == 3
+
+def test_run_generated_test(tmp_path):
+    (tmp_path / "tests" / "A.Tests").mkdir(parents=True)
+    docker = _FakeDocker({"dotnet test": (0, PASSED_SUMMARY, "")})
+    session = DotnetTestSession(docker, tmp_path)
+    session.start()
+
+    result = session.run_generated_test(
+        "namespace A.Tests;\npublic class GeneratedFooTests { }", "tests/A.Tests/A.Tests.csproj"
+    )
+
+    assert docker.commands[1:] == [
+        "dotnet build tests/A.Tests/A.Tests.csproj --no-restore",
+        "dotnet test tests/A.Tests/A.Tests.csproj --no-build --no-restore --filter 'FullyQualifiedName~A.Tests.GeneratedFooTests.'",
+    ]
+    assert result["status_result"] == "SUCCESS"
+    assert result["build_result"]["success"]
+    assert not (tmp_path / "tests" / "A.Tests" / GENERATED_TESTS_DIR).exists()
+
+    # Only the test project the generated test was removed from is rebuilt, before it runs again.
+    docker.commands.clear()
+    session.run_tests(project="tests/B.Tests/B.Tests.csproj")
+    session.run_tests()
+    session.run_tests()
+    assert docker.commands == [
+        "dotnet test tests/B.Tests/B.Tests.csproj --no-build --no-restore",
+        "dotnet build tests/A.Tests/A.Tests.csproj --no-restore",
+        "dotnet test  --no-build --no-restore",
+        "dotnet test  --no-build --no-restore",
+    ]
+
+def test_generated_test_filter():
+    assert get_generated_test_filter("namespace A.Tests {\n  public class FooTests { }\n}") == "FullyQualifiedName~A.Tests.FooTests."
+    assert get_generated_test_filter("public class FooTests { }") == "FullyQualifiedName~FooTests."
+
+def test_run_generated_test_build_failure(tmp_path):
+    (tmp_path / "tests").mkdir()
+    docker = _FakeDocker({"dotnet build tests": (1, "Build FAILED.", "")})
+    session = DotnetTestSession(docker, tmp_path)
+    session.start()
+
+    result = session.run_generated_test("public class Broken {", "tests/Tests.csproj")
+
+    assert result["status_result"] == "FAILURE"
+    assert result["test_results"] is None
+    assert not any(command.startswith("dotnet test") for command in docker.commands)
+
+def test_generated_test_without_test_project(tmp_path):
+    environment = SimpleNamespace(base=tmp_path, internal_repo_path="", repo_type=SimpleNamespace(name="LOCAL"))
+    actions = CsharpDotnetActions(environment, "mcr.microsoft.com/dotnet/sdk", "6.0")
+
+    # No solution, then a solution without test projects.
+    for _ in range(2):
+        assert actions.run_generated_test("public class FooTests { }")["success"] is False
+        assert actions.prepare_generated_test("public class FooTests { }")["success"] is False
+        (tmp_path / "Example.sln").write_text("Microsoft Visual Studio Solution File, Format Version 12.00\n")
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from plum.actions.java_mvn_actions import JavaMavenActions
+
+BROKEN_TEST = """public class BrokenTest {
+    @Test
+    public void breaks() { undefined(); }
+}"""
+
+PASSING_TEST = """public class PassingTest {
+    @Test
+    public void passes() { assertTrue(true); }
+}"""
+
+
+def _run_test_classes(test_dir, runs):
+    """Stands in for run_test_classes: compilation fails while BrokenTest.java is written, as with javac."""
+    def run_test_classes(class_names, timeout=None):
+        runs.append(list(class_names))
+        if (test_dir / "BrokenTest.java").exists():
+            stdout = (
+                "[ERROR] COMPILATION ERROR : \n"
+                "[ERROR] /usr/src/mymaven/src/test/java/com/example/BrokenTest.java:[5,30] cannot find symbol\n"
+                "[INFO] BUILD FAILURE\n"
+            )
+            return {"status_result": "FAILURE", "test_results": {}, "class_results": {}, "stdout": stdout, "stderr": ""}
+        class_results = {name: {"tests": [{"name": "passes", "outcome": "passed"}]} for name in class_names}
+        return {"status_result": "SUCCESS", "test_results": {}, "class_results": class_results, "stdout": "[INFO] BUILD SUCCESS\n", "stderr": ""}
+    return run_test_classes
+
+
+def test_run_generated_tests_with_compilation_error(tmp_path):
+    test_dir = tmp_path / "src" / "test" / "java" / "com" / "example"
+    test_dir.mkdir(parents=True)
+    environment = SimpleNamespace(
+        base=tmp_path, internal_repo_path="", repo_type=SimpleNamespace(name="LOCAL"), test_write_location=test_dir,
+    )
+    actions = JavaMavenActions(environment, "maven", "3")
+    runs = []
+    actions.run_test_classes = _run_test_classes(test_dir, runs)
+
+    broken, passing = actions.run_generated_tests([BROKEN_TEST, PASSING_TEST])
+
+    # The broken class is left out of a second run, so the other class still gets its results.
+    assert runs == [["com.example.BrokenTest", "com.example.PassingTest"], ["com.example.PassingTest"]]
+    assert broken["class_result"] is None
+    assert broken["status_result"] == "FAILURE"
+    assert "cannot find symbol" in broken["stdout"]
+    assert passing["class_result"] == {"tests": [{"name": "passes", "outcome": "passed"}]}
+    assert passing["status_result"] == "SUCCESS"
+    assert list(test_dir.iterdir()) == []
@@ -0,0 +1,66 @@
+import pytest
+from pathlib import Path
+import shutil
+
+
+from plum.actions.java.maven.jacoco import JACOCO_DETAILS, JacocoMavenPlugin, jacoco_to_cobertura
+from plum.utils.cobertura import _restructure_coverage_report, parse_xml_as_dict
+
+
+JACOCO_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<!DOCTYPE report PUBLIC "-//JACOCO//DTD Report 1.1//EN" "report.dtd">
+<report name="example">
+    <sessioninfo id="session" start="1" dump="2"/>
+    <package name="com/example/util">
+        <class name="com/example/util/Strings" sourcefilename="Strings.java"/>
+        <sourcefile name="Strings.java">
+            <line nr="3" mi="3" ci="0" mb="0" cb="0"/>
+            <line nr="6" mi="0" ci="4" mb="0" cb="2"/>
+            <line nr="7" mi="0" ci="1" mb="0" cb="0"/>
+        </sourcefile>
+        <sourcefile name="Empty.java"/>
+    </package>
+</report>
+"""
+
+
+@pytest.fixture
+def jacoco_report(tmp_path):
+    report_path = tmp_path / "jacoco.xml"
+    report_path.write_text(JACOCO_XML)
+    return parse_xml_as_dict(report_path)
+
+def test_sources_point_to_module_source_roots(jacoco_report):
+    report = jacoco_to_cobertura({".": jacoco_report, "core": jacoco_report}, "/usr/src/mymaven")
+
+    assert report["coverage"]["sources"]["source"] == [
+        "/usr/src/mymaven/src/main/java",
+        "/usr/src/mymaven/core/src/main/java",
+    ]
+
+def test_converted_report_lines(jacoco_report):
+    report = jacoco_to_cobertura({".": jacoco_report}, "/usr/src/mymaven")
+    restructured = _restructure_coverage_report(report, "java")
+
+    assert restructured == {
+        "com/example/util/Strings.java": [6, 7],
+        "com/example/util/Empty.java": [],
+    }
+
+def test_coverage_command_attaches_agent_in_parallel():
+    command = JacocoMavenPlugin(Path("pom.xml"), None).get_coverage_command(threads="4")
+    prefix = f"{JACOCO_DETAILS['group_id']}:{JACOCO_DETAILS['artifact_id']}:{JACOCO_DETAILS['version']}"
+
+    assert "-T 4" in command
+    assert f"{prefix}:prepare-agent test {prefix}:report" in command
+
+def test_pom_not_modified(tmp_path):
+    original_pom_path = Path(__file__).parent / "_example_pom.xml"
+    temp_pom_path = tmp_path / "pom.xml"
+    shutil.copyfile(original_pom_path, temp_pom_path)
+
+    plugin = JacocoMavenPlugin.load(temp_pom_path)
+    plugin.get_coverage_command()
+    plugin.get_all_reports("/usr/src/mymaven")
+
+    assert temp_pom_path.read_bytes() == original_pom_path.read_bytes()
@@ -0,0 +1,52 @@
+from plum.actions.java.maven.log_parser import MavenLogParser
+
+MAVEN_OUTPUT = """[INFO] Scanning for projects...
+[INFO] -------------------------------------------------------
+[INFO]  T E S T S
+[INFO] -------------------------------------------------------
+[INFO] Running com.example.AppTest
+[INFO] Tests run: 3, Failures: 0, Errors: 0, Skipped: 0, Time elapsed: 0.01 s - in com.example.AppTest
+[INFO] 
+[INFO] Results:
+[INFO] 
+[INFO] Tests run: 3, Failures: 0, Errors: 0, Skipped: 0
+[INFO] 
+[INFO] Running com.example.OtherTest
+[INFO] 
+[INFO] Results:
+[INFO] 
+[ERROR] Tests run: 2, Failures: 1, Errors: 0, Skipped: 0
+[INFO] 
+[INFO] Results:
+[INFO] 
+[INFO] Tests run: 4, Failures: 1, Errors: 1, Skipped: 2
+[INFO] ------------------------------------------------------------------------
+[INFO] BUILD FAILURE
+[INFO] ------------------------------------------------------------------------
+"""
+
+
+def test_maven_log_parser():
+    parser = MavenLogParser()
+    # Fed line by line, as while Maven runs.
+    for line in MAVEN_OUTPUT.splitlines(keepends=True):
+        parser.feed(line)
+
+    assert parser.status == "FAILURE"
+    # Only the [INFO] totals directly after a Results section count.
+    assert parser.result() == {"tests_run": 7, "failures": 1, "errors": 1, "skipped": 2}
+
+def test_maven_log_parser_no_results():
+    parser = MavenLogParser()
+    assert parser.parse("[INFO] BUILD SUCCESS\n") == {"tests_run": 0, "failures": 0, "errors": 0, "skipped": 0}
+    assert parser.status == "SUCCESS"
+
+def test_maven_log_parser_compilation_errors():
+    parser = MavenLogParser()
+    parser.parse(
+        "[ERROR] COMPILATION ERROR : \n"
+        "[ERROR] /usr/src/mymaven/src/test/java/com/example/BrokenTest.java:[5,30] cannot find symbol\n"
+        "[ERROR] /usr/src/mymaven/src/test/java/com/example/BrokenTest.java:[7] ';' expected\n"
+        "[INFO] BUILD FAILURE\n"
+    )
+    assert parser.compilation_errors == {"/usr/src/mymaven/src/test/java/com/example/BrokenTest.java"}
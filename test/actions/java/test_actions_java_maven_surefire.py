@@ -0,0 +1,69 @@
+from pathlib import Path
+import pytest
+
+
+from plum.actions.java.maven import surefire
+from plum.actions.java.maven.session import collect_class_results, get_test_selection_options, remove_class_reports
+
+REPORT = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="com.example.{name}" time="1,234.5" tests="4" errors="1" skipped="1" failures="1">
+  <properties><property name="java.version" value="17"/></properties>
+  <testcase name="passes" classname="com.example.{name}" time="0.01"/>
+  <testcase name="fails" classname="com.example.{name}" time="0.02">
+    <failure message="expected:&lt;1&gt; but was:&lt;2&gt;" type="java.lang.AssertionError">stack</failure>
+  </testcase>
+  <testcase name="errors" classname="com.example.{name}" time="0">
+    <error type="java.lang.NullPointerException">java.lang.NullPointerException
+	at com.example.{name}.errors</error>
+  </testcase>
+  <testcase name="skipped" classname="com.example.{name}" time="0"><skipped/></testcase>
+</testsuite>
+"""
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for module, name in [("core", "FooTest"), ("api", "BarTest")]:
+        reports = tmp_path / module / surefire.REPORTS_DIR
+        reports.mkdir(parents=True)
+        (reports / f"TEST-com.example.{name}.xml").write_text(REPORT.format(name=name))
+    broken = tmp_path / "api" / surefire.REPORTS_DIR / "TEST-com.example.BrokenTest.xml"
+    broken.write_text("<testsuite name=")
+    return tmp_path
+
+def test_parse_report(repo):
+    result = surefire.parse_report(repo / "core" / surefire.REPORTS_DIR / "TEST-com.example.FooTest.xml")
+
+    assert result["class_name"] == "com.example.FooTest"
+    assert (result["tests"], result["failures"], result["errors"], result["skipped"]) == (4, 1, 1, 1)
+    assert result["time"] == 1234.5
+    assert [(t["name"], t["outcome"]) for t in result["testcases"]] == [
+        ("passes", "passed"), ("fails", "failed"), ("errors", "error"), ("skipped", "skipped"),
+    ]
+    assert result["testcases"][1]["message"] == "expected:<1> but was:<2>"
+    assert result["testcases"][2]["message"].startswith("java.lang.NullPointerException")
+
+def test_parse_reports_skips_truncated_reports(repo):
+    results = surefire.parse_reports(surefire.find_reports(repo))
+
+    assert sorted(results) == ["com.example.BarTest", "com.example.FooTest"]
+    assert surefire.summarize(results) == {"tests_run": 8, "failures": 2, "errors": 2, "skipped": 2}
+
+def test_collect_class_results(repo):
+    results = collect_class_results(repo, ["com.example.FooTest", "BarTest#passes", "MissingTest"])
+
+    assert sorted(results) == ["com.example.BarTest", "com.example.FooTest"]
+    assert sorted(collect_class_results(repo, ["FooTest"])) == ["com.example.FooTest"]
+
+def test_remove_class_reports(repo):
+    remove_class_reports(repo, ["com.example.FooTest", "Other"])
+
+    assert [p.name for p in surefire.find_reports(repo)] == [
+        "TEST-com.example.BarTest.xml", "TEST-com.example.BrokenTest.xml",
+    ]
+
+def test_get_test_selection_options():
+    options = get_test_selection_options(["com.example.FooTest", "BarTest#passes"])
+
+    assert options.startswith("-Dtest=com.example.FooTest,BarTest#passes ")
+    assert "-Dsurefire.failIfNoSpecifiedTests=false" in options
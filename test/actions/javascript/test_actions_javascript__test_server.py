@@ -0,0 +1,93 @@
+import shutil
+import pytest
+
+
+from plum.actions.javascript.test_server import NodeTestServer
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+# Stand-in for the jest package exposing the part of `runCLI` the server relies on.
+# The test file's contents pick the behaviour, so the server's handling of each case can be checked without npm.
+FAKE_JEST = """
+const fs = require("fs");
+let loads = 0;
+module.exports.runCLI = async (argv, projects) => {
+  loads += 1;
+  const source = fs.readFileSync(argv._[0], "utf8");
+  if (source.includes("HANG")) { while (true) {} }
+  if (source.includes("CRASH")) { process.exit(3); }
+  console.error("reporter output");
+  const suite = { testResults: [], failureMessage: null, testExecError: null };
+  if (source.includes("SYNTAX")) {
+    suite.failureMessage = "SyntaxError: Unexpected token";
+    suite.testExecError = { message: "SyntaxError: Unexpected token" };
+  } else {
+    suite.testResults.push({ fullName: "adds " + loads, status: "passed", failureMessages: [] });
+    if (source.includes("FAIL")) {
+      suite.testResults.push({ fullName: "breaks", status: "failed", failureMessages: ["expected 3"] });
+    }
+  }
+  return { results: { testResults: [suite] } };
+};
+"""
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "node_modules" / "jest").mkdir(parents=True)
+    (tmp_path / "node_modules" / "jest" / "index.js").write_text(FAKE_JEST)
+    for name, content in [("pass", ""), ("fail", "FAIL"), ("syntax", "SYNTAX"), ("hang", "HANG"), ("crash", "CRASH")]:
+        (tmp_path / f"{name}.test.js").write_text(f"// {content}\n")
+    return tmp_path
+
+def test_unsupported_test_library(repo):
+    with pytest.raises(ValueError):
+        NodeTestServer(repo, "tap")
+
+def test_results(repo):
+    with NodeTestServer(repo, "jest") as server:
+        passed = server.run("pass.test.js")
+        failed = server.run(repo / "fail.test.js")
+        syntax = server.run("syntax.test.js")
+
+    assert passed["outcome"] == "passed"
+    assert passed["tests"] == [{"name": "adds 1", "outcome": "passed", "message": ""}]
+    # Output printed by the framework is captured instead of corrupting the protocol.
+    assert passed["stderr"] == "reporter output\n"
+
+    # The framework stays loaded between runs.
+    assert failed["outcome"] == "failed"
+    assert [t["name"] for t in failed["tests"]] == ["adds 2", "breaks"]
+    assert failed["tests"][1]["message"] == "expected 3"
+
+    assert syntax["outcome"] == "error"
+    assert "SyntaxError" in syntax["error"]
+
+def test_restarts_after_timeout_and_crash(repo):
+    with NodeTestServer(repo, "jest", grace_period=0.5) as server:
+        assert server.run("hang.test.js", timeout=0.5)["outcome"] == "timeout"
+        assert not server.is_alive()
+        assert server.run("crash.test.js")["outcome"] == "error"
+        assert server.run("pass.test.js")["outcome"] == "passed"
+
+def test_actions_keep_using_server_after_timeout(repo, monkeypatch):
+    from types import SimpleNamespace
+    from plum.actions.js_actions import JavascriptActions
+
+    environment = SimpleNamespace(base=repo, internal_repo_path="", test_library="jest")
+    actions = JavascriptActions(environment)
+    actions.test_server = NodeTestServer(repo, "jest", grace_period=0.5)
+
+    def npm_test(*args, **kwargs):
+        raise AssertionError("fell back to npm test")
+    monkeypatch.setattr("plum.actions.js_actions.subprocess.run", npm_test)
+
+    try:
+        actions.test_server.start()
+        assert actions.run_npm_test("hang.test.js", timeout=0.5)["outcome"] == "timeout"
+        result = actions.run_npm_test("pass.test.js")
+    finally:
+        actions.stop_test_server()
+    assert result["success"]
+    assert result["outcome"] == "passed"
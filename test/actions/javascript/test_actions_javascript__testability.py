@@ -0,0 +1,80 @@
+import json
+import shutil
+import pytest
+from pathlib import Path
+
+
+from plum.actions.javascript.testability import (
+    _probe_source,
+    _testable_from_jest_report,
+    probe_testable_files,
+    write_probes,
+)
+
+
+# Stand-in for `jest --json --outputFile=<path> <pattern>`: loads each probe matching the pattern
+# in isolation and reports it as a passing or failing suite, the way Jest would.
+FAKE_JEST = """
+const fs = require("fs");
+const path = require("path");
+const args = process.argv.slice(2);
+const outputFile = args.find((a) => a.startsWith("--outputFile=")).split("=")[1];
+const pattern = new RegExp(args[args.length - 1]);
+const probes = [];
+(function walk(dir) {
+  for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+    const full = path.join(dir, entry.name);
+    if (entry.isDirectory() && entry.name !== "node_modules") walk(full);
+    else if (pattern.test(full)) probes.push(full);
+  }
+})(process.cwd());
+const testResults = probes.map((probe) => {
+  const source = fs.readFileSync(probe, "utf8").split("\\n")[0];
+  const target = JSON.parse(source.slice("require(".length, -");".length));
+  try {
+    require(target);
+    return { name: probe, status: "passed", assertionResults: [{ status: "passed" }] };
+  } catch (e) {
+    return { name: probe, status: "failed", assertionResults: [] };
+  }
+});
+fs.writeFileSync(outputFile, JSON.stringify({ testResults }));
+"""
+
+
+def test_probe_source():
+    assert _probe_source(Path("/repo/src/a.js"), "jest").startswith('require("/repo/src/a.js");\n')
+    assert _probe_source(Path("/repo/src/a.ts"), "mocha").startswith('import "/repo/src/a";\n')
+
+def test_write_probes_skips_existing(tmp_path):
+    (tmp_path / "a.js").write_text("")
+    (tmp_path / "b.js").write_text("")
+    (tmp_path / "b.plum-probe.test.js").write_text("// not ours")
+
+    probes = write_probes([tmp_path / "a.js", tmp_path / "b.js"], "jest")
+
+    assert probes == {tmp_path / "a.plum-probe.test.js": tmp_path / "a.js"}
+
+def test_testable_from_jest_report():
+    probes = {Path("/r/a.plum-probe.test.js"): Path("/r/a.js"), Path("/r/b.plum-probe.test.js"): Path("/r/b.js")}
+    report = {"testResults": [
+        {"name": "/r/a.plum-probe.test.js", "status": "passed", "assertionResults": [{"status": "passed"}]},
+        {"name": "/r/b.plum-probe.test.js", "status": "failed", "assertionResults": []},
+        {"name": "/r/other.test.js", "status": "passed", "assertionResults": [{"status": "passed"}]},
+    ]}
+
+    assert _testable_from_jest_report(report, probes) == [Path("/r/a.js")]
+
+@pytest.mark.skipif(shutil.which("npm") is None, reason="npm is not installed")
+def test_probe_testable_files_with_jest(tmp_path):
+    (tmp_path / "package.json").write_text(json.dumps({"name": "probe", "scripts": {"test": "node fake_jest.js"}}))
+    (tmp_path / "fake_jest.js").write_text(FAKE_JEST)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "ok.js").write_text("module.exports = 1;\n")
+    (tmp_path / "src" / "broken.js").write_text("require('missing-package');\n")
+
+    source_files = [tmp_path / "src" / "broken.js", tmp_path / "src" / "ok.js"]
+    testable = probe_testable_files(tmp_path, source_files, "jest", timeout=60)
+
+    assert testable == [(tmp_path / "src" / "ok.js").resolve()]
+    assert sorted(p.name for p in (tmp_path / "src").iterdir()) == ["broken.js", "ok.js"]
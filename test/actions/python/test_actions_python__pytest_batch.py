@@ -0,0 +1,59 @@
+import sys
+import pytest
+
+
+from plum.actions.python.pytest_batch import classify_outcome, run_pytest_batch
+from plum.actions.python.pytest_plugins.plum_test_results import classify
+
+pytest.importorskip("pytest_timeout")
+
+
+CANDIDATES = {
+    "pass": "def test_ok():\n    assert 1 + 1 == 2\n",
+    "fail": "def test_bad():\n    assert 1 + 1 == 3\n",
+    "broken": "import does_not_exist\n\ndef test_never():\n    pass\n",
+    "slow": "import time\n\ndef test_slow():\n    time.sleep(30)\n",
+    "mixed": "def test_a():\n    pass\n\ndef test_b():\n    raise ValueError()\n",
+}
+
+
+@pytest.fixture(scope="module")
+def results(tmp_path_factory):
+    repo = tmp_path_factory.mktemp("repo")
+    test_files = {}
+    for index, (key, source) in enumerate(CANDIDATES.items()):
+        test_files[key] = repo / f"test_candidate_{index}.py"
+        test_files[key].write_text(source)
+    return run_pytest_batch(sys.executable, repo, test_files, timeout=1)
+
+def test_results_keyed_by_candidate(results):
+    assert set(results) == set(CANDIDATES)
+
+@pytest.mark.parametrize("key, outcome", [
+    ("pass", "passed"),
+    ("fail", "failed"),
+    ("broken", "error"),
+    ("slow", "timeout"),
+    ("mixed", "failed"),
+])
+def test_outcomes(results, key, outcome):
+    assert results[key]["outcome"] == outcome
+    assert results[key]["success"] == (outcome == "passed")
+
+def test_per_test_results(results):
+    assert [t["outcome"] for t in results["mixed"]["tests"]] == ["passed", "failed"]
+
+def test_classify_outcome_without_results():
+    assert classify_outcome([]) == "error"
+    assert classify_outcome([], timed_out=True) == "timeout"
+
+def test_classify_shared_with_worker():
+    """The worker runs a single file, so it also classifies on pytest's exit code."""
+    passed = [{"when": "call", "outcome": "passed", "longrepr": ""}]
+    assert classify(passed, exitcode=0) == "passed"
+    assert classify(passed, exitcode=3) == "error"
+    timeout = [{"when": "call", "outcome": "failed", "longrepr": "Failed: Timeout (>2.0s) from pytest-timeout."}]
+    assert classify(timeout, exitcode=1) == classify_outcome(timeout) == "timeout"
+
+def test_empty_batch():
+    assert run_pytest_batch(sys.executable, ".", {}) == {}
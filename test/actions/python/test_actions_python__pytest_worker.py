@@ -0,0 +1,61 @@
+import sys
+import time
+import pytest
+
+
+from plum.actions.python.pytest_worker import PytestWorker, discover_top_level_packages
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    repo = tmp_path_factory.mktemp("repo")
+    (repo / "mypkg").mkdir()
+    (repo / "mypkg" / "__init__.py").write_text("VALUE = 1\n")
+    (repo / "tests").mkdir()
+    (repo / "tests" / "__init__.py").write_text("")
+
+    (repo / "test_pass.py").write_text("import mypkg\n\ndef test_value():\n    mypkg.VALUE += 1\n    assert mypkg.VALUE == 2\n")
+    (repo / "test_fail.py").write_text("def test_fail():\n    assert False\n")
+    (repo / "test_broken.py").write_text("import does_not_exist\n\ndef test_never():\n    pass\n")
+    (repo / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(30)\n")
+    return repo
+
+@pytest.fixture(scope="module")
+def worker(repo):
+    with PytestWorker(sys.executable, repo) as worker:
+        yield worker
+
+def test_discover_top_level_packages(repo):
+    assert discover_top_level_packages(repo) == ["mypkg"]
+
+def test_preloaded(worker):
+    assert worker.ready_message["preloaded"] == ["mypkg"]
+
+def test_passed(worker, repo):
+    result = worker.run(repo / "test_pass.py")
+
+    assert result["outcome"] == "passed"
+    assert [t["nodeid"] for t in result["tests"]] == ["test_pass.py::test_value"]
+
+def test_runs_are_isolated(worker, repo):
+    """The preloaded module is mutated by the test, but only inside the forked child."""
+    assert worker.run(repo / "test_pass.py")["outcome"] == "passed"
+    assert worker.run(repo / "test_pass.py")["outcome"] == "passed"
+
+def test_failed(worker, repo):
+    result = worker.run(repo / "test_fail.py")
+
+    assert result["outcome"] == "failed"
+    assert "assert False" in result["tests"][0]["longrepr"]
+
+def test_collection_error(worker, repo):
+    assert worker.run(repo / "test_broken.py")["outcome"] == "error"
+
+def test_timeout(worker, repo):
+    start = time.monotonic()
+    result = worker.run(repo / "test_slow.py", timeout=0.5)
+
+    assert result["outcome"] == "timeout"
+    assert time.monotonic() - start < 10
+    # The worker survives killed children.
+    assert worker.run(repo / "test_pass.py")["outcome"] == "passed"
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+
+
+from plum.actions.py_actions import PythonActions
+from plum.utils import get_pytest_test_failures
+
+pytest.importorskip("pytest_jsonreport")
+pytest.importorskip("xdist")
+pytest.importorskip("pytest_timeout")
+
+
+@pytest.fixture
+def actions(tmp_path):
+    for i in range(3):
+        (tmp_path / f"test_{i}.py").write_text(
+            f"def test_pass_{i}():\n    pass\n\ndef test_fail_{i}():\n    assert False\n"
+        )
+    (tmp_path / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(30)\n")
+    environment = SimpleNamespace(interpreter_path=Path(sys.executable), repo_root=tmp_path)
+    return PythonActions(environment)
+
+def _outcomes(report):
+    return {test["nodeid"]: test["outcome"] for test in report["tests"]}
+
+def test_parallel_report_matches_serial(actions):
+    serial = actions.run_test_suite(timeout=60, per_test_timeout=1)
+    parallel = actions.run_test_suite(timeout=60, parallel=True, workers=2, per_test_timeout=1)
+
+    assert _outcomes(parallel) == _outcomes(serial)
+    assert _outcomes(parallel)["test_slow.py::test_slow"] == "failed"
+    assert get_pytest_test_failures(serial, parallel) == {}
+
+def test_map_tests_to_functions_in_workspaces(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "calc.py").write_text("def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n")
+    (repo / "test_calc.py").write_text(
+        "import calc\n\ndef test_add():\n    assert calc.add(1, 2) == 3\n\ndef test_sub():\n    assert calc.sub(3, 2) == 1\n"
+    )
+    functions = {
+        "add": SimpleNamespace(relative_path="calc.py", start_line=0, end_line=1),
+        "sub": SimpleNamespace(relative_path="calc.py", start_line=4, end_line=5),
+    }
+    environment = SimpleNamespace(
+        interpreter_path=Path(sys.executable),
+        repo_root=repo,
+        base=tmp_path,
+        internal_repo_path="repo",
+        hash2function=functions,
+    )
+    actions = PythonActions(environment)
+    control = actions.run_test_suite(timeout=60)
+
+    fn2tests = actions.map_tests_to_functions(control, workers=2)
+
+    assert {fnhash: list(tests) for fnhash, tests in fn2tests.items()} == {
+        "add": ["test_calc.py::test_add"],
+        "sub": ["test_calc.py::test_sub"],
+    }
+    assert "def add" in (repo / "calc.py").read_text()
@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+
+
+from plum.actions.py_actions import PythonActions
+from plum.actions.python.test_impact import TestImpactSelector, filter_test_report, fn2tests_from_coverage_contexts
+
+
+CALC = "def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n\n\ndef unused():\n    return 0\n"
+FUNCTIONS = {
+    "add": SimpleNamespace(relative_path="calc.py", start_line=0, end_line=1),
+    "sub": SimpleNamespace(relative_path="calc.py", start_line=4, end_line=5),
+    "unused": SimpleNamespace(relative_path="calc.py", start_line=8, end_line=9),
+    "other": SimpleNamespace(relative_path="other.py", start_line=0, end_line=1),
+}
+
+
+def test_select():
+    selector = TestImpactSelector({"add": ["t::a"], "unused": []}, safety_tests=["t::smoke", "t::a"])
+
+    assert selector.select("add") == ["t::a", "t::smoke"]
+    assert selector.select("unused") == ["t::smoke", "t::a"]
+    assert selector.select("missing") is None
+
+def test_save_and_load(tmp_path):
+    TestImpactSelector({"add": ["t::a"]}, ["t::smoke"]).save(tmp_path / "selector.json")
+    selector = TestImpactSelector.load(tmp_path / "selector.json")
+
+    assert selector.fn2tests == {"add": ["t::a"]}
+    assert selector.safety_tests == ["t::smoke"]
+
+def test_filter_test_report():
+    report = {"exitcode": 0, "tests": [{"nodeid": "t::a"}, {"nodeid": "t::b"}]}
+
+    assert filter_test_report(report, ["t::b"]) == {"exitcode": 0, "tests": [{"nodeid": "t::b"}]}
+    assert len(report["tests"]) == 2
+
+def test_fn2tests_from_coverage_contexts():
+    report = {"files": {"calc.py": {"contexts": {
+        "1": [""],
+        "2": ["test_calc.py::test_add|run", "test_calc.py::test_both|run"],
+        "6": ["test_calc.py::test_both|run", "test_calc.py::test_sub|setup"],
+    }}}}
+
+    assert fn2tests_from_coverage_contexts(report, FUNCTIONS) == {
+        "add": ["test_calc.py::test_add", "test_calc.py::test_both"],
+        "sub": ["test_calc.py::test_both", "test_calc.py::test_sub"],
+        "unused": [],
+    }
+
+
+@pytest.fixture
+def actions(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "calc.py").write_text(CALC)
+    (repo / "test_calc.py").write_text(
+        "import calc\n\ndef test_add():\n    assert calc.add(1, 2) == 3\n\ndef test_sub():\n    assert calc.sub(3, 2) == 1\n"
+    )
+    environment = SimpleNamespace(
+        interpreter_path=Path(sys.executable),
+        repo_root=repo,
+        base=tmp_path,
+        internal_repo_path="repo",
+        hash2function={k: v for k, v in FUNCTIONS.items() if k != "other"},
+    )
+    return PythonActions(environment)
+
+def test_get_fn2tests_from_coverage(actions):
+    pytest.importorskip("pytest_cov")
+
+    assert actions.get_fn2tests_from_coverage(timeout=60) == {
+        "add": ["test_calc.py::test_add"],
+        "sub": ["test_calc.py::test_sub"],
+        "unused": [],
+    }
+    assert not (actions.environment.repo_root / ".plum-coveragerc").exists()
+
+def test_map_tests_to_functions_with_selector(actions):
+    pytest.importorskip("pytest_jsonreport")
+    control = actions.run_test_suite(timeout=60)
+    selector = TestImpactSelector({"add": ["test_calc.py::test_add"], "unused": []})
+
+    fn2tests = actions.map_tests_to_functions(control, selector=selector)
+
+    assert {fnhash: list(tests) for fnhash, tests in fn2tests.items()} == {
+        "add": ["test_calc.py::test_add"],
+        "sub": ["test_calc.py::test_sub"],
+        "unused": [],
+    }
+    assert actions.environment.repo_root.joinpath("calc.py").read_text() == CALC
+
+def test_get_fn2tests_from_coverage_without_report(actions):
+    actions.environment.interpreter_path = Path("/bin/false")
+
+    with pytest.raises(RuntimeError):
+        actions.get_fn2tests_from_coverage(timeout=60)
+    assert not (actions.environment.repo_root / ".plum-coveragerc").exists()
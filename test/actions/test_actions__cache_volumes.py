@@ -0,0 +1,91 @@
+import shlex
+import subprocess
+
+import pytest
+
+
+from plum.actions import _execution_backend
+from plum.actions._cache_volumes import collect_garbage, get_cache_volumes, get_ecosystem
+from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
+
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, answering docker commands without a Docker daemon."""
+    def __init__(self, in_use=False, gc_output="collected\n1024\n"):
+        self.commands = []
+        self.in_use = in_use
+        self.gc_output = gc_output
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        self.commands.append(command)
+        stdout = ""
+        if command[:2] == ["docker", "ps"]:
+            stdout = "container1\n" if self.in_use else ""
+        elif command[:2] == ["docker", "run"] and command[-2:-1] == ["-c"]:
+            stdout = self.gc_output
+        elif command[:2] == ["docker", "run"]:
+            stdout = "container1\n"
+        return subprocess.CompletedProcess(command, 0, stdout.encode("utf-8"), b"")
+
+    def run_captured(self, command, timeout=None, parsers=(), **kwargs):
+        """Stands in for `_output_capture.run_captured`, which returns the output decoded."""
+        output = self(command, timeout=timeout)
+        return subprocess.CompletedProcess(command, output.returncode, output.stdout.decode("utf-8"), output.stderr.decode("utf-8"))
+
+
+@pytest.fixture
+def docker_cli(monkeypatch):
+    docker_cli = _FakeDockerCli()
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    monkeypatch.setattr(_execution_backend, "run_captured", docker_cli.run_captured)
+    return docker_cli
+
+
+@pytest.mark.parametrize("image, ecosystem", [
+    ("mcr.microsoft.com/dotnet/sdk", "nuget"),
+    ("mcr.microsoft.com/dotnet/framework/sdk", None),
+    ("maven", "maven"),
+    ("library/node", "npm"),
+    ("python", "pip"),
+    ("fake_image", None),
+])
+def test_get_ecosystem(image, ecosystem):
+    assert get_ecosystem(image) == ecosystem
+
+def test_runner_mounts_cache_volumes():
+    runner = DockerRunner("mcr.microsoft.com/dotnet/sdk", "8.0", volumes={"plum-dotnet-tools": "/root/.dotnet/tools"})
+    command = shlex.split(runner._get_docker_command("/repo"))
+    mounts = [command[i + 1] for i, arg in enumerate(command) if arg == "-v"]
+    assert mounts == [
+        "/repo:/app",
+        "plum-nuget-packages:/root/.nuget/packages",
+        "plum-cache-nuget-http:/root/.local/share/NuGet/http-cache",
+        "plum-cache-nuget-scratch:/tmp/NuGetScratch",
+        "plum-dotnet-tools:/root/.dotnet/tools",
+    ]
+
+    # Follows the image, ex) when the BuildManager recovers with the .NET Framework image.
+    runner.image = "mcr.microsoft.com/dotnet/framework/sdk"
+    assert "plum-nuget-packages" not in runner._get_docker_command("/repo")
+
+    runner = DockerRunner("node", "20", cache_volumes=False)
+    assert "plum-cache-npm" not in runner._get_docker_command("/repo")
+
+def test_session_mounts_cache_volumes(docker_cli):
+    session = DockerSession("node", "20")
+    session.run("npm ci", "/repo")
+    assert "plum-cache-npm:/root/.npm" in docker_cli.commands[0]
+
+def test_collect_garbage(docker_cli):
+    result = collect_garbage("plum-cache-npm", max_bytes=2 * 1024 * 1024)
+    assert result == {"volume": "plum-cache-npm", "collected": True, "size": 1024 * 1024}
+    assert docker_cli.commands[0] == ["docker", "ps", "-a", "-q", "--filter", "volume=plum-cache-npm"]
+    assert docker_cli.commands[1][:5] == ["docker", "run", "--rm", "-v", "plum-cache-npm:/cache"]
+    assert "-gt 2048" in docker_cli.commands[1][-1]
+
+def test_collect_garbage_skips_volume_in_use(docker_cli):
+    docker_cli.in_use = True
+    result = collect_garbage("plum-cache-npm", max_bytes=0)
+    assert result["collected"] is False
+    assert len(docker_cli.commands) == 1
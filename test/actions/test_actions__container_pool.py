@@ -0,0 +1,138 @@
+import pickle
+import subprocess
+import threading
+import time
+
+import pytest
+
+
+from plum.actions import _execution_backend
+from plum.actions._container_pool import ContainerPool, docker_for_repo, set_active_pool
+from plum.actions._docker_runner import DockerRunner
+from plum.configuration.detailed_configuration_model import EnvironmentConfig
+
+IMAGE = "fake_image"
+TAG = "fake.tag"
+
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, answering docker commands without a Docker daemon."""
+    def __init__(self):
+        self.commands = []
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        with self.lock:
+            self.commands.append(command)
+            stdout = ""
+            if command[:2] == ["docker", "run"]:
+                self.started += 1
+                stdout = f"container{self.started}\n"
+            elif command[:2] == ["docker", "inspect"]:
+                stdout = "true\n"
+        return subprocess.CompletedProcess(command, 0, stdout.encode("utf-8"), b"")
+
+    def run_captured(self, command, timeout=None, parsers=(), **kwargs):
+        """Stands in for `_output_capture.run_captured`, which returns the output decoded."""
+        output = self(command, timeout=timeout)
+        return subprocess.CompletedProcess(command, output.returncode, output.stdout.decode("utf-8"), output.stderr.decode("utf-8"))
+
+    def execs(self):
+        return [c for c in self.commands if c[:2] == ["docker", "exec"] and c[-1] != "kill -9 -1"]
+
+
+@pytest.fixture
+def docker_cli(monkeypatch):
+    docker_cli = _FakeDockerCli()
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    monkeypatch.setattr(_execution_backend, "run_captured", docker_cli.run_captured)
+    return docker_cli
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "repo_a").mkdir()
+    (tmp_path / "repo_b").mkdir()
+    return tmp_path
+
+
+def test_containers_reused_across_repos(docker_cli, project):
+    with ContainerPool(project, size=1) as pool:
+        with pool.acquire(IMAGE, TAG, project / "repo_a") as docker:
+            docker.run("dotnet build", project / "repo_a")
+            assert docker.mount_dir == "/plum/repo_a"
+        with pool.acquire(IMAGE, TAG, project / "repo_b") as docker:
+            docker.run_multi_command(["dotnet restore", "dotnet build"], project / "repo_b", relative_work_dir="src")
+
+    assert docker_cli.started == 1
+    assert docker_cli.commands[0][:4] == ["docker", "run", "-d", "--rm"]
+    assert docker_cli.commands[0][12:14] == ["-v", f"{project.resolve()}:/plum"]
+    assert [c[3] for c in docker_cli.execs()] == ["/plum/repo_a", "/plum/repo_b/src"]
+    # Reset between repos, removed on close.
+    assert ["docker", "exec", "container1", "sh", "-c", "kill -9 -1"] in docker_cli.commands
+    assert docker_cli.commands[-1] == ["docker", "rm", "-f", "container1"]
+
+def test_tag_change_swaps_container(docker_cli, project):
+    """ex) the BuildManager recovering with another SDK version"""
+    with ContainerPool(project, size=2) as pool:
+        with pool.acquire(IMAGE, TAG, project / "repo_a", work_dir="/app") as docker:
+            docker.run("dotnet build", project / "repo_a")
+            docker.tag = "8.0"
+            docker.run("dotnet build", project / "repo_a")
+            assert docker.get_config() == {"type": "docker", "image": IMAGE, "tag": "8.0", "work_dir": "/app"}
+
+        assert docker_cli.started == 2
+        assert [c[4] for c in docker_cli.execs()] == ["container1", "container2"]
+        assert sorted(pool.container_ids()) == ["container1", "container2"]
+
+def test_volumes_of_the_pool_only(docker_cli, project):
+    with ContainerPool(project, size=1, volumes={"plum-cache": "/cache"}) as pool:
+        with pool.acquire(IMAGE, TAG, project / "repo_a") as docker:
+            assert docker.volumes == {"plum-cache": "/cache"}
+            # The pool's containers are already started, they cannot mount more volumes.
+            docker.volumes["plum-other"] = "/other"
+            with pytest.raises(ValueError):
+                docker.run("dotnet build", project / "repo_a")
+
+    assert docker_cli.started == 0
+
+def test_size_bound(docker_cli, project):
+    with ContainerPool(project, size=1) as pool:
+        pool.warm([(IMAGE, TAG)])
+        order = []
+
+        def build(repo):
+            with pool.acquire(IMAGE, TAG, project / repo) as docker:
+                docker.run("dotnet build", project / repo)
+                order.append(f"start {repo}")
+                time.sleep(0.2)
+                order.append(f"end {repo}")
+
+        threads = [threading.Thread(target=build, args=(repo,)) for repo in ("repo_a", "repo_b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert docker_cli.started == 1
+    assert order[1].startswith("end")
+
+def test_shared_pool_pickles(docker_cli, project):
+    with ContainerPool(project, size=1, shared=True) as pool:
+        pool.warm([(IMAGE, TAG)])
+        worker_pool = pickle.loads(pickle.dumps(pool))
+
+        assert worker_pool.checkout(IMAGE, TAG) == "container1"
+
+def test_docker_for_repo(docker_cli, project):
+    env = EnvironmentConfig(type="docker", image=IMAGE, tag=TAG, work_dir="/app")
+    with docker_for_repo(env, project / "repo_a") as docker:
+        assert type(docker) is DockerRunner
+
+    with ContainerPool(project, size=1) as pool:
+        set_active_pool(pool)
+        try:
+            with docker_for_repo(env, project / "repo_a") as docker:
+                assert docker.mount_dir == "/plum/repo_a"
+        finally:
+            set_active_pool(None)
@@ -0,0 +1,97 @@
+import os
+import socket
+import subprocess
+
+import pytest
+
+
+from plum.actions import _containers, _execution_backend
+from plum.actions._containers import (
+    ContainerReaper,
+    is_orphan,
+    name_docker_command,
+    reap_orphans,
+    run_container,
+)
+from plum.actions._docker_runner import DockerRunner
+
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, answering docker commands without a Docker daemon."""
+    def __init__(self, containers=""):
+        self.commands = []
+        self.containers = containers
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        self.commands.append(command)
+        stdout = self.containers if command[:2] == ["docker", "ps"] else ""
+        return subprocess.CompletedProcess(command, 0, stdout.encode("utf-8"), b"")
+
+    def run_captured(self, command, timeout=None, parsers=(), **kwargs):
+        """Stands in for `_output_capture.run_captured`, timing out every command."""
+        self.commands.append(command)
+        raise subprocess.TimeoutExpired(command, timeout)
+
+    def removed(self):
+        return [command[-1] for command in self.commands if command[:3] == ["docker", "rm", "-f"]]
+
+
+@pytest.fixture
+def docker_cli(monkeypatch):
+    docker_cli = _FakeDockerCli()
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    monkeypatch.setattr(_containers, "run_captured", docker_cli.run_captured)
+    monkeypatch.setattr(_execution_backend, "run_captured", docker_cli.run_captured)
+    return docker_cli
+
+
+def test_name_docker_command():
+    command = name_docker_command(["docker", "run", "--rm", "maven:3", "mvn", "test"], "plum-1-abc")
+    assert command[:4] == ["docker", "run", "--name", "plum-1-abc"]
+    assert f"plum.owner={socket.gethostname()}:{os.getpid()}" in command
+    assert command[-4:] == ["--rm", "maven:3", "mvn", "test"]
+
+    assert name_docker_command(["docker", "build", "."], "plum-1-abc") == ["docker", "build", "."]
+
+def test_run_container_kills_on_timeout(docker_cli):
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_container(["docker", "run", "--rm", "maven:3", "mvn", "test"], timeout=1)
+
+    name = docker_cli.commands[0][3]
+    assert docker_cli.removed() == [name]
+    assert name not in _containers._tracked
+
+def test_runner_kills_on_timeout(docker_cli):
+    runner = DockerRunner("fake_image", "fake.tag")
+    assert runner.run("sleep 100", "/repo") == (1, "", "Timeout")
+
+    command = docker_cli.commands[0]
+    assert docker_cli.removed() == [command[command.index("--name") + 1]]
+
+def test_is_orphan():
+    host = socket.gethostname()
+    assert not is_orphan(f"{host}:{os.getpid()}", started=0)
+    assert is_orphan(f"{host}:{os.getpid()}", started=0, max_age=60, now=120)
+    # Processes of other hosts are only judged by age.
+    assert not is_orphan("other-host:1", started=0)
+
+    process = subprocess.Popen(["true"])
+    process.wait()
+    assert is_orphan(f"{host}:{process.pid}", started=None)
+
+def test_reap_orphans(docker_cli):
+    process = subprocess.Popen(["true"])
+    process.wait()
+    host = socket.gethostname()
+    docker_cli.containers = (
+        f"plum-live\t{host}:{os.getpid()}\t100\n"
+        f"plum-dead\t{host}:{process.pid}\t100\n"
+        f"plum-other\tother-host:1\t\n"
+    )
+
+    assert reap_orphans() == ["plum-dead"]
+    assert docker_cli.commands[0][:3] == ["docker", "ps", "-a"]
+
+    with ContainerReaper(interval=60, max_age=60):
+        pass
+    assert docker_cli.removed() == ["plum-dead", "plum-live", "plum-dead"]
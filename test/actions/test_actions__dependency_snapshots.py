@@ -0,0 +1,145 @@
+import shlex
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+
+from plum.actions import _containers
+from plum.actions._dependency_snapshots import get_snapshot_volume, is_snapshot_complete, mark_snapshot_complete
+from plum.actions._docker_runner import DockerRunner
+from plum.actions.java_mvn_actions import JavaMavenActions
+
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, answering docker commands without a Docker daemon."""
+    def __init__(self, complete=False):
+        self.commands = []
+        self.complete = complete
+        self.volumes = set()
+        self.offline_misses = 0
+        """Number of offline Maven runs failing on a missing artifact."""
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        self.commands.append(command)
+        returncode = 0
+        if command[:3] == ["docker", "volume", "inspect"]:
+            returncode = 0 if command[3] in self.volumes else 1
+        elif command[-1].startswith("test -f"):
+            returncode = 0 if self.complete else 1
+        elif command[-1].startswith("touch"):
+            self.complete = True
+        self._create_volumes(command)
+        return subprocess.CompletedProcess(command, returncode, b"", b"")
+
+    def run_captured(self, command, timeout=None, parsers=(), **kwargs):
+        """Stands in for `_output_capture.run_captured`, with a successful Maven run."""
+        self.commands.append(command)
+        self._create_volumes(command)
+        output = "[INFO] BUILD SUCCESS\n"
+        if "-o" in command and self.offline_misses:
+            self.offline_misses -= 1
+            output = (
+                "[ERROR] Failed to execute goal: Cannot access central (https://repo.maven.apache.org/maven2) "
+                "in offline mode and the artifact surefire-junit4:jar:3.0.0 has not been downloaded from it before.\n"
+                "[INFO] BUILD FAILURE\n"
+            )
+        for parser in parsers:
+            parser.parse(output)
+        return subprocess.CompletedProcess(command, 0, output, "")
+
+    def _create_volumes(self, command):
+        """Mounting a volume in `docker run` creates it."""
+        for option, value in zip(command, command[1:]):
+            if option == "-v" and ":" in value and not value.startswith("/"):
+                self.volumes.add(value.split(":")[0])
+
+
+@pytest.fixture
+def docker_cli(monkeypatch):
+    docker_cli = _FakeDockerCli()
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    monkeypatch.setattr(_containers, "run_captured", docker_cli.run_captured)
+    return docker_cli
+
+
+@pytest.fixture
+def maven_repo(tmp_path):
+    (tmp_path / "pom.xml").write_text("<project/>")
+    (tmp_path / "core").mkdir()
+    (tmp_path / "core" / "pom.xml").write_text("<project><artifactId>core</artifactId></project>")
+    return tmp_path
+
+
+def test_snapshot_volume_follows_dependencies(maven_repo):
+    volume = get_snapshot_volume(maven_repo, "maven")
+    assert volume.startswith("plum-snapshot-maven-")
+
+    # Build outputs and other files do not change the snapshot.
+    (maven_repo / "target").mkdir()
+    (maven_repo / "target" / "pom.xml").write_text("<project>copy</project>")
+    (maven_repo / "README.md").write_text("readme")
+    assert get_snapshot_volume(maven_repo, "maven") == volume
+
+    (maven_repo / "core" / "pom.xml").write_text("<project><artifactId>core2</artifactId></project>")
+    assert get_snapshot_volume(maven_repo, "maven") != volume
+
+    assert get_snapshot_volume(maven_repo, "nuget") is None
+    (maven_repo / "App.csproj").write_text("<Project/>")
+    assert get_snapshot_volume(maven_repo, "nuget").startswith("plum-snapshot-nuget-")
+
+def test_snapshot_marker(docker_cli):
+    assert not is_snapshot_complete("plum-snapshot-maven-abc")
+    # Checking a missing snapshot does not create its volume.
+    assert docker_cli.commands == [["docker", "volume", "inspect", "plum-snapshot-maven-abc"]]
+    assert not docker_cli.volumes
+
+    assert mark_snapshot_complete("plum-snapshot-maven-abc")
+    assert is_snapshot_complete("plum-snapshot-maven-abc")
+    assert docker_cli.commands[1][:5] == ["docker", "run", "--rm", "-v", "plum-snapshot-maven-abc:/snapshot"]
+
+def test_snapshot_replaces_cache_volume():
+    runner = DockerRunner("maven", "3", volumes={"plum-snapshot-maven-abc": "/root/.m2/repository"})
+    command = runner._get_docker_command("/repo")
+    assert "plum-snapshot-maven-abc:/root/.m2/repository" in command
+    assert "plum-cache-maven" not in command
+
+def test_maven_runs_offline_from_snapshot(docker_cli, maven_repo):
+    environment = SimpleNamespace(base=maven_repo, internal_repo_path="", repo_type=SimpleNamespace(name="LOCAL"))
+    actions = JavaMavenActions(environment, "maven", "3")
+    volume = get_snapshot_volume(maven_repo, "maven")
+
+    result = actions.snapshot_dependencies()
+    assert result["success"] and result["created"] and result["volume"] == volume
+    go_offline = docker_cli.commands[1]
+    # The test goals run online too, resolving what go-offline misses.
+    assert "dependency:go-offline" in go_offline and "test" in go_offline and "-o" not in go_offline
+    assert f"{volume}:/root/.m2/repository" in go_offline
+
+    docker_cli.commands.clear()
+    actions.run_test_suite()
+    test_command = docker_cli.commands[0]
+    assert f"{volume}:/root/.m2/repository" in test_command
+    assert "-o" in test_command
+
+    # Once complete, the snapshot is reused as is.
+    docker_cli.commands.clear()
+    assert not JavaMavenActions(environment, "maven", "3").snapshot_dependencies()["created"]
+    assert len(docker_cli.commands) == 2
+
+def test_maven_reruns_online_on_offline_miss(docker_cli, maven_repo):
+    environment = SimpleNamespace(base=maven_repo, internal_repo_path="", repo_type=SimpleNamespace(name="LOCAL"))
+    actions = JavaMavenActions(environment, "maven", "3")
+    assert actions.snapshot_dependencies()["success"]
+
+    docker_cli.commands.clear()
+    docker_cli.offline_misses = 1
+    assert actions.run_test_suite()["status_result"] == "SUCCESS"
+    offline, online = docker_cli.commands
+    assert "-o" in offline and "-o" not in online
+    assert f"{get_snapshot_volume(maven_repo, 'maven')}:/root/.m2/repository" in online
+
+    # Once resolved into the snapshot, Maven stays offline.
+    docker_cli.commands.clear()
+    actions.run_test_suite()
+    assert len(docker_cli.commands) == 1 and "-o" in docker_cli.commands[0]
@@ -0,0 +1,77 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+
+from plum.actions._docker_images import ensure_image, ensure_images
+
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, with an image store that slowly fills with pulled images."""
+    def __init__(self, local_images=()):
+        self.local_images = set(local_images)
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        with self.lock:
+            self.commands.append(command)
+        if command[:3] == ["docker", "image", "inspect"]:
+            returncode = 0 if command[3] in self.local_images else 1
+        elif command[:2] == ["docker", "pull"]:
+            time.sleep(0.1)
+            self.local_images.add(command[2])
+            returncode = 0
+        elif command[:2] == ["docker", "load"]:
+            self.local_images.add("loaded")
+            returncode = 0
+        else:
+            returncode = 1
+        return subprocess.CompletedProcess(command, returncode, b"", b"")
+
+    def pulls(self):
+        return [c for c in self.commands if c[:2] == ["docker", "pull"]]
+
+
+@pytest.fixture
+def docker_cli(monkeypatch):
+    docker_cli = _FakeDockerCli(local_images={"local:1.0"})
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    return docker_cli
+
+
+def test_local_image_not_pulled(docker_cli, tmp_path):
+    assert ensure_image("local:1.0", lock_dir=tmp_path)
+    assert docker_cli.pulls() == []
+
+def test_concurrent_callers_pull_once(docker_cli, tmp_path):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(ensure_image("sdk:8.0", lock_dir=tmp_path)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 4
+    assert docker_cli.pulls() == [["docker", "pull", "sdk:8.0"]]
+
+def test_archive_loaded_instead_of_pulled(docker_cli, tmp_path):
+    archive_dir = tmp_path / "archives"
+    archive_dir.mkdir()
+    (archive_dir / "mcr.microsoft.com_dotnet_sdk_8.0.tar").write_bytes(b"")
+
+    ensure_image("mcr.microsoft.com/dotnet/sdk:8.0", archive_dir=archive_dir, lock_dir=tmp_path)
+
+    assert docker_cli.pulls() == []
+    assert ["docker", "load", "-i", str(archive_dir / "mcr.microsoft.com_dotnet_sdk_8.0.tar")] in docker_cli.commands
+
+def test_ensure_images(docker_cli, tmp_path):
+    results = ensure_images(["sdk:6.0", "sdk:8.0", "sdk:6.0", "local:1.0"], max_workers=2, lock_dir=tmp_path)
+
+    assert results == {"local:1.0": True, "sdk:6.0": True, "sdk:8.0": True}
+    assert sorted(c[2] for c in docker_cli.pulls()) == ["sdk:6.0", "sdk:8.0"]
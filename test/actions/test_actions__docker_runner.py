@@ -1,8 +1,11 @@
+import subprocess
 from pathlib import Path
 import pytest
 
 
+from plum.actions import _execution_backend
 from plum.actions._docker_runner import DockerRunner
+from plum.actions._docker_session import DockerSession
 
 IMAGE = "fake_image"
 TAG = "fake.tag"
@@ -67,3 +70,83 @@ def test_docker_command_sterilization(repo_path, relative_work_dir, expected_com
     runner = DockerRunner(IMAGE, TAG, MOUNT_DIR)
     actual_command = runner._get_docker_command(repo_path, relative_work_dir)
     assert actual_command == expected_command, f"Expected {expected_command}, but got {actual_command}"
+
+def test_get_docker_command_with_volumes():
+    """Additional volumes are mounted after the repo and before the working directory."""
+    runner = DockerRunner(IMAGE, TAG, MOUNT_DIR, volumes={"plum-cache": "/root/.cache", "C:\\cache": "/cache"})
+    actual_command = runner._get_docker_command("/home/user/repo")
+    expected_command = (
+        "docker run --rm -v /home/user/repo:/app "
+        "-v plum-cache:/root/.cache -v C:/cache:/cache "
+        "-w /app fake_image:fake.tag"
+    )
+    assert actual_command == expected_command, f"Expected {expected_command}, but got {actual_command}"
+
+def test_docker_session_commands():
+    """The session container idles with the repo and volumes mounted, commands run through docker exec."""
+    session = DockerSession(IMAGE, TAG, MOUNT_DIR, volumes={"plum-m2": "/root/.m2"})
+
+    command = session._get_start_command("C:\\Users\\Test\\Repo")
+    # Named and labelled to be killed if left over, see _containers.
+    assert command[4] == "--name" and command[5].startswith("plum-")
+    assert command[6:12:2] == ["--label"] * 3
+    assert command[:4] + command[12:] == [
+        "docker", "run", "-d", "--rm",
+        "-v", "C:/Users/Test/Repo:/app",
+        "-v", "plum-m2:/root/.m2",
+        "-w", "/app",
+        "--entrypoint", "sh",
+        "fake_image:fake.tag",
+        "-c", DockerSession.IDLE_COMMAND,
+    ]
+
+    session.container_id = "abc123"
+    assert session._get_exec_command("mvn test", "core") == [
+        "docker", "exec", "-w", "/app/core", "abc123", "sh", "-c", "mvn test",
+    ]
+
+def test_docker_session_requires_start():
+    with pytest.raises(RuntimeError):
+        DockerSession(IMAGE, TAG).exec("true")
+
+class _FakeDockerCli:
+    """Stands in for subprocess.run, answering docker commands without a Docker daemon."""
+    def __init__(self):
+        self.commands = []
+        self.started = 0
+
+    def __call__(self, command, capture_output=True, timeout=None):
+        self.commands.append(command)
+        stdout = ""
+        if command[:2] == ["docker", "run"]:
+            self.started += 1
+            stdout = f"container{self.started}\n"
+        elif command[:2] == ["docker", "inspect"]:
+            stdout = "true\n"
+        return subprocess.CompletedProcess(command, 0, stdout.encode("utf-8"), b"")
+
+    def run_captured(self, command, timeout=None, parsers=(), **kwargs):
+        """Stands in for `_output_capture.run_captured`, which returns the output decoded."""
+        output = self(command, timeout=timeout)
+        return subprocess.CompletedProcess(command, output.returncode, output.stdout.decode("utf-8"), output.stderr.decode("utf-8"))
+
+def test_docker_session_drop_in(monkeypatch):
+    """Like DockerRunner, run takes the repo path, and restarts the container when the configuration changes."""
+    docker_cli = _FakeDockerCli()
+    monkeypatch.setattr(subprocess, "run", docker_cli)
+    monkeypatch.setattr(_execution_backend, "run_captured", docker_cli.run_captured)
+    session = DockerSession(IMAGE, TAG, MOUNT_DIR)
+
+    session.run("dotnet restore", "/repo")
+    session.run_multi_command(["dotnet build", "dotnet test"], "/repo", relative_work_dir="tests")
+    assert docker_cli.started == 1
+    assert docker_cli.commands[-1] == [
+        "docker", "exec", "-w", "/app/tests", "container1", "sh", "-c", "dotnet build && dotnet test",
+    ]
+
+    # ex) the BuildManager recovering with another SDK version
+    session.tag = "8.0"
+    session.run("dotnet build", "/repo")
+    assert docker_cli.started == 2
+    assert ["docker", "rm", "-f", "container1"] in docker_cli.commands
+    assert docker_cli.commands[-1][4] == "container2"
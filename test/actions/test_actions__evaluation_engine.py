@@ -0,0 +1,126 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+from plum.actions import evaluation_engine
+from plum.actions.evaluation_engine import TIMEOUT_RESULT, EvaluationEngine, EvaluationJob
+from plum.harnesslib.languages import Language
+
+
+def _parse(returncode, stdout, stderr):
+    return {"success": returncode == 0, "stdout": stdout, "stderr": stderr}
+
+
+def _python_job(key, code, language=Language.Python, **kwargs):
+    return EvaluationJob(key=key, language=language, command=[sys.executable, "-c", code], parse=_parse, **kwargs)
+
+
+class _Concurrency:
+    """Tracks how many jobs are between their setup and cleanup at once."""
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    def setup(self):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+    def cleanup(self):
+        self.running -= 1
+
+
+def test_results_streamed_to_callback():
+    streamed = []
+    jobs = [_python_job(i, f"print({i})") for i in range(4)]
+
+    results = EvaluationEngine().evaluate(jobs, on_result=lambda job, result: streamed.append(job.key))
+
+    assert sorted(streamed) == [0, 1, 2, 3]
+    assert {key: result["stdout"].strip() for key, result in results.items()} == {i: str(i) for i in range(4)}
+    assert all(result["success"] for result in results.values())
+
+def test_async_callback():
+    streamed = []
+
+    async def on_result(job, result):
+        streamed.append(job.key)
+
+    EvaluationEngine().evaluate([_python_job("a", "pass")], on_result=on_result)
+
+    assert streamed == ["a"]
+
+def test_language_limit():
+    concurrency = {language: _Concurrency() for language in (Language.Java, Language.Python)}
+    jobs = [
+        _python_job(
+            (language, i), "import time; time.sleep(0.2)", language=language,
+            setup=concurrency[language].setup, cleanup=concurrency[language].cleanup,
+        )
+        for language in concurrency for i in range(3)
+    ]
+
+    EvaluationEngine(limits={Language.Java: 1}, default_limit=3).evaluate(jobs)
+
+    assert concurrency[Language.Java].max_running == 1
+    assert concurrency[Language.Python].max_running == 3
+
+def test_lock_key():
+    concurrency = _Concurrency()
+    jobs = [
+        _python_job(i, "import time; time.sleep(0.1)", setup=concurrency.setup, cleanup=concurrency.cleanup, lock_key="repo")
+        for i in range(3)
+    ]
+
+    EvaluationEngine(default_limit=3).evaluate(jobs)
+
+    assert concurrency.max_running == 1
+
+def _is_running(pid):
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except FileNotFoundError:
+        return False
+    return "State:\tZ" not in status
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="Reads process states from /proc")
+def test_timeout_kills_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time; "
+        f"child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid)); "
+        "time.sleep(60)"
+    )
+    cleaned_up = []
+
+    start = time.monotonic()
+    results = EvaluationEngine().evaluate([_python_job("slow", code, timeout=2, cleanup=lambda: cleaned_up.append(True))])
+
+    assert time.monotonic() - start < 30
+    assert results["slow"] == TIMEOUT_RESULT
+    assert cleaned_up == [True]
+    child_pid = int(pid_file.read_text())
+    for _ in range(50):
+        if not _is_running(child_pid):
+            break
+        time.sleep(0.1)
+    assert not _is_running(child_pid)
+
+def test_missing_command():
+    job = EvaluationJob(key="missing", language=Language.Python, command=["plum-missing-command"], parse=_parse)
+
+    result = EvaluationEngine().evaluate([job])["missing"]
+
+    assert result["success"] is False
+    assert result["stdout"] == "n/a"
+
+def test_timeout_kills_container(monkeypatch):
+    killed = []
+    monkeypatch.setattr(evaluation_engine, "kill_container", killed.append)
+    job = _python_job("slow", "import time; time.sleep(10)", timeout=0.5, container="plum-1-abc")
+
+    assert EvaluationEngine().evaluate([job]) == {"slow": TIMEOUT_RESULT}
+    assert killed == ["plum-1-abc"]
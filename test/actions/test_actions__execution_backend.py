@@ -0,0 +1,68 @@
+import shutil
+import subprocess
+
+import pytest
+
+
+from plum.actions import _execution_backend
+from plum.actions._docker_runner import DockerRunner
+from plum.actions._local_backend import LocalProcessBackend, is_unshare_available
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "src").mkdir()
+    return tmp_path
+
+
+def test_local_run(repo):
+    backend = LocalProcessBackend(sandbox=False, env={"PLUM_A": "a"})
+
+    assert backend.run("pwd", repo, relative_work_dir="src") == (0, f"{repo / 'src'}\n", "")
+    return_code, stdout, _ = backend.run_multi_command(
+        ["echo $PLUM_A$PLUM_B", "exit 3", "echo unreachable"], repo, env={"PLUM_B": "b"}
+    )
+    assert (return_code, stdout) == (3, "ab\n")
+
+    assert backend.last_metrics.backend == "local"
+    assert backend.last_metrics.returncode == 3
+    assert not backend.last_metrics.timed_out
+
+def test_local_timeout(repo):
+    backend = LocalProcessBackend(sandbox=False)
+    result = backend.run("sleep 10", repo, timeout=0.5)
+    assert result == (1, "", "Timeout") and result.timed_out
+    assert backend.last_metrics.timed_out
+    assert backend.last_metrics.returncode is None
+    assert backend.last_metrics.duration < 10
+
+def test_local_timeout_output_is_not_a_timeout(repo):
+    """A command exiting 1 with "Timeout" on stderr finished, it was not killed."""
+    result = LocalProcessBackend(sandbox=False).run_multi_command(["printf Timeout >&2", "exit 1"], repo)
+    assert result == (1, "", "Timeout")
+    assert not result.timed_out
+
+@pytest.mark.skipif(not is_unshare_available(), reason="Unprivileged namespaces are not available.")
+def test_local_sandbox(repo):
+    backend = LocalProcessBackend()
+    # The command is alone in its PID namespace.
+    assert backend.run_multi_command(["echo $$"], repo)[1] == "1\n"
+
+@pytest.mark.skipif(shutil.which("prlimit") is None, reason="prlimit is not available.")
+def test_local_limits(repo):
+    backend = LocalProcessBackend(sandbox=False, max_open_files=64)
+    assert backend.run_multi_command(["ulimit -n"], repo)[1] == "64\n"
+
+def test_docker_metrics(monkeypatch):
+    def run_captured(command, timeout=None, **kwargs):
+        return subprocess.CompletedProcess(command, 0, "built\n", "")
+
+    monkeypatch.setattr(_execution_backend, "run_captured", run_captured)
+    runner = DockerRunner("fake_image", "fake.tag")
+
+    assert runner.run("dotnet build", "/repo", env={"DOTNET_CLI_TELEMETRY_OPTOUT": "1"}) == (0, "built\n", "")
+    assert runner.last_metrics.backend == "docker"
+    assert runner.last_metrics.command.startswith("docker run --rm --name plum-")
+    assert runner.last_metrics.command.endswith(
+        "-v /repo:/app -e DOTNET_CLI_TELEMETRY_OPTOUT=1 -w /app fake_image:fake.tag dotnet build"
+    )
@@ -0,0 +1,76 @@
+import gzip
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+from plum.actions._output_capture import LineParser, run_captured, set_log_dir
+
+
+class _LineCounter(LineParser):
+    def __init__(self):
+        self.lines = 0
+
+    def feed(self, line):
+        self.lines += 1
+
+    def result(self):
+        return self.lines
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_head_and_tail_kept(tmp_path):
+    counter = _LineCounter()
+    log_path = tmp_path / "output.log.gz"
+    output = run_captured(
+        _python("import sys\nfor i in range(10000): print(f'line {i}')\nprint('oops', file=sys.stderr)"),
+        timeout=30,
+        parsers=[counter],
+        log_path=log_path,
+        head_bytes=100,
+        tail_bytes=100,
+    )
+
+    assert output.returncode == 0
+    assert output.stdout.startswith("line 0\n")
+    assert output.stdout.endswith("line 9999\n")
+    assert f"bytes omitted, full output in {log_path}" in output.stdout
+    assert len(output.stdout) < 400
+    assert output.stderr == "oops\n"
+    assert counter.result() == 10000
+
+    with gzip.open(log_path, "rt") as f:
+        log = f.read()
+    assert "line 5000\n" in log and "oops\n" in log
+
+def test_short_output_unchanged():
+    output = run_captured(_python("print('hello')"), timeout=30)
+    assert output.stdout == "hello\n"
+
+def test_timeout():
+    with pytest.raises(subprocess.TimeoutExpired) as e:
+        run_captured(_python("import time\nprint('started', flush=True)\ntime.sleep(30)"), timeout=1)
+    assert e.value.output == "started\n"
+
+def test_timeout_with_background_child():
+    # The command exits at once but its child keeps the output pipes open.
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired) as e:
+        run_captured(["sh", "-c", "sleep 8 & echo hi"], timeout=2)
+    assert time.monotonic() - start < 6
+    assert e.value.output == "hi\n"
+
+def test_log_dir(tmp_path):
+    set_log_dir(tmp_path)
+    try:
+        run_captured(_python("print('hello')"), timeout=30)
+    finally:
+        set_log_dir(None)
+    [log_path] = tmp_path.glob("*.log.gz")
+    with gzip.open(log_path, "rt") as f:
+        assert f.read() == "hello\n"
@@ -0,0 +1,48 @@
+import pytest
+
+
+from plum.actions._cache_volumes import CACHE_MAX_BYTES
+from plum.cli import plum_action
+from plum.cli.plum_action import PlumAction
+
+
+class _FakeReaper:
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def collected(monkeypatch):
+    calls = []
+    monkeypatch.setattr(plum_action, "ContainerReaper", _FakeReaper)
+    monkeypatch.setattr(plum_action, "collect_all_garbage", lambda max_bytes, ecosystems: calls.append((max_bytes, ecosystems)))
+    return calls
+
+
+def test_run_all_collects_cache_garbage(tmp_path, collected):
+    action = PlumAction(False, "csharp", tmp_path)
+    image_tags = [("mcr.microsoft.com/dotnet/sdk", "8.0"), ("maven", "3-eclipse-temurin-17"), ("unknown/image", "1")]
+
+    assert action._run_all(lambda config: config * 2, [1, 2], image_tags) == [2, 4]
+    assert collected == [(CACHE_MAX_BYTES, ["maven", "nuget"])]
+
+
+def test_run_all_keeps_caches_whole(tmp_path, collected):
+    action = PlumAction(False, "csharp", tmp_path)
+    action.cache_max_bytes = None
+    action._run_all(lambda config: config, [1], [("mcr.microsoft.com/dotnet/sdk", "8.0")])
+    # Without images, nothing is collected either.
+    PlumAction(False, "csharp", tmp_path)._run_all(lambda config: config, [1])
+    assert collected == []
+
+
+def test_run_all_failure_skips_collection(tmp_path, collected):
+    def fail(config):
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        PlumAction(False, "csharp", tmp_path)._run_all(fail, [1], [("mcr.microsoft.com/dotnet/sdk", "8.0")])
+    assert collected == []
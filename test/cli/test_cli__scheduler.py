@@ -0,0 +1,100 @@
+import shlex
+import threading
+import time
+from collections import Counter
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+
+from plum.actions._docker_runner import ContainerLimits, DockerRunner, set_container_limits
+from plum.cli import _scheduler
+from plum.cli._scheduler import ResourceScheduler, parse_size
+
+GB = 1024 ** 3
+
+
+@pytest.fixture
+def host(monkeypatch):
+    """Idle 8 CPU host with 16 GB of available memory and 100 GB of free disk."""
+    state = {"load": 0.0, "memory": 16 * GB, "disk": 100 * GB}
+    monkeypatch.setattr(_scheduler.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(_scheduler, "get_cpu_load", lambda: state["load"])
+    monkeypatch.setattr(_scheduler, "get_available_memory", lambda: state["memory"])
+    monkeypatch.setattr(_scheduler, "get_free_disk", lambda path: state["disk"])
+    return state
+
+
+@pytest.mark.parametrize("size, expected", [
+    ("512m", 512 * 1024 ** 2),
+    ("4g", 4 * GB),
+    ("1.5G", int(1.5 * GB)),
+    ("100", 100),
+    (None, None),
+])
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+def test_can_admit(host):
+    scheduler = ResourceScheduler(language_limits={"csharp": 2}, cpus_per_job=2, memory_per_job="4g")
+
+    assert scheduler.can_admit("csharp", Counter(csharp=1))
+    assert not scheduler.can_admit("csharp", Counter(csharp=2))
+    assert scheduler.can_admit("java", Counter(csharp=2, java=1))
+    # 4 jobs reserve all 8 CPUs.
+    assert not scheduler.can_admit("java", Counter(csharp=2, java=2))
+
+    host["load"] = 7.5
+    assert not scheduler.can_admit("java", Counter(java=1))
+    host["load"] = 0.0
+    host["memory"] = 3 * GB
+    assert not scheduler.can_admit("java", Counter(java=1))
+    host["memory"] = 16 * GB
+    host["disk"] = 1 * GB
+    assert not scheduler.can_admit("java", Counter(java=1))
+    # The first job always starts.
+    assert scheduler.can_admit("java", Counter())
+
+def test_run_respects_language_limits(host):
+    scheduler = ResourceScheduler(language_limits={"csharp": 1}, admission_interval=0.01)
+    running = Counter()
+    peak = Counter()
+    lock = threading.Lock()
+
+    def job(item):
+        language, index = item
+        with lock:
+            running[language] += 1
+            peak[language] = max(peak[language], running[language])
+        time.sleep(0.05)
+        with lock:
+            running[language] -= 1
+        return index
+
+    data = [("csharp", i) for i in range(3)] + [("java", i) for i in range(3, 6)]
+    with ThreadPool(4) as pool:
+        results = scheduler.run(pool, job, data, key=lambda item: item[0])
+
+    assert sorted(results) == list(range(6))
+    assert peak["csharp"] == 1
+    assert peak["java"] > 1
+
+def test_run_raises_job_errors(host):
+    def job(item):
+        raise ValueError(item)
+
+    with ThreadPool(2) as pool:
+        with pytest.raises(ValueError):
+            ResourceScheduler(admission_interval=0.01).run(pool, job, [1, 2])
+
+def test_container_limits():
+    runner = DockerRunner("fake_image", "fake.tag", limits=ContainerLimits(cpus=2, memory="4g"))
+    command = shlex.split(runner._get_docker_command("/repo"))
+    assert command[:9] == ["docker", "run", "--rm", "--cpus", "2", "--memory", "4g", "--memory-swap", "4g"]
+
+    set_container_limits(ContainerLimits(cpus=1.5))
+    try:
+        assert "--cpus 1.5" in DockerRunner("fake_image", "fake.tag")._get_docker_command("/repo")
+    finally:
+        set_container_limits(None)
+    assert "--cpus" not in DockerRunner("fake_image", "fake.tag")._get_docker_command("/repo")
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+from plum.environments import py_repo
+from plum.environments.py_repo import PythonRepository
+from plum.harnesslib.languages.python.wheelhouse import get_wheelhouse
+
+
+class _FakeTask:
+    """Stands in for the environment tasks, recording the wheelhouse active while they run."""
+    def __init__(self, wheelhouses, result=None):
+        self.wheelhouses = wheelhouses
+        self.result = result
+
+        self.kwargs = None
+
+    def __call__(self, **kwargs):
+        self.kwargs = kwargs
+        return self
+
+    def execute(self):
+        self.wheelhouses.append(get_wheelhouse())
+        return self.result
+
+
+@pytest.mark.parametrize("offline", [False, True])
+def test_repo_init_installs_through_project_wheelhouse(tmp_path, monkeypatch, offline):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    (repo_dir / "module.py").write_text("VALUE = 1\n")
+    wheelhouses = []
+    create_environment = _FakeTask(wheelhouses, SimpleNamespace())
+    monkeypatch.setattr(py_repo.tasks, "CreatePythonEnvironment", create_environment)
+    monkeypatch.setattr(py_repo.tasks, "install_dependencies", _FakeTask(wheelhouses))
+
+    repo = PythonRepository(repo_dir, offline_install=offline)
+    repo.repo_init(cleanup=False, install_reqs=True)
+
+    environment_wheelhouse, install_wheelhouse = wheelhouses
+    assert environment_wheelhouse is install_wheelhouse
+    # Shared by the repos of the project, next to their venvs.
+    assert environment_wheelhouse.root == (tmp_path / ".plum" / "wheelhouse").resolve()
+    assert environment_wheelhouse.offline == offline
+    assert get_wheelhouse() is None
+    # The runner tooling comes from the template venvs of the project.
+    assert create_environment.kwargs["template"].root == (tmp_path / ".plum" / "venv-templates").resolve()
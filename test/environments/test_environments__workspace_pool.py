@@ -0,0 +1,94 @@
+import subprocess
+import threading
+import pytest
+
+
+from plum.environments.workspace_pool import WorkspacePool
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "owner--repo"
+    repo.mkdir()
+    (repo / "module.py").write_text("VALUE = 1\n")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=plum", "-c", "user.email=plum@example.com", "commit", "-q", "-m", "init"],
+        cwd=repo, check=True,
+    )
+    return repo
+
+def test_default_strategy(repo, tmp_path):
+    assert WorkspacePool(repo, 1).strategy == "worktree"
+
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    assert WorkspacePool(plain, 1).strategy == "copy"
+
+def test_unknown_strategy(repo):
+    with pytest.raises(ValueError):
+        WorkspacePool(repo, 1, strategy="hardlink")
+
+@pytest.mark.parametrize("strategy", ["worktree", "copy"])
+def test_workspaces_are_isolated_and_reset(repo, strategy):
+    with WorkspacePool(repo, 2, strategy=strategy) as pool:
+        roots = {workspace.root for workspace in pool.workspaces}
+        assert len(roots) == 2
+        assert all(root.parent == repo.with_name("owner--repo-workspaces") for root in roots)
+
+        with pool.acquire() as workspace:
+            workspace.write("module.py", "VALUE = 2\n")
+            workspace.write("new_module.py", "")
+            edited = workspace.track("module.py")
+            edited.write_text(edited.read_text() + "OTHER = 3\n")
+
+            assert (repo / "module.py").read_text() == "VALUE = 1\n"
+
+        assert workspace.path("module.py").read_text() == "VALUE = 1\n"
+        assert not workspace.path("new_module.py").exists()
+
+    assert not repo.with_name("owner--repo-workspaces").exists()
+
+def test_worktree_includes_untracked_files(repo):
+    """Built extensions, generated modules and other files outside of git are part of the workspaces too."""
+    (repo / ".gitignore").write_text("build/\n*.so\n")
+    (repo / "build" / "lib").mkdir(parents=True)
+    (repo / "build" / "lib" / "output.txt").write_text("built")
+    (repo / "_speedups.so").write_text("binary")
+    (repo / "generated.py").write_text("GENERATED = True\n")
+
+    with WorkspacePool(repo, 1, strategy="worktree") as pool:
+        with pool.acquire() as workspace:
+            workspace.write("new_module.py", "")
+            (workspace.root / "left_over.txt").write_text("")
+            for path, content in [("build/lib/output.txt", "built"), ("_speedups.so", "binary"), ("generated.py", "GENERATED = True\n")]:
+                assert workspace.path(path).read_text() == content
+
+        # Reset keeps the files of the clone, removes those of the job.
+        assert workspace.path("generated.py").exists() and workspace.path("build/lib/output.txt").exists()
+        assert not workspace.path("new_module.py").exists() and not workspace.path("left_over.txt").exists()
+
+def test_acquire_hands_out_each_workspace_once(repo):
+    in_use, seen, errors = set(), [], []
+    lock = threading.Lock()
+
+    def job(pool):
+        with pool.acquire() as workspace:
+            with lock:
+                if workspace.root in in_use:
+                    errors.append(workspace.root)
+                in_use.add(workspace.root)
+                seen.append(workspace.root)
+            with lock:
+                in_use.discard(workspace.root)
+
+    with WorkspacePool(repo, 2, strategy="copy") as pool:
+        threads = [threading.Thread(target=job, args=(pool,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
+    assert len(seen) == 8
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+from plum.harnesslib.data_model import Dependency
+from plum.harnesslib.languages import Language
+from plum.harnesslib.tasks import PythonRepoDependencyInstaller
+from plum.harnesslib.languages.python import dependencies
+from plum.harnesslib.languages.python.env import PythonEnvironment
+
+
+class _FakePip:
+    """Stands in for pip_install, failing on pinned versions of the packages it cannot resolve."""
+    def __init__(self, unresolvable=()):
+        self.calls = []
+        self.unresolvable = set(unresolvable)
+
+    def __call__(self, args, reason, python_interpreter=None):
+        self.calls.append(args)
+        if any(arg in self.unresolvable for arg in args):
+            raise ValueError(f"pip install {args=} failed")
+        return [Dependency(arg.split("==")[0], "1.0", Language.Python, reason) for arg in args if arg != "-U"]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "requirements.txt").write_text("# pinned\nnumpy==1.2\nrequests\ngrpc\npkg-resources==0.0.0\nflask==0.1\nsix\n")
+    return SimpleNamespace(clone_path=tmp_path)
+
+
+def _installer(repo, bulk_install=True):
+    return PythonRepoDependencyInstaller(repo, PythonEnvironment(interpreter_path=Path(sys.executable)), bulk_install)
+
+
+def test_install_in_one_run(monkeypatch, repo):
+    pip = _FakePip()
+    monkeypatch.setattr(dependencies, "pip_install", pip)
+
+    deps = _installer(repo).install_from_requirements()
+
+    assert pip.calls == [["-U", "numpy==1.2", "requests", "grpcio", "flask==0.1", "six"]]
+    assert [dep.package_name for dep in deps] == ["numpy", "requests", "grpcio", "flask", "six"]
+    assert all(dep.reason == "requirements.txt" for dep in deps)
+
+def test_bisect_failures(monkeypatch, repo):
+    pip = _FakePip(unresolvable={"flask==0.1"})
+    monkeypatch.setattr(dependencies, "pip_install", pip)
+
+    deps = _installer(repo).install_from_requirements()
+
+    # Only the failing line falls back to an unpinned version.
+    assert ["-U", "flask"] in pip.calls
+    assert [dep.package_name for dep in deps] == ["numpy", "requests", "grpcio", "flask", "six"]
+    assert len(pip.calls) < 2 * 5
+
+def test_install_line_by_line(monkeypatch, repo):
+    pip = _FakePip()
+    monkeypatch.setattr(dependencies, "pip_install", pip)
+
+    _installer(repo, bulk_install=False).install_from_requirements()
+
+    assert len(pip.calls) == 5
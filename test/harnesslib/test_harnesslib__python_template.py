@@ -0,0 +1,83 @@
+import importlib.util
+import os
+import subprocess
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+from plum.harnesslib.tasks import CreatePythonEnvironment, PythonRepoDependencyInstaller
+from plum.actions.py_actions import PythonActions
+from plum.harnesslib.languages.python import dependencies
+from plum.harnesslib.languages.python.template import VenvTemplate, get_python_version, get_site_packages
+
+
+@pytest.fixture(scope="module")
+def template(tmp_path_factory):
+    # No packages, so the template is created offline. A module stands in for the runner tooling.
+    template = VenvTemplate(tmp_path_factory.mktemp("templates"), packages=[])
+    path = template.ensure()
+    (get_site_packages(path / "bin/python") / "plum_runner_tool.py").write_text("NAME = 'runner'\n")
+    return template
+
+
+@pytest.fixture(scope="module")
+def repo_info(tmp_path_factory):
+    return SimpleNamespace(clone_path=tmp_path_factory.mktemp("repo"))
+
+
+@pytest.fixture(scope="module")
+def environment(template, repo_info):
+    venv_path = repo_info.clone_path.parent / (repo_info.clone_path.name + "-venv")
+    return CreatePythonEnvironment(repo_info, venv_path, template=template).execute()
+
+
+def test_venv_overlaid_onto_template(template, environment):
+    assert environment.template_path == template.get_path(get_python_version(environment.interpreter_path))
+    output = subprocess.run(
+        [environment.interpreter_path, "-c", "import plum_runner_tool; print(plum_runner_tool.NAME)"],
+        capture_output=True, text=True,
+    )
+    assert output.stdout == "runner\n"
+
+def test_runner_tooling_not_installed(environment, repo_info, monkeypatch):
+    def pip_install(args, reason, python_interpreter=None):
+        raise AssertionError(f"Unexpected pip install {args}")
+
+    monkeypatch.setattr(dependencies, "pip_install", pip_install)
+    installer = PythonRepoDependencyInstaller(repo_info, environment)
+
+    assert installer.install_runner_dependencies() == []
+    assert installer.install_pytest() == []
+
+def test_generated_test_runs_with_template_pytest(tmp_path):
+    # pytest and its dependencies of the host stand in for the ones the template installs.
+    template = VenvTemplate(tmp_path / "templates", packages=[])
+    site_packages = get_site_packages(template.ensure() / "bin/python")
+    for module in ("pytest", "_pytest", "pluggy", "iniconfig", "packaging", "pygments", "py"):
+        spec = importlib.util.find_spec(module)
+        if spec is None:
+            pytest.skip(f"{module} is not installed")
+        origin = Path(spec.submodule_search_locations[0] if spec.submodule_search_locations else spec.origin)
+        os.symlink(origin, site_packages / origin.name)
+
+    repo_info = SimpleNamespace(clone_path=tmp_path / "repo")
+    repo_info.clone_path.mkdir()
+    (repo_info.clone_path / "calc.py").write_text("def add(a, b):\n    return a + b\n")
+    environment = CreatePythonEnvironment(repo_info, tmp_path / "repo-venv", template=template).execute()
+    # Only the template has pytest, the repo venv has no pytest script.
+    assert not (tmp_path / "repo-venv/bin/pytest").exists()
+
+    actions = PythonActions(SimpleNamespace(
+        interpreter_path=environment.interpreter_path,
+        repo_root=repo_info.clone_path,
+        base=tmp_path,
+        internal_repo_path="repo",
+    ))
+    result = actions.run_generated_test(
+        "from calc import add\n\ndef test_add():\n    assert add(1, 2) == 3\n",
+        repo_info.clone_path / "test_generated.py",
+    )
+
+    assert result["success"], result["stderr"]
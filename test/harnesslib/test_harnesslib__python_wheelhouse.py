@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import pytest
+
+
+from plum.harnesslib.tasks import PythonRepoDependencyInstaller  # noqa: F401, imports the languages in order
+from plum.harnesslib.languages.python import helpers, wheelhouse
+from plum.harnesslib.languages.python.helpers import pip_install
+from plum.harnesslib.languages.python.wheelhouse import Wheelhouse, set_wheelhouse
+from plum.harnesslib.util.shell import ShellOutput
+
+
+class _FakePip:
+    """Stands in for run_subprocess, building a wheel per requirement and installing from --find-links."""
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, args, check=False, timeout=None):
+        self.commands.append(args)
+        stdout = ""
+        if args[1:4] == ["-m", "pip", "wheel"]:
+            wheel_dir = Path(args[args.index("--wheel-dir") + 1])
+            for requirement in args[args.index("--cache-dir") + 2:]:
+                (wheel_dir / f"{requirement}-1.0-py3-none-any.whl").write_text("")
+        else:
+            packages = [arg for arg in args[args.index("install") + 1:] if not arg.startswith(("-", "/"))]
+            if "--no-index" in args:
+                wheel_dir = Path(args[args.index("--find-links") + 1])
+                if any(not (wheel_dir / f"{package}-1.0-py3-none-any.whl").exists() for package in packages):
+                    return ShellOutput(" ".join(args), "", "No matching distribution found", 1)
+            stdout = "Successfully installed " + " ".join(f"{package}-1.0" for package in packages)
+        return ShellOutput(" ".join(args), stdout, "", 0)
+
+
+@pytest.fixture
+def pip(monkeypatch):
+    pip = _FakePip()
+    monkeypatch.setattr(helpers, "run_subprocess", pip)
+    monkeypatch.setattr(wheelhouse, "run_subprocess", pip)
+    yield pip
+    set_wheelhouse(None)
+
+
+def test_miss_builds_into_wheelhouse(pip, tmp_path):
+    house = Wheelhouse.for_project(tmp_path)
+    set_wheelhouse(house)
+
+    deps = pip_install(["numpy"], "requirements.txt", python_interpreter="/venv/bin/python")
+
+    assert [dep.package_name for dep in deps] == ["numpy"]
+    # Missing from the wheelhouse: built into it, then installed from it without the index.
+    miss, build, install = pip.commands
+    assert miss[3:] == ["install", *house.get_pip_options(offline=True), "numpy"]
+    assert build[:4] == ["/venv/bin/python", "-m", "pip", "wheel"]
+    assert [wheel.name for wheel in house.wheels_dir.iterdir()] == ["numpy-1.0-py3-none-any.whl"]
+    assert install == miss
+
+def test_miss_not_built_falls_back_to_index(pip, tmp_path, monkeypatch):
+    house = Wheelhouse.for_project(tmp_path)
+    set_wheelhouse(house)
+    monkeypatch.setattr(house, "add", lambda requirements, python_interpreter=None: False)
+
+    pip_install(["numpy"], "requirements.txt")
+
+    miss, install = pip.commands
+    assert "--no-index" in miss
+    assert install[3:] == ["install", *house.get_pip_options(offline=False), "numpy"]
+
+def test_hit_installs_from_wheelhouse(pip, tmp_path):
+    house = Wheelhouse.for_project(tmp_path)
+    set_wheelhouse(house)
+    house.wheels_dir.mkdir(parents=True)
+    (house.wheels_dir / "numpy-1.0-py3-none-any.whl").write_text("")
+
+    deps = pip_install(["numpy"], "requirements.txt", python_interpreter="/other-venv/bin/python")
+
+    assert [dep.package_name for dep in deps] == ["numpy"]
+    # Installed without building or contacting the index.
+    assert len(pip.commands) == 1
+    assert "--no-index" in pip.commands[0]
+
+def test_upgrade_stays_in_wheelhouse(pip, tmp_path):
+    """Upgrades go to the newest wheel of the wheelhouse, the index is only reached on a miss."""
+    house = Wheelhouse.for_project(tmp_path)
+    set_wheelhouse(house)
+    house.wheels_dir.mkdir(parents=True)
+    (house.wheels_dir / "numpy-1.0-py3-none-any.whl").write_text("")
+
+    pip_install(["-U", "numpy"], "requirements.txt")
+    assert len(pip.commands) == 1
+    assert pip.commands[0][3:] == ["install", *house.get_pip_options(offline=True), "-U", "numpy"]
+
+    pip.commands.clear()
+    pip_install(["--upgrade", "scipy"], "requirements.txt")
+    miss, build, install = pip.commands
+    assert build[3] == "wheel" and build[-1] == "scipy"
+    assert install == miss
+
+def test_editable_install_finds_wheels(pip, tmp_path):
+    house = Wheelhouse(tmp_path / "wheelhouse")
+    set_wheelhouse(house)
+
+    pip_install(["-e", "/repo"], "setup.py")
+
+    assert len(pip.commands) == 1
+    assert pip.commands[0][3:] == ["install", *house.get_pip_options(), "-e", "/repo"]
+    assert "--no-index" not in pip.commands[0]
+
+def test_offline(pip, tmp_path):
+    house = Wheelhouse(tmp_path / "wheelhouse", offline=True)
+    set_wheelhouse(house)
+
+    # Nothing is built offline, a wheel missing from the wheelhouse fails the install.
+    with pytest.raises(ValueError):
+        pip_install(["-U", "numpy"], "requirements.txt")
+    assert len(pip.commands) == 1
+    assert "--no-index" in pip.commands[0]
+
+    (house.wheels_dir / "numpy-1.0-py3-none-any.whl").write_text("")
+    assert [dep.package_name for dep in pip_install(["-U", "numpy"], "requirements.txt")] == ["numpy"]
@@ -0,0 +1,73 @@
+import pytest
+
+
+from plum.utils.cobertura import SourceRootIndex, adapt_cobertura_report
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Multi-module layout with the same package relative path in two modules."""
+    for path in [
+        "core/src/main/java/com/example/Core.java",
+        "core/src/main/java/com/example/Shared.java",
+        "web/src/main/java/com/example/Web.java",
+        "web/src/main/java/com/example/Shared.java",
+        ".git/objects/com/example/Core.java",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    return tmp_path
+
+def test_resolve_relative_to_repo_root(repo):
+    index = SourceRootIndex([repo / "core/src/main/java", repo / "web/src/main/java"], repo)
+
+    assert index.resolve("com/example/Core.java") == "core/src/main/java/com/example/Core.java"
+    assert index.resolve("com/example/Web.java") == "web/src/main/java/com/example/Web.java"
+    assert index.resolve("com/example/Missing.java") is None
+
+def test_first_source_root_wins(repo):
+    index = SourceRootIndex([repo / "web/src/main/java", repo / "core/src/main/java"], repo)
+
+    assert index.resolve("com/example/Shared.java") == "web/src/main/java/com/example/Shared.java"
+
+def test_nested_source_roots(repo):
+    """The repo root itself can be a source root next to the module roots, as in Coverlet reports."""
+    index = SourceRootIndex([repo, repo / "core/src/main/java"], repo)
+
+    assert index.resolve("core/src/main/java/com/example/Core.java") == "core/src/main/java/com/example/Core.java"
+    assert index.resolve("com/example/Core.java") == "core/src/main/java/com/example/Core.java"
+    assert index.resolve("objects/com/example/Core.java") is None
+
+def test_roots_outside_repo_are_ignored(repo, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "Outside.java").write_text("")
+    index = SourceRootIndex([outside], repo)
+
+    assert index.resolve("Outside.java") is None
+
+def test_adapt_cobertura_report(repo):
+    report = {
+        "coverage": {
+            "sources": {"source": ["/app/core/src/main/java", "/app/web/src/main/java"]},
+            "packages": {"package": {
+                "@name": "com.example",
+                "classes": {"class": [
+                    {"@filename": "com/example/Web.java"},
+                    {"@filename": "/app/core/src/main/java/com/example/Core.java"},
+                    {"@filename": "com/example/Unknown.java"},
+                ]},
+            }},
+        }
+    }
+    adapted = adapt_cobertura_report({".": report}, repo, "/app")
+
+    assert adapted["coverage"]["sources"]["source"] == [
+        str(repo / "core/src/main/java"),
+        str(repo / "web/src/main/java"),
+    ]
+    filenames = [c["@filename"] for c in adapted["coverage"]["packages"]["package"]["classes"]["class"]]
+    assert filenames == [
+        "web/src/main/java/com/example/Web.java",
+        "core/src/main/java/com/example/Core.java",
+        "com/example/Unknown.java",
+    ]